@@ -0,0 +1,393 @@
+import asyncio
+import logging
+import os
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Iterable, List, Mapping, Optional, Set, Tuple
+
+import anyio
+from fastapi import HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
+from pymongo import ReplaceOne, ReturnDocument
+
+from http_cache import etag_matches
+
+logger = logging.getLogger(__name__)
+
+# GridFS chunk size; an upload chunk must be a whole number of these so chunks map onto GridFS chunks
+GRIDFS_CHUNK_SIZE = 256 * 1024
+ASSET_CHUNK_SIZE = int(os.environ.get("ASSET_CHUNK_SIZE", str(4 * 1024 * 1024)))
+ASSET_MAX_SIZE = int(os.environ.get("ASSET_MAX_SIZE", str(2 * 1024 ** 3)))
+ASSET_CONTENT_TYPES = ("video/", "audio/", "image/", "application/pdf")
+# Image types that can carry script; served from the API origin they would be stored XSS
+BLOCKED_CONTENT_TYPES = ("image/svg",)
+# Played or shown inline by the frontend; anything else is served as a download
+INLINE_CONTENT_TYPES = ("video/", "audio/", "image/")
+# Uploads still unfinished this many seconds after they were started are deleted with their partial content
+ASSET_UPLOAD_EXPIRY = float(os.environ.get("ASSET_UPLOAD_EXPIRY", str(24 * 3600)))
+GRIDFS_BUCKET = "asset_content"
+
+if ASSET_CHUNK_SIZE <= 0 or ASSET_CHUNK_SIZE % GRIDFS_CHUNK_SIZE:
+    raise ValueError(f"ASSET_CHUNK_SIZE must be a positive multiple of {GRIDFS_CHUNK_SIZE}")
+
+# Content never changes once an upload completes, so any cache may keep it
+ASSET_CACHE_CONTROL = "public, max-age=31536000, immutable"
+ZEROCOPY = "http.response.zerocopy"
+
+
+def asset_content_type(content_type: str) -> Optional[str]:
+    """The normalized media type to store for an upload, or None if it may not be uploaded."""
+    media_type = content_type.split(";", 1)[0].strip().lower()
+    if not media_type.startswith(ASSET_CONTENT_TYPES) or media_type.startswith(BLOCKED_CONTENT_TYPES):
+        return None
+    return media_type
+
+
+class RangeNotSatisfiable(Exception):
+    pass
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """Inclusive ``(start, end)`` for a single-range ``Range`` header, or None to send the whole body.
+
+    Malformed and multi-range headers are ignored (a full 200 is always a
+    valid answer); a range starting past the end raises RangeNotSatisfiable.
+    """
+    if not header or not header.startswith("bytes="):
+        return None
+    spec = header[len("bytes="):].strip()
+    if "," in spec:
+        return None
+    first, dash, last = spec.partition("-")
+    if not dash:
+        return None
+    try:
+        if not first:
+            # Suffix range: the last N bytes
+            length = int(last)
+            if length <= 0:
+                raise RangeNotSatisfiable()
+            return max(size - length, 0), size - 1
+        start = int(first)
+        end = int(last) if last else size - 1
+    except ValueError:
+        return None
+    if start >= size:
+        raise RangeNotSatisfiable()
+    if end < start:
+        return None
+    return start, min(end, size - 1)
+
+
+class FileRangeResponse(Response):
+    """Sends ``length`` bytes of a file from ``offset``.
+
+    When the server offers the ASGI ``http.response.zerocopy`` extension the
+    file descriptor is handed over and the kernel copies the bytes
+    (sendfile); otherwise the range is read in chunks on a worker thread.
+    """
+
+    chunk_size = 64 * 1024
+
+    def __init__(self, path: Path, offset: int, length: int, status_code: int = 200, headers=None, media_type=None):
+        super().__init__(status_code=status_code, headers=headers, media_type=media_type)
+        self.path = path
+        self.offset = offset
+        self.length = length
+
+    async def __call__(self, scope, receive, send):
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        if scope["method"] == "HEAD" or not self.length:
+            await send({"type": "http.response.body", "body": b""})
+            return
+        async with await anyio.open_file(self.path, "rb") as file:
+            if ZEROCOPY in scope.get("extensions", {}):
+                await send({"type": ZEROCOPY, "file": file.wrapped, "offset": self.offset, "count": self.length})
+                return
+            await file.seek(self.offset)
+            remaining = self.length
+            while remaining:
+                chunk = await file.read(min(self.chunk_size, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                await send({"type": "http.response.body", "body": chunk, "more_body": remaining > 0})
+            if remaining:
+                await send({"type": "http.response.body", "body": b""})
+
+
+class AssetStorage:
+    """Where uploaded bytes live; ``assets`` documents track the upload itself.
+
+    Chunks arrive in order and may be re-sent after a failure, so ``write``
+    must be idempotent for a given offset, and so must ``complete``. An
+    S3-compatible store fits the same shape: ``create`` starts a multipart
+    upload, ``write`` uploads a part, ``complete`` finishes it.
+    """
+
+    name = ""
+
+    async def create(self, asset: Dict[str, Any]) -> None:
+        pass
+
+    async def write(self, asset: Dict[str, Any], offset: int, data: bytes) -> None:
+        raise NotImplementedError
+
+    async def complete(self, asset: Dict[str, Any]) -> None:
+        pass
+
+    async def delete(self, asset: Dict[str, Any]) -> None:
+        raise NotImplementedError
+
+    def response(self, asset: Dict[str, Any], start: int, end: int, status_code: int, headers: Dict[str, str]) -> Response:
+        """The bytes ``start``..``end`` (inclusive) of a completed asset."""
+        raise NotImplementedError
+
+
+class LocalAssetStorage(AssetStorage):
+    """Files under ``root``; served with FileRangeResponse. Only for a single server or a shared volume."""
+
+    name = "local"
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+
+    def path(self, asset: Dict[str, Any]) -> Path:
+        return self.root / asset["id"][:2] / asset["id"]
+
+    def _partial(self, asset: Dict[str, Any]) -> Path:
+        return self.path(asset).with_suffix(".part")
+
+    async def create(self, asset: Dict[str, Any]) -> None:
+        def create_file():
+            self.path(asset).parent.mkdir(parents=True, exist_ok=True)
+            self._partial(asset).touch()
+
+        await anyio.to_thread.run_sync(create_file)
+
+    async def write(self, asset: Dict[str, Any], offset: int, data: bytes) -> None:
+        def write_at():
+            with self._partial(asset).open("r+b") as file:
+                file.seek(offset)
+                file.write(data)
+
+        await anyio.to_thread.run_sync(write_at)
+
+    async def complete(self, asset: Dict[str, Any]) -> None:
+        def publish():
+            if self._partial(asset).exists():
+                os.replace(self._partial(asset), self.path(asset))
+
+        await anyio.to_thread.run_sync(publish)
+
+    async def delete(self, asset: Dict[str, Any]) -> None:
+        def remove():
+            self.path(asset).unlink(missing_ok=True)
+            self._partial(asset).unlink(missing_ok=True)
+
+        await anyio.to_thread.run_sync(remove)
+
+    def response(self, asset, start, end, status_code, headers):
+        return FileRangeResponse(
+            self.path(asset), start, end - start + 1, status_code, headers, media_type=asset["content_type"]
+        )
+
+
+class GridFSAssetStorage(AssetStorage):
+    """Standard GridFS layout (``asset_content.files`` / ``.chunks``, readable by mongofiles).
+
+    Chunk documents are upserted by ``(files_id, n)`` as the upload
+    arrives, which makes re-sent chunks harmless; the files document is
+    only written on completion, so GridFS readers never see a partial file.
+    """
+
+    name = "gridfs"
+
+    def __init__(self, db, bucket: str = GRIDFS_BUCKET):
+        self.files = db[f"{bucket}.files"]
+        self.chunks = db[f"{bucket}.chunks"]
+
+    async def write(self, asset: Dict[str, Any], offset: int, data: bytes) -> None:
+        first = offset // GRIDFS_CHUNK_SIZE
+        requests = [
+            ReplaceOne(
+                {"files_id": asset["id"], "n": first + i},
+                {"files_id": asset["id"], "n": first + i, "data": data[start:start + GRIDFS_CHUNK_SIZE]},
+                upsert=True,
+            )
+            for i, start in enumerate(range(0, len(data), GRIDFS_CHUNK_SIZE))
+        ]
+        await self.chunks.bulk_write(requests, ordered=False)
+
+    async def complete(self, asset: Dict[str, Any]) -> None:
+        await self.files.replace_one(
+            {"_id": asset["id"]},
+            {
+                "_id": asset["id"],
+                "length": asset["size"],
+                "chunkSize": GRIDFS_CHUNK_SIZE,
+                "uploadDate": datetime.utcnow(),
+                "filename": asset["filename"],
+                "metadata": {"contentType": asset["content_type"], "owner_id": asset["owner_id"]},
+            },
+            upsert=True,
+        )
+
+    async def delete(self, asset: Dict[str, Any]) -> None:
+        await self.files.delete_one({"_id": asset["id"]})
+        await self.chunks.delete_many({"files_id": asset["id"]})
+
+    async def _read(self, asset_id: str, start: int, end: int) -> AsyncIterator[bytes]:
+        # One query over files_id_n for just the chunks the range touches
+        first, last = start // GRIDFS_CHUNK_SIZE, end // GRIDFS_CHUNK_SIZE
+        cursor = self.chunks.find({"files_id": asset_id, "n": {"$gte": first, "$lte": last}}, {"_id": 0, "n": 1, "data": 1})
+        async for chunk in cursor.sort("n", 1).batch_size(16):
+            base = chunk["n"] * GRIDFS_CHUNK_SIZE
+            yield bytes(chunk["data"][max(start - base, 0):end - base + 1])
+
+    def response(self, asset, start, end, status_code, headers):
+        return StreamingResponse(
+            self._read(asset["id"], start, end), status_code, headers, media_type=asset["content_type"]
+        )
+
+
+def storage_from_env(db, default_root: Path, environ: Mapping[str, str] = os.environ) -> AssetStorage:
+    kind = environ.get("ASSET_STORAGE", "gridfs")
+    if kind == "gridfs":
+        return GridFSAssetStorage(db)
+    if kind == "local":
+        return LocalAssetStorage(Path(environ.get("ASSET_DIR", str(default_root))))
+    raise ValueError(f"Unknown ASSET_STORAGE: {kind}")
+
+
+def offset_conflict(received: int) -> HTTPException:
+    return HTTPException(
+        status_code=409, detail=f"Upload is at offset {received}", headers={"Upload-Offset": str(received)}
+    )
+
+
+async def receive_chunk(assets, storage: AssetStorage, asset: Dict[str, Any], offset: int, data: bytes) -> Dict[str, Any]:
+    """Store one chunk of an upload and advance it; returns the updated asset document.
+
+    Chunks must arrive in order, each ``chunk_size`` bytes except the last.
+    A chunk for any other offset is a 409 carrying the offset to resume
+    from in ``Upload-Offset``. Concurrent copies of the same chunk race on
+    ``received``, so only one advances the upload.
+    """
+    size, received = asset["size"], asset["received"]
+    if received < size:
+        if asset["status"] != "uploading" or offset != received:
+            raise offset_conflict(received)
+        expected = min(asset["chunk_size"], size - offset)
+        if len(data) != expected:
+            raise HTTPException(status_code=400, detail=f"Chunk at offset {offset} must be {expected} bytes")
+        await storage.write(asset, offset, data)
+        asset = await assets.find_one_and_update(
+            {"id": asset["id"], "received": offset},
+            {"$set": {"received": offset + len(data)}},
+            projection={"_id": 0},
+            return_document=ReturnDocument.AFTER,
+        )
+        if asset is None:
+            raise HTTPException(status_code=409, detail="Chunk was already received")
+    if asset["received"] == size and asset["status"] != "ready":
+        # Also reached by re-sending the last chunk if completing failed the first time
+        await storage.complete(asset)
+        asset = await assets.find_one_and_update(
+            {"id": asset["id"]},
+            {"$set": {"status": "ready", "completed_at": datetime.utcnow()}},
+            projection={"_id": 0},
+            return_document=ReturnDocument.AFTER,
+        )
+    return asset
+
+
+SESSION_ASSETS_ERROR = "Sessions may only reference your completed uploads"
+
+
+async def unusable_assets(assets, owner_id: str, asset_ids: Iterable[str]) -> Set[str]:
+    """The ids among ``asset_ids`` that aren't completed uploads of ``owner_id``; one query on assets.id_unique."""
+    wanted = set(asset_ids)
+    if not wanted:
+        return set()
+    cursor = assets.find({"id": {"$in": list(wanted)}, "owner_id": owner_id, "status": "ready"}, {"_id": 0, "id": 1})
+    return wanted - {doc["id"] async for doc in cursor}
+
+
+async def check_session_assets(assets, owner_id: str, asset_ids: List[str]) -> None:
+    """400 unless every id is a completed upload of ``owner_id``."""
+    if await unusable_assets(assets, owner_id, asset_ids):
+        raise HTTPException(status_code=400, detail=SESSION_ASSETS_ERROR)
+
+
+async def check_imported_assets(assets, owner_id: str, courses: List[Dict[str, Any]]) -> List[Optional[str]]:
+    """check_session_assets for a batch of course documents at once: an error (or None) per course."""
+    def asset_ids(course):
+        return {session.get("asset_id") for session in course.get("sessions", []) if session.get("asset_id")}
+
+    unusable = await unusable_assets(assets, owner_id, (a for course in courses for a in asset_ids(course)))
+    return [SESSION_ASSETS_ERROR if asset_ids(course) & unusable else None for course in courses]
+
+
+async def expire_uploads(assets, storage: AssetStorage, cutoff: datetime) -> int:
+    """Delete uploads started before ``cutoff`` that never completed, with their partial content."""
+    expired = 0
+    cursor = assets.find({"status": "uploading", "created_at": {"$lt": cutoff}}, {"_id": 0})
+    async for asset in cursor:
+        # The document goes first: a chunk arriving now gets a 404 instead of completing a half-deleted upload
+        result = await assets.delete_one({"id": asset["id"], "status": "uploading"})
+        if result.deleted_count:
+            await storage.delete(asset)
+            expired += 1
+    return expired
+
+
+async def sweep_uploads(assets, storage: AssetStorage, interval: float, expiry: float = ASSET_UPLOAD_EXPIRY) -> None:
+    """Run expire_uploads every ``interval`` seconds until cancelled."""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            expired = await expire_uploads(assets, storage, datetime.utcnow() - timedelta(seconds=expiry))
+        except Exception:
+            logger.exception("Failed to expire abandoned uploads; will retry")
+        else:
+            if expired:
+                logger.info("Expired %d abandoned uploads", expired)
+
+
+def asset_response(request: Request, asset: Dict[str, Any], storage: AssetStorage) -> Response:
+    """Serve a completed asset, honouring If-None-Match, Range and If-Range.
+
+    Uploads share the API origin, so the browser is told never to sniff or
+    run them, and anything that isn't media is a download.
+    """
+    size = asset["size"]
+    etag = f'"{asset["id"]}"'
+    disposition = "inline" if asset["content_type"].startswith(INLINE_CONTENT_TYPES) else "attachment"
+    headers = {
+        "Accept-Ranges": "bytes",
+        "ETag": etag,
+        "Cache-Control": ASSET_CACHE_CONTROL,
+        "X-Content-Type-Options": "nosniff",
+        "Content-Security-Policy": "sandbox",
+        "Content-Disposition": disposition,
+    }
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+
+    if_range = request.headers.get("if-range")
+    try:
+        byte_range = parse_range(request.headers.get("range"), size) if if_range in (None, etag) else None
+    except RangeNotSatisfiable:
+        return Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{size}"})
+
+    start, end = byte_range or (0, size - 1)
+    headers["Content-Length"] = str(end - start + 1)
+    status_code = 200
+    if byte_range is not None:
+        status_code = 206
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    if request.method == "HEAD":
+        # Streaming responses read the body even for HEAD; answer from the asset document alone
+        return Response(status_code=status_code, headers=headers, media_type=asset["content_type"])
+    return storage.response(asset, start, end, status_code, headers)
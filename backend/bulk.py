@@ -0,0 +1,88 @@
+import json
+from typing import Any, AsyncIterable, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from pymongo.errors import BulkWriteError
+
+IMPORT_BATCH_SIZE = 1000
+
+
+async def ndjson_lines(chunks: AsyncIterable[bytes]) -> AsyncIterator[Tuple[int, bytes]]:
+    """Yield ``(line_number, line)`` for each non-blank line of an NDJSON byte stream."""
+    buffer = b""
+    line_number = 0
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            line_number += 1
+            if line.strip():
+                yield line_number, line
+    if buffer.strip():
+        yield line_number + 1, buffer
+
+
+def describe_error(error: Exception) -> str:
+    errors = getattr(error, "errors", None)
+    if callable(errors):
+        return "; ".join(
+            f"{'.'.join(str(part) for part in e['loc']) or 'record'}: {e['msg']}" for e in errors()
+        )
+    return str(error)
+
+
+async def import_ndjson(
+    collection,
+    chunks: AsyncIterable[bytes],
+    build: Callable[[Any], Dict[str, Any]],
+    batch_size: int = IMPORT_BATCH_SIZE,
+    check: Optional[Callable[[List[Dict[str, Any]]], Awaitable[List[Optional[str]]]]] = None,
+) -> List[Dict[str, Any]]:
+    """Validate NDJSON records as they stream in and insert them in unordered batches.
+
+    ``build`` turns one decoded record into the document to insert (raising
+    ``ValueError`` / ``ValidationError`` if it is invalid). ``check``, if
+    given, validates a whole batch of built documents against the database
+    before it is inserted, returning an error (or None) per document.
+    Returns one result per record: ``created`` with the document id, or
+    ``error`` with the reason. A failed insert never stops the rest of the
+    batch.
+    """
+    results: List[Dict[str, Any]] = []
+    batch: List[Tuple[Dict[str, Any], Dict[str, Any]]] = []
+
+    def fail(result, error):
+        result.update(status="error", error=error)
+        result.pop("id", None)
+
+    async def flush():
+        if not batch:
+            return
+        pending = batch[:]
+        batch.clear()
+        if check is not None:
+            errors = await check([doc for _, doc in pending])
+            for (result, _), error in zip(pending, errors):
+                if error:
+                    fail(result, error)
+            pending = [(result, doc) for result, doc in pending if result["status"] == "created"]
+            if not pending:
+                return
+        try:
+            await collection.insert_many([doc for _, doc in pending], ordered=False)
+        except BulkWriteError as e:
+            for write_error in e.details.get("writeErrors", []):
+                fail(pending[write_error["index"]][0], write_error.get("errmsg", "write failed"))
+
+    async for line_number, line in ndjson_lines(chunks):
+        try:
+            doc = build(json.loads(line))
+        except ValueError as e:
+            results.append({"line": line_number, "status": "error", "error": describe_error(e)})
+            continue
+        result = {"line": line_number, "status": "created", "id": doc["id"]}
+        results.append(result)
+        batch.append((result, doc))
+        if len(batch) >= batch_size:
+            await flush()
+    await flush()
+    return results
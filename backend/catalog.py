@@ -0,0 +1,62 @@
+from typing import Any, Dict, List, Optional, Sequence
+
+from pagination import keyset_filter, sort_spec
+
+# Fields with facet counts in the catalog response; tags is an array and is unwound
+FACET_FIELDS = ("category", "level", "tags")
+
+
+def catalog_match(
+    category: Optional[str] = None,
+    level: Optional[str] = None,
+    tags: Optional[List[str]] = None,
+    search: Optional[str] = None,
+) -> Dict[str, Any]:
+    match: Dict[str, Any] = {"published": True}
+    if category:
+        match["category"] = category
+    if level:
+        match["level"] = level
+    if tags:
+        match["tags"] = {"$all": tags}
+    if search:
+        match["$text"] = {"$search": search}
+    return match
+
+
+def catalog_page(
+    courses,
+    match: Dict[str, Any],
+    sort_keys: Sequence[str],
+    after: Optional[str],
+    limit: int,
+    projection: Optional[Dict[str, Any]] = None,
+):
+    """Cursor over one keyset page of the catalog, read off the sort index.
+
+    One extra document is fetched so the caller can tell whether there is
+    a next page, and ``projection`` shapes the page's documents.
+    """
+    return (
+        courses.find(keyset_filter(match, sort_keys, after), projection)
+        .sort(sort_spec(sort_keys))
+        .limit(limit + 1)
+    )
+
+
+def catalog_counts_pipeline(match: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """One aggregation returning the total and facet counts.
+
+    They cover every course matching the filters, whatever page is being
+    read; the page itself comes from ``catalog_page``, since a page inside
+    ``$facet`` can't use an index for its cursor, sort or limit.
+    """
+    facets: Dict[str, List[Dict[str, Any]]] = {"total": [{"$count": "count"}]}
+    for field in FACET_FIELDS:
+        stages: List[Dict[str, Any]] = []
+        if field == "tags":
+            stages.append({"$unwind": "$tags"})
+        stages.append({"$group": {"_id": f"${field}", "count": {"$sum": 1}}})
+        stages.append({"$sort": {"count": -1, "_id": 1}})
+        facets[field] = stages
+    return [{"$match": match}, {"$facet": facets}]
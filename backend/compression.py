@@ -0,0 +1,174 @@
+import time
+import zlib
+from typing import Dict, Optional, Tuple
+
+from starlette.datastructures import Headers, MutableHeaders
+
+from metrics import COMPRESSION_BYTES, COMPRESSION_CPU, COMPRESSION_RATIO
+
+try:
+    import brotli
+except ImportError:  # optional; without it clients are offered gzip only
+    brotli = None
+
+COMPRESSIBLE_TYPES = (
+    "text/",
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+)
+# No body, or a body whose bytes the client addresses directly (Range)
+UNCOMPRESSED_STATUSES = (204, 206, 304)
+
+
+def available_encodings() -> Tuple[str, ...]:
+    """Supported encodings in server preference order."""
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def negotiate(accept_encoding: str, available: Tuple[str, ...]) -> Optional[str]:
+    """Pick the encoding the client ranks highest (q-value), breaking ties by ``available`` order."""
+    weights: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[name] = q
+    wildcard = weights.get("*", 0.0)
+    ranked = [(weights.get(name, wildcard), -i, name) for i, name in enumerate(available)]
+    q, _, name = max(ranked)
+    return name if q > 0 else None
+
+
+class _Encoder:
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int):
+        self.encoding = encoding
+        if encoding == "br":
+            self._compressor = brotli.Compressor(quality=brotli_quality)
+        else:
+            self._compressor = zlib.compressobj(gzip_level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.cpu_seconds = 0.0
+
+    def encode(self, data: bytes, final: bool) -> bytes:
+        # Streamed chunks are flushed so each one (e.g. an NDJSON batch) reaches the client immediately
+        started = time.thread_time()
+        if self.encoding == "br":
+            out = self._compressor.process(data) + (self._compressor.finish() if final else self._compressor.flush())
+        else:
+            out = self._compressor.compress(data) + self._compressor.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+        self.cpu_seconds += time.thread_time() - started
+        self.bytes_in += len(data)
+        self.bytes_out += len(out)
+        return out
+
+    def record(self) -> None:
+        COMPRESSION_BYTES.inc(self.encoding, "in", amount=self.bytes_in)
+        COMPRESSION_BYTES.inc(self.encoding, "out", amount=self.bytes_out)
+        COMPRESSION_CPU.observe(self.cpu_seconds, self.encoding)
+        if self.bytes_in:
+            COMPRESSION_RATIO.observe(self.bytes_out / self.bytes_in, self.encoding)
+
+
+def _compressible(headers: Headers, status: int) -> bool:
+    if status in UNCOMPRESSED_STATUSES or "content-encoding" in headers:
+        return False
+    return headers.get("content-type", "").startswith(COMPRESSIBLE_TYPES)
+
+
+def _mark_negotiated(headers: MutableHeaders) -> None:
+    headers.add_vary_header("Accept-Encoding")
+    etag = headers.get("etag")
+    if etag and not etag.startswith("W/"):
+        headers["ETag"] = f"W/{etag}"
+
+
+class CompressionMiddleware:
+    """Pure ASGI gzip/brotli compression negotiated from Accept-Encoding.
+
+    Complete bodies smaller than ``minimum_size`` are sent as is. Streamed
+    bodies (``more_body``) are always compressed chunk by chunk, since their
+    final size is unknown when the headers go out. Compressed responses get
+    ``Vary: Accept-Encoding`` and a weak ETag, because the bytes differ from
+    the identity representation the strong ETag describes. A 304 to a client
+    that negotiated an encoding gets the same, so caches can match it to the
+    compressed response they stored and freshen it.
+    """
+
+    def __init__(self, app, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 4):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate(Headers(scope=scope).get("accept-encoding", ""), available_encodings())
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message: Optional[dict] = None
+        encoder: Optional[_Encoder] = None
+        passthrough = False
+
+        async def send_compressed(message):
+            nonlocal start_message, encoder, passthrough
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            if passthrough:
+                await send(message)
+                return
+            if message["type"] != "http.response.body":
+                # e.g. http.response.zerocopy: the server sends the file itself, so leave it alone
+                if encoder is None:
+                    passthrough = True
+                    await send(start_message)
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if encoder is None:
+                headers = MutableHeaders(raw=start_message["headers"])
+                if start_message["status"] == 304:
+                    _mark_negotiated(headers)
+                if not _compressible(headers, start_message["status"]) or (
+                    not more_body and len(body) < self.minimum_size
+                ):
+                    passthrough = True
+                    await send(start_message)
+                    await send(message)
+                    return
+
+                encoder = _Encoder(encoding, self.gzip_level, self.brotli_quality)
+                body = encoder.encode(body, final=not more_body)
+                headers["Content-Encoding"] = encoding
+                _mark_negotiated(headers)
+                if more_body:
+                    del headers["Content-Length"]
+                else:
+                    headers["Content-Length"] = str(len(body))
+                await send(start_message)
+            else:
+                body = encoder.encode(body, final=not more_body)
+
+            await send({"type": "http.response.body", "body": body, "more_body": more_body})
+            if not more_body:
+                encoder.record()
+
+        await self.app(scope, receive, send_compressed)
@@ -0,0 +1,180 @@
+import asyncio
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Mapping, Optional, Sequence
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ReadPreference
+from pymongo.monitoring import ConnectionPoolListener
+
+logger = logging.getLogger(__name__)
+
+READ_PREFERENCES = {
+    "primary": ReadPreference.PRIMARY,
+    "primaryPreferred": ReadPreference.PRIMARY_PREFERRED,
+    "secondary": ReadPreference.SECONDARY,
+    "secondaryPreferred": ReadPreference.SECONDARY_PREFERRED,
+    "nearest": ReadPreference.NEAREST,
+}
+
+
+def _optional_int(value: Optional[str]) -> Optional[int]:
+    return int(value) if value not in (None, "") else None
+
+
+@dataclass
+class DatabaseSettings:
+    url: str
+    db_name: str
+    max_pool_size: int = 100
+    min_pool_size: int = 0
+    wait_queue_timeout_ms: Optional[int] = None
+    server_selection_timeout_ms: int = 30000
+    compressors: str = ""  # e.g. "zstd,snappy,zlib"; unavailable codecs are skipped by the driver
+    list_read_preference: str = "primary"
+    warm_connections: int = 1
+
+    @classmethod
+    def from_env(cls, environ: Mapping[str, str] = os.environ) -> "DatabaseSettings":
+        min_pool_size = int(environ.get("MONGO_MIN_POOL_SIZE", "0"))
+        settings = cls(
+            url=environ["MONGO_URL"],
+            db_name=environ["DB_NAME"],
+            max_pool_size=int(environ.get("MONGO_MAX_POOL_SIZE", "100")),
+            min_pool_size=min_pool_size,
+            wait_queue_timeout_ms=_optional_int(environ.get("MONGO_WAIT_QUEUE_TIMEOUT_MS")),
+            server_selection_timeout_ms=int(environ.get("MONGO_SERVER_SELECTION_TIMEOUT_MS", "30000")),
+            compressors=environ.get("MONGO_COMPRESSORS", ""),
+            list_read_preference=environ.get("MONGO_LIST_READ_PREFERENCE", "primary"),
+            warm_connections=int(environ.get("MONGO_WARM_CONNECTIONS", str(max(min_pool_size, 1)))),
+        )
+        if settings.list_read_preference not in READ_PREFERENCES:
+            raise ValueError(f"Unknown MONGO_LIST_READ_PREFERENCE: {settings.list_read_preference}")
+        return settings
+
+    def client_options(self) -> Dict[str, Any]:
+        options: Dict[str, Any] = {
+            "maxPoolSize": self.max_pool_size,
+            "minPoolSize": self.min_pool_size,
+            "waitQueueTimeoutMS": self.wait_queue_timeout_ms,
+            "serverSelectionTimeoutMS": self.server_selection_timeout_ms,
+        }
+        if self.compressors:
+            options["compressors"] = self.compressors
+        return options
+
+
+class PoolMetrics(ConnectionPoolListener):
+    """Connection pool counters fed by the driver's CMAP events.
+
+    The driver publishes these from Motor's executor threads. A checkout's
+    start and finish happen on the same thread, so the start time is kept
+    thread-local to measure how long the request waited for a connection.
+    """
+
+    def __init__(self, clock=time.perf_counter):
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.open_connections = 0
+        self.in_use = 0
+        self.waiting = 0
+        self.checkouts = 0
+        self.checkout_failures = 0
+        self.checkout_wait_seconds_total = 0.0
+        self.checkout_wait_seconds_max = 0.0
+
+    def _end_wait(self) -> float:
+        started = getattr(self._local, "started", None)
+        self._local.started = None
+        return self._clock() - started if started is not None else 0.0
+
+    def connection_check_out_started(self, event):
+        self._local.started = self._clock()
+        with self._lock:
+            self.waiting += 1
+
+    def connection_checked_out(self, event):
+        waited = self._end_wait()
+        with self._lock:
+            self.waiting -= 1
+            self.in_use += 1
+            self.checkouts += 1
+            self.checkout_wait_seconds_total += waited
+            self.checkout_wait_seconds_max = max(self.checkout_wait_seconds_max, waited)
+
+    def connection_check_out_failed(self, event):
+        self._end_wait()
+        with self._lock:
+            self.waiting -= 1
+            self.checkout_failures += 1
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            self.in_use -= 1
+
+    def connection_created(self, event):
+        with self._lock:
+            self.open_connections += 1
+
+    def connection_closed(self, event):
+        with self._lock:
+            self.open_connections -= 1
+
+    def connection_ready(self, event):
+        pass
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "open_connections": self.open_connections,
+                "in_use": self.in_use,
+                "waiting": self.waiting,
+                "checkouts": self.checkouts,
+                "checkout_failures": self.checkout_failures,
+                "checkout_wait_seconds_total": self.checkout_wait_seconds_total,
+                "checkout_wait_seconds_avg": (
+                    self.checkout_wait_seconds_total / self.checkouts if self.checkouts else 0.0
+                ),
+                "checkout_wait_seconds_max": self.checkout_wait_seconds_max,
+            }
+
+
+def create_client(settings: DatabaseSettings, listeners: Sequence[Any] = ()) -> AsyncIOMotorClient:
+    """Build the Motor client; ``listeners`` are pymongo monitoring listeners (pool, command)."""
+    return AsyncIOMotorClient(settings.url, event_listeners=list(listeners), **settings.client_options())
+
+
+def list_database(client: AsyncIOMotorClient, settings: DatabaseSettings):
+    """The database handle list endpoints read through, honouring MONGO_LIST_READ_PREFERENCE."""
+    return client.get_database(settings.db_name, read_preference=READ_PREFERENCES[settings.list_read_preference])
+
+
+async def warm_up(client: AsyncIOMotorClient, connections: int) -> None:
+    """Fail fast if MongoDB is unreachable, then open ``connections`` pooled sockets.
+
+    Concurrent pings each need their own connection, so the pool grows to
+    ``connections`` before the first real request arrives.
+    """
+    started = time.perf_counter()
+    await asyncio.gather(*(client.admin.command("ping") for _ in range(max(connections, 1))))
+    logger.info(
+        "MongoDB reachable; warmed %d connection(s) in %.1f ms",
+        max(connections, 1),
+        (time.perf_counter() - started) * 1000,
+    )
@@ -0,0 +1,56 @@
+import hashlib
+import os
+from typing import Any, Dict, Iterable, Optional
+
+from fastapi import Request, Response
+
+# Public profiles and published courses sit behind a CDN; keep them briefly and revalidate with ETags
+PUBLIC_MAX_AGE = int(os.environ.get("PUBLIC_CACHE_MAX_AGE", "60"))
+PUBLIC_CACHE_CONTROL = f"public, max-age={PUBLIC_MAX_AGE}, stale-while-revalidate={PUBLIC_MAX_AGE * 5}"
+PRIVATE_CACHE_CONTROL = "private, no-cache"
+# Shared caches may keep it, but every use goes back to the origin (with If-None-Match)
+REVALIDATE_CACHE_CONTROL = "public, no-cache"
+
+
+def make_etag(*parts: Any, weak: bool = False) -> str:
+    """ETag over ``parts``; equal parts always produce the same tag.
+
+    A weak tag only promises an equivalent body, for responses carrying a
+    value (like a view count) that may change without changing the tag.
+    """
+    digest = hashlib.blake2b(repr(parts).encode(), digest_size=16).hexdigest()
+    return f'W/"{digest}"' if weak else f'"{digest}"'
+
+
+def document_etag(doc: Dict[str, Any], *variant: Any, weak: bool = False) -> str:
+    return make_etag(doc.get("id"), doc.get("version", 0), *variant, weak=weak)
+
+
+def list_etag(docs: Iterable[Dict[str, Any]], *variant: Any) -> str:
+    """ETag for a list response, from the id and version of every document in it."""
+    return make_etag([(doc.get("id"), doc.get("version", 0)) for doc in docs], *variant)
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # If-None-Match uses the weak comparison, so W/"x" matches "x"
+    candidates = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return etag.removeprefix("W/") in candidates
+
+
+def conditional(request: Request, response: Response, etag: str, cache_control: str) -> Optional[Response]:
+    """Set validator headers on ``response``; return a bodiless 304 if the client already has ``etag``.
+
+    The 304 carries every header already set on ``response`` (ETag,
+    Cache-Control, Vary, pagination cursor) so caches can refresh them.
+    """
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = cache_control
+    if not etag_matches(request, etag):
+        return None
+    headers = {k: v for k, v in response.headers.items() if k not in ("content-length", "content-type")}
+    return Response(status_code=304, headers=headers)
@@ -0,0 +1,182 @@
+import logging
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+from pymongo import ASCENDING, TEXT, IndexModel
+from pymongo.errors import OperationFailure
+
+from status_rollup import STATUS_CHECK_TTL_SECONDS, STATUS_ROLLUP_TTL_SECONDS
+
+logger = logging.getLogger(__name__)
+
+# Indexes backing the hot queries in server.py, keyed by collection name.
+# Every index is named explicitly so the report below can diff by name.
+INDEXES: Dict[str, List[IndexModel]] = {
+    "users": [
+        # get_current_user, update_user_profile, /auth/google upsert
+        IndexModel([("google_id", ASCENDING)], name="google_id_unique", unique=True),
+        # existence check when /users/{user_id}/stats is first built
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+    ],
+    "badges": [
+        # create_badge duplicate check
+        IndexModel(
+            [("user_id", ASCENDING), ("course_id", ASCENDING), ("course_category", ASCENDING)],
+            name="user_course_unique",
+            unique=True,
+        ),
+        # /badges/me and /badges/user/{id}, paged in BADGE_SORT order
+        IndexModel([("user_id", ASCENDING), ("earned_at", ASCENDING), ("id", ASCENDING)], name="user_earned_at"),
+        # update_badge_course_title
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        # /leaderboard/*: time-windowed rankings, overall and per category
+        IndexModel([("earned_at", ASCENDING)], name="earned_at"),
+        IndexModel([("course_category", ASCENDING), ("earned_at", ASCENDING)], name="category_earned_at"),
+        # Leaderboards.badge_added: can an unranked learner or course now reach the cutoff?
+        IndexModel(
+            [("course_id", ASCENDING), ("course_category", ASCENDING), ("earned_at", ASCENDING)],
+            name="course_earned_at",
+        ),
+    ],
+    "courses": [
+        # get_course and the ownership checks on update/publish/delete
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        # /courses/created and /courses/created/{user_id}, paged in COURSE_SORT order
+        IndexModel([("created_by", ASCENDING), ("created_at", ASCENDING), ("id", ASCENDING)], name="created_by_created_at"),
+        IndexModel(
+            [("created_by", ASCENDING), ("published", ASCENDING), ("created_at", ASCENDING), ("id", ASCENDING)],
+            name="created_by_published_created_at",
+        ),
+        # /courses catalog: published listing in COURSE_SORT order, and ?q= search
+        IndexModel([("published", ASCENDING), ("created_at", ASCENDING), ("id", ASCENDING)], name="published_created_at"),
+        IndexModel([("title", TEXT), ("description", TEXT)], name="title_description_text"),
+        # delete_asset: refuse while a session still uses the asset
+        IndexModel([("sessions.asset_id", ASCENDING)], name="sessions_asset_id"),
+    ],
+    "assets": [
+        # upload chunks, content reads and check_session_assets
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        # expire_uploads: unfinished uploads by age
+        IndexModel([("status", ASCENDING), ("created_at", ASCENDING)], name="status_created_at"),
+    ],
+    # GridFSAssetStorage writes chunks itself, so it creates the GridFS spec indexes (under the drivers' names)
+    "asset_content.chunks": [
+        IndexModel([("files_id", ASCENDING), ("n", ASCENDING)], name="files_id_1_n_1", unique=True),
+    ],
+    "asset_content.files": [
+        IndexModel([("filename", ASCENDING), ("uploadDate", ASCENDING)], name="filename_1_uploadDate_1"),
+    ],
+    "progress": [
+        # get_progress, and the upsert key for ProgressBuffer.flush
+        IndexModel(
+            [("user_id", ASCENDING), ("course_category", ASCENDING), ("course_id", ASCENDING)],
+            name="user_course_unique",
+            unique=True,
+        ),
+    ],
+    "user_stats": [
+        # /users/{user_id}/stats and the incremental updates from badge and course writes
+        IndexModel([("user_id", ASCENDING)], name="user_id_unique", unique=True),
+    ],
+    "status_checks": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        # /status, paged in STATUS_SORT order; /status/latest walks it backwards
+        IndexModel([("timestamp", ASCENDING), ("id", ASCENDING)], name="timestamp_id"),
+        # /status/latest?client_name=
+        IndexModel(
+            [("client_name", ASCENDING), ("timestamp", ASCENDING), ("id", ASCENDING)], name="client_timestamp_id"
+        ),
+        # Raw checks expire; dashboards read status_rollups instead
+        IndexModel([("timestamp", ASCENDING)], name="timestamp_ttl", expireAfterSeconds=STATUS_CHECK_TTL_SECONDS),
+    ],
+    "status_rollups": [
+        # record_status_check upsert key
+        IndexModel([("client_name", ASCENDING), ("bucket", ASCENDING)], name="client_bucket_unique", unique=True),
+        # /status/rollup range on bucket, and expiry of old intervals
+        IndexModel([("bucket", ASCENDING)], name="bucket_ttl", expireAfterSeconds=STATUS_ROLLUP_TTL_SECONDS),
+    ],
+}
+
+
+@dataclass
+class IndexReport:
+    created: Dict[str, List[str]] = field(default_factory=dict)
+    missing: Dict[str, List[str]] = field(default_factory=dict)
+    extra: Dict[str, List[str]] = field(default_factory=dict)
+    failed: Dict[str, List[str]] = field(default_factory=dict)
+    # TTL indexes whose expireAfterSeconds differs from the declared value
+    drifted: Dict[str, List[str]] = field(default_factory=dict)
+    modified: Dict[str, List[str]] = field(default_factory=dict)
+
+
+async def index_report(db, indexes: Dict[str, List[IndexModel]] = INDEXES) -> IndexReport:
+    """Compare the declared indexes against what exists in the database."""
+    report = IndexReport()
+    for collection, models in indexes.items():
+        info = await db[collection].index_information()
+        existing = set(info.keys())
+        existing.discard("_id_")
+        declared = {model.document["name"] for model in models}
+        missing = sorted(declared - existing)
+        extra = sorted(existing - declared)
+        # create_indexes leaves an existing index alone, so a changed TTL has to be spotted here
+        drifted = sorted(
+            model.document["name"]
+            for model in models
+            if model.document["name"] in info
+            and info[model.document["name"]].get("expireAfterSeconds") != model.document.get("expireAfterSeconds")
+        )
+        if missing:
+            report.missing[collection] = missing
+        if extra:
+            report.extra[collection] = extra
+        if drifted:
+            report.drifted[collection] = drifted
+    return report
+
+
+async def ensure_indexes(db, indexes: Dict[str, List[IndexModel]] = INDEXES) -> IndexReport:
+    """Create any missing declared indexes and apply changed TTLs; safe to run on every startup.
+
+    A failure on one index (e.g. duplicate data blocking a unique index) is
+    logged and reported rather than aborting startup.
+    """
+    report = await index_report(db, indexes)
+    for collection, names in report.missing.items():
+        for model in indexes[collection]:
+            name = model.document["name"]
+            if name not in names:
+                continue
+            try:
+                await db[collection].create_indexes([model])
+            except OperationFailure as e:
+                logger.error("Failed to create index %s.%s: %s", collection, name, e)
+                report.failed.setdefault(collection, []).append(name)
+            else:
+                report.created.setdefault(collection, []).append(name)
+
+    for collection, names in report.drifted.items():
+        for model in indexes[collection]:
+            name = model.document["name"]
+            if name not in names:
+                continue
+            expire = model.document.get("expireAfterSeconds")
+            if expire is None:
+                # collMod can change a TTL but not drop one; that takes a rebuild
+                logger.warning("Index %s.%s has a TTL that is no longer declared", collection, name)
+                continue
+            try:
+                await db.command("collMod", collection, index={"name": name, "expireAfterSeconds": expire})
+            except OperationFailure as e:
+                logger.error("Failed to update the TTL of index %s.%s: %s", collection, name, e)
+                report.failed.setdefault(collection, []).append(name)
+            else:
+                report.modified.setdefault(collection, []).append(name)
+
+    for collection, names in report.created.items():
+        logger.info("Created indexes on %s: %s", collection, ", ".join(names))
+    for collection, names in report.modified.items():
+        logger.info("Updated index TTLs on %s: %s", collection, ", ".join(names))
+    for collection, names in report.extra.items():
+        logger.warning("Undeclared indexes on %s: %s", collection, ", ".join(names))
+    return report
@@ -0,0 +1,141 @@
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Literal, Optional, Tuple
+
+from cache import TTLCache
+
+# Rankings are computed to this depth and sliced per request, so ?limit= doesn't multiply cache entries
+TOP_N = 100
+
+LeaderboardWindow = Literal["all", "7d", "30d", "365d"]
+WINDOWS = {"7d": timedelta(days=7), "30d": timedelta(days=30), "365d": timedelta(days=365)}
+
+
+def badge_match(category: Optional[str], window: str, now: datetime) -> Dict[str, Any]:
+    """Badge filter for a ranking; served by the category_earned_at / earned_at indexes."""
+    match: Dict[str, Any] = {}
+    if category:
+        match["course_category"] = category
+    if window in WINDOWS:
+        match["earned_at"] = {"$gte": now - WINDOWS[window]}
+    return match
+
+
+def learners_pipeline(match: Dict[str, Any], limit: int = TOP_N) -> List[Dict[str, Any]]:
+    return [
+        {"$match": match},
+        {"$group": {"_id": "$user_id", "badges": {"$sum": 1}, "average_score": {"$avg": "$quiz_score"}}},
+        {"$sort": {"badges": -1, "average_score": -1, "_id": 1}},
+        {"$limit": limit},
+        # Joined after $limit, so at most ``limit`` lookups on users.id_unique
+        {"$lookup": {"from": "users", "localField": "_id", "foreignField": "id", "as": "user"}},
+        {"$project": {
+            "_id": 0,
+            "user_id": "$_id",
+            "badges": 1,
+            "average_score": 1,
+            "name": {"$arrayElemAt": ["$user.name", 0]},
+            "picture": {"$arrayElemAt": ["$user.picture", 0]},
+        }},
+    ]
+
+
+def courses_pipeline(match: Dict[str, Any], limit: int = TOP_N) -> List[Dict[str, Any]]:
+    return [
+        {"$match": match},
+        {"$group": {
+            "_id": {"course_id": "$course_id", "course_category": "$course_category"},
+            "completions": {"$sum": 1},
+            "average_score": {"$avg": "$quiz_score"},
+            # Built-in catalog badges start with an empty title, so prefer any non-empty one
+            "course_title": {"$max": "$course_title"},
+        }},
+        {"$sort": {"completions": -1, "average_score": -1, "_id": 1}},
+        {"$limit": limit},
+        {"$project": {
+            "_id": 0,
+            "course_id": "$_id.course_id",
+            "course_category": "$_id.course_category",
+            "course_title": 1,
+            "completions": 1,
+            "average_score": 1,
+        }},
+    ]
+
+
+# kind -> (pipeline builder, fields identifying a row, field counting badges)
+RANKINGS = {
+    "learners": (learners_pipeline, ("user_id",), "badges"),
+    "courses": (courses_pipeline, ("course_id", "course_category"), "completions"),
+}
+
+
+def _id_order(value: Any) -> Tuple[bool, Any]:
+    # MongoDB sorts numbers before strings, and course_id is an int for the built-in catalog
+    return isinstance(value, str), value
+
+
+def rank_key(row: Dict[str, Any], identity: Tuple[str, ...], count_field: str) -> Tuple[Any, ...]:
+    """Python twin of the pipelines' $sort: count and average score descending, then the group _id."""
+    return (-row[count_field], -row["average_score"], *(_id_order(row[field]) for field in identity))
+
+
+class Leaderboards:
+    """Cached badge rankings, refreshed in place as badges are awarded.
+
+    Each (kind, category, window) ranking is aggregated once to TOP_N rows
+    and cached for ``ttl`` seconds. ``badge_added`` increments the matching
+    row of every cached ranking the badge belongs to and re-sorts it; that
+    is exact because only that row's count went up. If the learner or
+    course is not ranked yet, it can only enter the list if the list is
+    short of TOP_N or its new count reaches the last row's; that is checked
+    with one indexed ``count_documents``, and only then is the ranking
+    dropped and rebuilt on the next read. Windowed rankings also rely on
+    the TTL to let old badges fall out of the window.
+    """
+
+    def __init__(self, maxsize: int = 256, ttl: float = 60.0, clock=datetime.utcnow):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._clock = clock
+
+    async def ranking(self, badges, kind: str, category: Optional[str], window: str, limit: int) -> List[Dict[str, Any]]:
+        key = (kind, category, window)
+        rows = self._cache.get(key)
+        if rows is None:
+            build_pipeline, _, _ = RANKINGS[kind]
+            rows = await badges.aggregate(build_pipeline(badge_match(category, window, self._clock()))).to_list(TOP_N)
+            self._cache.set(key, rows)
+        return rows[:limit]
+
+    async def badge_added(self, badges, badge: Dict[str, Any]) -> None:
+        """Fold a badge already inserted into ``badges`` into every cached ranking it belongs to."""
+        unranked = []
+        for key, rows in self._cache.items():
+            kind, category, _ = key
+            if category and badge["course_category"] != category:
+                continue
+            _, identity, count_field = RANKINGS[kind]
+            row = next((r for r in rows if all(r[f] == badge[f] for f in identity)), None)
+            if row is None:
+                unranked.append((key, rows))
+                continue
+            count = row[count_field]
+            row["average_score"] = (row["average_score"] * count + badge["quiz_score"]) / (count + 1)
+            row[count_field] = count + 1
+            rows.sort(key=lambda r: rank_key(r, identity, count_field))
+
+        # Most badges go to learners and courses far below the cutoff; those leave the ranking as it is
+        for key, rows in unranked:
+            kind, category, window = key
+            _, identity, count_field = RANKINGS[kind]
+            if len(rows) >= TOP_N:
+                match = {**badge_match(category, window, self._clock()), **{f: badge[f] for f in identity}}
+                # Ties at the cutoff are broken by average score and _id, so reaching it is enough to enter
+                if await badges.count_documents(match) < rows[-1][count_field]:
+                    continue
+            self._cache.pop(key)
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return self._cache.stats()
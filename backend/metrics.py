@@ -0,0 +1,266 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from pymongo.monitoring import CommandListener
+
+# Request latency buckets in seconds (Prometheus client defaults)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 7.5, 10.0)
+# Finer buckets for sub-request spans such as a single DB command
+SPAN_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+# Compressed size / original size
+RATIO_BUCKETS = (0.05, 0.1, 0.15, 0.2, 0.3, 0.4, 0.5, 0.7, 0.9, 1.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name, help, labels=()):
+        super().__init__(name, help, labels)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *label_values: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0.0) + amount
+
+    def value(self, *label_values: str) -> float:
+        return self._values.get(label_values, 0.0)
+
+    def render(self) -> List[str]:
+        lines = self.header()
+        with self._lock:
+            items = list(self._values.items())
+        for label_values, value in items:
+            lines.append(f"{self.name}{_format_labels(self.labels, label_values)} {_format_number(value)}")
+        return lines
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, *label_values: str, amount: float = 1.0) -> None:
+        self.inc(*label_values, amount=-amount)
+
+    def set(self, *label_values: str, value: float) -> None:
+        with self._lock:
+            self._values[label_values] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help, labels=(), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts (+Inf last), sum, count]
+        self._series: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, *label_values: str) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def count(self, *label_values: str) -> int:
+        series = self._series.get(label_values)
+        return series[2] if series else 0
+
+    def render(self) -> List[str]:
+        lines = self.header()
+        with self._lock:
+            items = [(labels, (list(s[0]), s[1], s[2])) for labels, s in self._series.items()]
+        for label_values, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = f'le="{_format_number(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labels, label_values, le)} {cumulative}")
+            labels = _format_labels(self.labels, label_values)
+            lines.append(f"{self.name}_sum{labels} {_format_number(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+        self._collectors: List[Callable[[], Iterable[_Metric]]] = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name, help, labels=()) -> Counter:
+        return self.register(Counter(name, help, labels))
+
+    def gauge(self, name, help, labels=()) -> Gauge:
+        return self.register(Gauge(name, help, labels))
+
+    def histogram(self, name, help, labels=(), buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, help, labels, buckets))
+
+    def add_collector(self, collector: Callable[[], Iterable[_Metric]]) -> None:
+        """Register a callable producing metrics at scrape time (e.g. from a stats snapshot)."""
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        for collector in self._collectors:
+            for metric in collector():
+                lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+HTTP_REQUESTS = REGISTRY.counter(
+    "http_requests_total", "HTTP requests by route and status code", ("method", "route", "status"))
+HTTP_LATENCY = REGISTRY.histogram(
+    "http_request_duration_seconds", "HTTP request latency by route", ("method", "route"))
+HTTP_IN_FLIGHT = REGISTRY.gauge(
+    "http_requests_in_flight", "HTTP requests currently being served", ("method",))
+SPAN_LATENCY = REGISTRY.histogram(
+    "app_span_duration_seconds", "Time spent in named sections of a handler", ("route", "span"), SPAN_BUCKETS)
+MONGO_LATENCY = REGISTRY.histogram(
+    "mongodb_command_duration_seconds", "MongoDB command latency", ("command", "outcome"), SPAN_BUCKETS)
+
+COMPRESSION_BYTES = REGISTRY.counter(
+    "http_compression_bytes_total", "Response bytes before (in) and after (out) compression", ("encoding", "direction"))
+COMPRESSION_CPU = REGISTRY.histogram(
+    "http_compression_cpu_seconds", "CPU time spent compressing one response", ("encoding",), SPAN_BUCKETS)
+COMPRESSION_RATIO = REGISTRY.histogram(
+    "http_compression_ratio", "Compressed size as a fraction of the original", ("encoding",), RATIO_BUCKETS)
+RATE_LIMITED = REGISTRY.counter(
+    "http_rate_limited_total", "Requests rejected with 429, by rate limit route and reason", ("route", "reason"))
+
+_current_scope: ContextVar[Optional[dict]] = ContextVar("metrics_scope", default=None)
+
+
+def route_label(scope: Optional[dict]) -> str:
+    """The matched route template, so /courses/{course_id} is one series rather than one per id."""
+    route = scope.get("route") if scope else None
+    return getattr(route, "path", None) or "unmatched"
+
+
+@contextmanager
+def span(name: str):
+    """Time a section of the current request, labelled with its route."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        SPAN_LATENCY.observe(time.perf_counter() - started, route_label(_current_scope.get()), name)
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware recording latency, status counts and in-flight requests.
+
+    Latency covers the full response, including streamed bodies.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        token = _current_scope.set(scope)
+        HTTP_IN_FLIGHT.inc(method)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            HTTP_IN_FLIGHT.dec(method)
+            route = route_label(scope)
+            HTTP_LATENCY.observe(elapsed, method, route)
+            HTTP_REQUESTS.inc(method, route, str(status_code))
+            _current_scope.reset(token)
+
+
+class CommandMetrics(CommandListener):
+    """Times every MongoDB command from the driver's command monitoring events."""
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        MONGO_LATENCY.observe(event.duration_micros / 1e6, event.command_name, "success")
+
+    def failed(self, event):
+        MONGO_LATENCY.observe(event.duration_micros / 1e6, event.command_name, "failure")
+
+
+def snapshot_gauges(
+    name: str, help: str, snapshots: Dict[str, Dict[str, Any]], label: Optional[str] = None
+) -> List[Gauge]:
+    """Turn stats dicts (pool metrics, cache stats) into one gauge per numeric key.
+
+    ``snapshots`` maps a value of ``label`` to its stats dict; pass
+    ``{"": stats}`` with no label for a single unlabelled snapshot.
+    """
+    gauges: Dict[str, Gauge] = {}
+    for label_value, snapshot in snapshots.items():
+        label_values = (label_value,) if label else ()
+        for key, value in snapshot.items():
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                continue
+            gauge = gauges.get(key)
+            if gauge is None:
+                gauge = gauges[key] = Gauge(f"{name}_{key}", f"{help} ({key})", (label,) if label else ())
+            gauge.set(*label_values, value=value)
+    return list(gauges.values())
@@ -0,0 +1,171 @@
+import base64
+import json
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from pymongo import ASCENDING, ReadPreference
+
+from http_cache import conditional, list_etag
+from metrics import span
+from response_cache import CachedResponse, ResponseCache, request_key
+from serialization import fast_json, render_json
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+@dataclass
+class PageParams:
+    after: Optional[str]
+    limit: Optional[int]
+
+
+def page_params(
+    after: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+) -> PageParams:
+    return PageParams(after=after, limit=limit)
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"d": value.isoformat()}
+    return value
+
+
+def _decode_value(value: Any) -> Any:
+    if isinstance(value, dict):
+        return datetime.fromisoformat(value["d"])
+    return value
+
+
+def encode_cursor(doc: Dict[str, Any], sort_keys: Sequence[str]) -> str:
+    """Opaque cursor pointing just past ``doc`` in ``sort_keys`` order."""
+    raw = json.dumps([_encode_value(doc.get(key)) for key in sort_keys], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort_keys: Sequence[str]) -> List[Any]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(values, list) or len(values) != len(sort_keys):
+            raise ValueError("cursor does not match sort keys")
+        return [_decode_value(value) for value in values]
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def keyset_filter(query: Dict[str, Any], sort_keys: Sequence[str], after: Optional[str]) -> Dict[str, Any]:
+    """Extend ``query`` to match only documents sorted after the cursor.
+
+    For sort keys (a, b) this is ``a > x OR (a == x AND b > y)``.
+    """
+    if not after:
+        return query
+    values = decode_cursor(after, sort_keys)
+    branches = []
+    for i, key in enumerate(sort_keys):
+        branch = {sort_keys[j]: values[j] for j in range(i)}
+        branch[key] = {"$gt": values[i]}
+        branches.append(branch)
+    return {"$and": [query, {"$or": branches}]} if query else {"$or": branches}
+
+
+def sort_spec(sort_keys: Sequence[str]) -> List[Tuple[str, int]]:
+    return [(key, ASCENDING) for key in sort_keys]
+
+
+def wants_ndjson(request: Request) -> bool:
+    return NDJSON_MEDIA_TYPE in request.headers.get("accept", "")
+
+
+def ndjson_response(cursor, model) -> StreamingResponse:
+    """Stream each document as one JSON line while the Motor cursor is iterated."""
+    async def lines():
+        async for doc in cursor:
+            yield model(**doc).json() + "\n"
+
+    return StreamingResponse(lines(), media_type=NDJSON_MEDIA_TYPE)
+
+
+async def list_page(
+    collection,
+    query: Dict[str, Any],
+    sort_keys: Sequence[str],
+    model,
+    page: PageParams,
+    request: Request,
+    response: Response,
+    projection: Optional[Dict[str, Any]] = None,
+    cache_control: Optional[str] = None,
+    cache: Optional[ResponseCache] = None,
+    cache_tags: Sequence[str] = (),
+):
+    """Serve one keyset page of ``collection`` as a JSON list, or stream it as NDJSON.
+
+    JSON pages carry the cursor for the next page in the X-Next-Cursor
+    header. NDJSON streams run to the end of the result set unless the
+    client passes an explicit ``limit``. With ``cache_control`` set, JSON
+    pages get an ETag over the page's document versions and a matching
+    If-None-Match is answered with 304 before any model is built.
+
+    With ``cache`` set, rendered JSON pages are kept in the response cache
+    under the request path and query, tagged with ``cache_tags`` for
+    invalidation; ``collection`` must then read from the primary.
+    """
+    if cache is not None and collection.read_preference != ReadPreference.PRIMARY:
+        raise ValueError("Cached list pages must read from the primary")
+
+    def find():
+        return collection.find(keyset_filter(query, sort_keys, page.after), projection).sort(sort_spec(sort_keys))
+
+    if wants_ndjson(request):
+        cursor = find()
+        if page.limit:
+            cursor = cursor.limit(page.limit)
+        return ndjson_response(cursor.batch_size(DEFAULT_PAGE_SIZE), model)
+
+    limit = page.limit or DEFAULT_PAGE_SIZE
+
+    async def fetch():
+        with span("db"):
+            docs = await find().limit(limit + 1).to_list(limit + 1)
+        if len(docs) > limit:
+            docs = docs[:limit]
+            return docs, encode_cursor(docs[-1], sort_keys)
+        return docs, None
+
+    if cache is not None:
+        async def render() -> CachedResponse:
+            docs, next_cursor = await fetch()
+            headers = {NEXT_CURSOR_HEADER: next_cursor} if next_cursor else {}
+            if cache_control:
+                headers.update({
+                    "Vary": "Accept",
+                    "ETag": list_etag(docs, model.__name__, page.after, limit),
+                    "Cache-Control": cache_control,
+                })
+            with span("model"):
+                body = render_json([model(**doc) for doc in docs])
+            return CachedResponse(body, headers)
+
+        cached = await cache.get_or_load(request_key(request), cache_tags, render)
+        return cached.respond(request)
+
+    docs, next_cursor = await fetch()
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    if cache_control:
+        response.headers["Vary"] = "Accept"
+        etag = list_etag(docs, model.__name__, page.after, limit)
+        not_modified = conditional(request, response, etag, cache_control)
+        if not_modified:
+            return not_modified
+    with span("model"):
+        return fast_json([model(**doc) for doc in docs], response)
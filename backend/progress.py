@@ -0,0 +1,134 @@
+import asyncio
+import contextlib
+import logging
+from datetime import datetime
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from pymongo import UpdateOne
+
+logger = logging.getLogger(__name__)
+
+# (user_id, course_category, course_id), the progress user_course_unique key
+ProgressKey = Tuple[str, str, str]
+
+
+def progress_filter(key: ProgressKey) -> Dict[str, str]:
+    user_id, course_category, course_id = key
+    return {"user_id": user_id, "course_category": course_category, "course_id": course_id}
+
+
+class ProgressBuffer:
+    """Coalesces learning-progress pings in memory and writes them behind in batches.
+
+    ``record`` only touches a dict, however often the player pings. ``flush``
+    turns everything pending into one unordered ``bulk_write`` of upserts:
+    completed sessions are merged with ``$addToSet``, so the writes are
+    idempotent and a failed flush can simply be retried. ``merge`` overlays
+    pending pings, and those of a flush still waiting to be acknowledged,
+    on the stored document, so a learner reading through the same process
+    sees progress that hasn't been written yet; other processes see it
+    after this one's next flush. Pings buffered in a process
+    that dies without a graceful shutdown are lost.
+
+    Reaching ``max_pending`` courses wakes ``run`` to flush early.
+    """
+
+    def __init__(self, max_pending: int = 10000, clock=datetime.utcnow):
+        self.max_pending = max_pending
+        self._clock = clock
+        self._pending: Dict[ProgressKey, Dict[str, Any]] = {}
+        # What the current flush is writing, until the write is acknowledged
+        self._inflight: Dict[ProgressKey, Dict[str, Any]] = {}
+        self._full = asyncio.Event()
+        self.recorded = 0
+        self.flushes = 0
+        self.flush_failures = 0
+
+    def record(self, key: ProgressKey, completed: Iterable[int], current_session: Optional[int] = None) -> None:
+        entry = self._pending.get(key)
+        if entry is None:
+            entry = self._pending[key] = {"completed": set(), "current_session": None}
+        entry["completed"].update(completed)
+        if current_session is not None:
+            entry["current_session"] = current_session
+        entry["updated_at"] = self._clock()
+        self.recorded += 1
+        if len(self._pending) >= self.max_pending:
+            self._full.set()
+
+    def merge(self, key: ProgressKey, stored: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """The stored progress document (or None) with unwritten pings for ``key`` applied."""
+        progress = {
+            **progress_filter(key),
+            "completed_sessions": [],
+            "current_session": None,
+            "updated_at": None,
+            **(stored or {}),
+        }
+        # In-flight pings are older than pending ones, so pending wins for current_session
+        for entry in (self._inflight.get(key), self._pending.get(key)):
+            if entry is None:
+                continue
+            progress["completed_sessions"] = sorted(set(progress["completed_sessions"]) | entry["completed"])
+            if entry["current_session"] is not None:
+                progress["current_session"] = entry["current_session"]
+            progress["updated_at"] = entry["updated_at"]
+        return progress
+
+    def _restore(self, pending: Dict[ProgressKey, Dict[str, Any]]) -> None:
+        # Pings recorded since the swap are newer, so they win for current_session
+        for key, entry in pending.items():
+            current = self._pending.get(key)
+            if current is None:
+                self._pending[key] = entry
+            else:
+                current["completed"] |= entry["completed"]
+                if current["current_session"] is None:
+                    current["current_session"] = entry["current_session"]
+
+    async def flush(self, progress) -> int:
+        """Upsert pending progress into the ``progress`` collection; returns the number of courses written."""
+        self._full.clear()
+        if not self._pending:
+            return 0
+        pending, self._pending = self._pending, {}
+        self._inflight = pending
+        requests = []
+        for key, entry in pending.items():
+            update: Dict[str, Any] = {
+                "$addToSet": {"completed_sessions": {"$each": sorted(entry["completed"])}},
+                "$max": {"updated_at": entry["updated_at"]},
+            }
+            if entry["current_session"] is not None:
+                update["$set"] = {"current_session": entry["current_session"]}
+            requests.append(UpdateOne(progress_filter(key), update, upsert=True))
+        try:
+            await progress.bulk_write(requests, ordered=False)
+        except Exception:
+            self.flush_failures += 1
+            self._restore(pending)
+            raise
+        finally:
+            self._inflight = {}
+        self.flushes += 1
+        return len(pending)
+
+    async def run(self, progress, interval: float) -> None:
+        """Flush every ``interval`` seconds, or as soon as the buffer fills, until cancelled."""
+        while True:
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self._full.wait(), interval)
+            try:
+                await self.flush(progress)
+            except Exception:
+                logger.exception("Failed to flush learning progress; will retry")
+                # Don't spin on a full buffer while the database is failing
+                await asyncio.sleep(interval)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "pending_courses": len(self._pending),
+            "recorded": self.recorded,
+            "flushes": self.flushes,
+            "flush_failures": self.flush_failures,
+        }
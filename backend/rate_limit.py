@@ -0,0 +1,147 @@
+import math
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Mapping, Optional
+
+from fastapi import Depends, HTTPException
+
+from cache import TTLCache
+from metrics import RATE_LIMITED
+
+
+@dataclass(frozen=True)
+class RouteLimit:
+    rate: float  # tokens refilled per second, per client
+    burst: int  # bucket capacity, per client
+    concurrency: Optional[int] = None  # requests in flight on the route, across all clients
+
+    def __post_init__(self):
+        if self.rate <= 0 or self.burst < 1:
+            raise ValueError("rate must be positive and burst at least 1")
+
+
+def parse_limits(spec: str) -> Dict[str, RouteLimit]:
+    """Parse ``route=rate/burst[/concurrency]`` pairs separated by commas (the RATE_LIMITS format)."""
+    limits = {}
+    for part in filter(None, (p.strip() for p in spec.split(","))):
+        route, _, values = part.partition("=")
+        fields = values.split("/")
+        if not route or len(fields) not in (2, 3):
+            raise ValueError(f"Expected route=rate/burst[/concurrency], got {part!r}")
+        concurrency = int(fields[2]) if len(fields) == 3 else None
+        limits[route.strip()] = RouteLimit(rate=float(fields[0]), burst=int(fields[1]), concurrency=concurrency)
+    return limits
+
+
+class RateLimitBackend:
+    """Token buckets behind RateLimiter.
+
+    ``take`` must read, refill and decrement a bucket atomically. A shared
+    store can stand in for the in-process default by doing the same
+    arithmetic server-side (e.g. a Redis Lua script over a hash holding
+    ``tokens`` and ``updated``, expiring after ``burst / rate`` seconds).
+    """
+
+    async def take(self, key: str, rate: float, burst: int) -> float:
+        """Take one token; returns 0 if granted, else the seconds until one will be available."""
+        raise NotImplementedError
+
+    def stats(self) -> Dict[str, Any]:
+        return {}
+
+
+class MemoryRateLimitBackend(RateLimitBackend):
+    """Per-process buckets, so each worker enforces its own budget.
+
+    A bucket is dropped once it would have refilled completely, which is
+    indistinguishable from keeping it; ``maxsize`` bounds memory when many
+    clients are active at once (an evicted client just starts full again).
+    """
+
+    def __init__(self, maxsize: int = 100000, clock=time.monotonic):
+        self._buckets = TTLCache(maxsize=maxsize, ttl=0, clock=clock)
+        self._clock = clock
+
+    async def take(self, key: str, rate: float, burst: int) -> float:
+        now = self._clock()
+        tokens, updated = self._buckets.get(key, (burst, now))
+        tokens = min(burst, tokens + (now - updated) * rate)
+        if tokens < 1:
+            self._buckets.set(key, (tokens, now), (burst - tokens) / rate)
+            return (1 - tokens) / rate
+        tokens -= 1
+        self._buckets.set(key, (tokens, now), (burst - tokens) / rate)
+        return 0.0
+
+    def clear(self) -> None:
+        self._buckets.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"buckets": len(self._buckets), "maxsize": self._buckets.maxsize}
+
+
+def too_many_requests(retry_after: float) -> HTTPException:
+    return HTTPException(
+        status_code=429,
+        detail="Too many requests",
+        headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+    )
+
+
+class RateLimiter:
+    """Per-client token buckets and per-route concurrency caps for FastAPI routes.
+
+    Admission is O(1): one counter check and one bucket update. The
+    concurrency cap is checked first and rejects immediately rather than
+    queueing, so a burst on one route cannot tie up the whole Motor pool;
+    its slot is held until the handler returns.
+    """
+
+    def __init__(self, backend: RateLimitBackend, limits: Mapping[str, RouteLimit], enabled: bool = True):
+        self.backend = backend
+        self.limits = dict(limits)
+        self.enabled = enabled
+        self._inflight: Dict[str, int] = {route: 0 for route in self.limits}
+
+    async def acquire(self, route: str, client: str) -> None:
+        """Admit one request from ``client`` to ``route`` or raise a 429; pair with ``release``."""
+        limit = self.limits[route]
+        if limit.concurrency is not None and self._inflight[route] >= limit.concurrency:
+            RATE_LIMITED.inc(route, "concurrency")
+            raise too_many_requests(1)
+        self._inflight[route] += 1
+        try:
+            retry_after = await self.backend.take(f"{route}:{client}", limit.rate, limit.burst)
+        except BaseException:
+            self._inflight[route] -= 1
+            raise
+        if retry_after:
+            self._inflight[route] -= 1
+            RATE_LIMITED.inc(route, "rate")
+            raise too_many_requests(retry_after)
+
+    def release(self, route: str) -> None:
+        self._inflight[route] -= 1
+
+    def limit(self, route: str, key: Callable[..., str]):
+        """A dependency enforcing ``route``'s budget for the client identified by the ``key`` dependency."""
+        if route not in self.limits:
+            raise KeyError(f"No rate limit configured for {route!r}")
+
+        async def dependency(client: str = Depends(key)):
+            if not self.enabled:
+                yield
+                return
+            await self.acquire(route, client)
+            try:
+                yield
+            finally:
+                self.release(route)
+
+        return dependency
+
+    def in_flight(self) -> Dict[str, int]:
+        return dict(self._inflight)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"enabled": self.enabled, **self.backend.stats()}
@@ -0,0 +1,173 @@
+import asyncio
+import json
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional
+from urllib.parse import urlencode
+
+from fastapi import Request, Response
+
+from cache import TTLCache
+from http_cache import etag_matches
+
+
+class CacheBackend:
+    """Storage behind ResponseCache.
+
+    The operations mirror Redis GET / SETEX / INCR, so a Redis-compatible
+    store can stand in for the in-process default without changing callers.
+    """
+
+    async def get(self, key: str) -> Optional[bytes]:
+        raise NotImplementedError
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        raise NotImplementedError
+
+    async def incr(self, key: str) -> int:
+        """Increment a counter that never expires or gets evicted; missing counters start at 0."""
+        raise NotImplementedError
+
+    def stats(self) -> Dict[str, Any]:
+        return {}
+
+
+class MemoryBackend(CacheBackend):
+    """Per-process LRU backend. Counters live outside the LRU so eviction cannot reset them."""
+
+    def __init__(self, maxsize: int, ttl: float = 30.0):
+        self._entries = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._counters: Dict[str, int] = {}
+
+    async def get(self, key: str) -> Optional[bytes]:
+        if key in self._counters:
+            return str(self._counters[key]).encode()
+        return self._entries.get(key)
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        self._entries.set(key, value, ttl)
+
+    async def incr(self, key: str) -> int:
+        self._counters[key] = self._counters.get(key, 0) + 1
+        return self._counters[key]
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._counters.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return self._entries.stats()
+
+
+@dataclass
+class CachedResponse:
+    body: bytes
+    headers: Dict[str, str] = field(default_factory=dict)
+
+    def pack(self) -> bytes:
+        return json.dumps(self.headers).encode() + b"\n" + self.body
+
+    @classmethod
+    def unpack(cls, data: bytes) -> "CachedResponse":
+        headers, _, body = data.partition(b"\n")
+        return cls(body=body, headers=json.loads(headers))
+
+    def respond(self, request: Request) -> Response:
+        etag = self.headers.get("ETag")
+        if etag and etag_matches(request, etag):
+            return Response(status_code=304, headers=self.headers)
+        return Response(self.body, media_type="application/json", headers=self.headers)
+
+
+def request_key(request: Request) -> str:
+    """Route path plus normalised query string, e.g. ``/api/badges/user/u1?limit=10``."""
+    query = urlencode(sorted(request.query_params.multi_items()))
+    return f"{request.url.path}?{query}"
+
+
+class ResponseCache:
+    """Rendered-response cache with tag invalidation and request coalescing.
+
+    Every tag has a generation counter in the backend and cache keys embed
+    the current generation of their tags. ``invalidate`` bumps the
+    counter, so older entries are never read again and age out through the
+    TTL. A response rendered from data read before a write is stored under
+    the old generation, so it cannot be served after that write. That only
+    holds if the render reads from the primary: a lagging secondary can
+    return pre-write data after the bump, which would then be cached under
+    the new generation. ``list_page`` refuses to cache other reads.
+
+    Concurrent misses for the same key share one ``load`` call.
+    """
+
+    def __init__(self, backend: CacheBackend, ttl: float):
+        self.backend = backend
+        self.ttl = ttl
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.invalidations = 0
+
+    async def _versioned_key(self, key: str, tags: Iterable[str]) -> str:
+        generations = []
+        for tag in tags:
+            generation = await self.backend.get(f"gen:{tag}")
+            generations.append(f"{tag}@{int(generation or 0)}")
+        return f"resp:{key}|{','.join(generations)}"
+
+    async def get_or_load(
+        self, key: str, tags: Iterable[str], load: Callable[[], Awaitable[CachedResponse]]
+    ) -> CachedResponse:
+        versioned_key = await self._versioned_key(key, tags)
+        while True:
+            data = await self.backend.get(versioned_key)
+            if data is not None:
+                self.hits += 1
+                return CachedResponse.unpack(data)
+
+            inflight = self._inflight.get(versioned_key)
+            if inflight is None:
+                break
+            self.coalesced += 1
+            try:
+                return await asyncio.shield(inflight)
+            except asyncio.CancelledError:
+                if not inflight.cancelled():
+                    raise
+                # The request doing the load was cancelled; take over from it
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[versioned_key] = future
+        try:
+            value = await load()
+            await self.backend.set(versioned_key, value.pack(), self.ttl)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # waiters re-raise it; don't log it as unretrieved
+            raise
+        else:
+            future.set_result(value)
+            return value
+        finally:
+            del self._inflight[versioned_key]
+
+    async def invalidate(self, *tags: str) -> None:
+        for tag in tags:
+            await self.backend.incr(f"gen:{tag}")
+        self.invalidations += len(tags)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            **self.backend.stats(),
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "invalidations": self.invalidations,
+            "hit_ratio": (self.hits + self.coalesced) / lookups if lookups else 0.0,
+        }
@@ -0,0 +1,451 @@
+"""Generate users, courses and badges at production-like volume.
+
+    python seed.py generate --users 50000 --courses 20000 --mean-badges 6 --drop
+    python seed.py generate --users 1000 --courses 500 --seed 7 --ndjson-dir data/ --no-db
+    python seed.py load data/ --drop
+
+Documents are built as plain dicts shaped like the server models (no
+per-document validation) and inserted in unordered ``insert_many`` batches,
+several in flight at once, so a local mongod takes hundreds of thousands of
+documents a minute. Indexes are ensured after the load, which is cheaper
+than maintaining them row by row.
+
+The same ``--seed`` always produces the same dataset. ``--ndjson-dir`` also
+writes it as ``users.ndjson``, ``courses.ndjson`` and ``badges.ndjson`` in
+MongoDB extended JSON, which ``load`` (or ``mongoimport``) replays exactly
+for benchmarks that must survive changes to the generator.
+
+Badges are skewed the way real learners are: per-user counts follow a
+Pareto distribution (most users have zero or one badge, a few power
+learners have hundreds) and popular courses are picked far more often
+(Zipf over course rank). Course ownership is Zipf-skewed too.
+"""
+import asyncio
+import itertools
+import random
+import time
+import uuid
+from bisect import bisect_left
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import typer
+from bson import json_util
+from dotenv import load_dotenv
+
+from database import DatabaseSettings, create_client
+from indexes import ensure_indexes
+
+try:
+    import orjson
+except ImportError:  # optional; bson.json_util writes the same extended JSON, several times slower
+    orjson = None
+
+ROOT_DIR = Path(__file__).parent
+
+COLLECTIONS = ("users", "courses", "badges")
+CATEGORIES = ("masterclasses", "careerpaths", "crashcourses")
+LEVELS = ("Beginner", "Intermediate", "Advanced", "Expert", "All Levels")
+TAGS = (
+    "Python", "JavaScript", "React", "MongoDB", "FastAPI", "AWS", "Docker", "Kubernetes",
+    "SQL", "Machine Learning", "Design", "Marketing", "Leadership", "Finance", "Security",
+)
+FIRST_NAMES = ("Ada", "Ben", "Chen", "Dara", "Eli", "Fatima", "Gus", "Hana", "Ivan", "Jo", "Kofi", "Lena", "Mo", "Nia")
+LAST_NAMES = ("Okafor", "Smith", "Tanaka", "Garcia", "Novak", "Rossi", "Singh", "Kim", "Berg", "Mensah", "Silva")
+WORDS = (
+    "learn build deploy scale design test debug async data model query index cache stream api cloud "
+    "service pattern practice project team review secure measure profile optimize refactor ship"
+).split()
+
+DEFAULT_BATCH_SIZE = 1000
+DEFAULT_CONCURRENCY = 4
+
+Range = Tuple[int, int]
+
+
+def make_id(rng: random.Random) -> str:
+    """A uuid4 string drawn from ``rng``, so ids are reproducible from the seed."""
+    return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+
+def timestamp(rng: random.Random, start: datetime, end: datetime) -> datetime:
+    # Whole seconds: BSON and extended JSON keep milliseconds, so replays compare equal
+    return start + timedelta(seconds=rng.randint(0, max(int((end - start).total_seconds()), 0)))
+
+
+def words(rng: random.Random, count: int) -> str:
+    return " ".join(rng.choices(WORDS, k=count)).capitalize()
+
+
+def zipf_weights(n: int, exponent: float) -> List[float]:
+    """Cumulative Zipf weights over ranks 0..n-1, for ``pick``."""
+    return list(itertools.accumulate(1.0 / (rank + 1) ** exponent for rank in range(n)))
+
+
+def pick(rng: random.Random, cum_weights: Sequence[float]) -> int:
+    return bisect_left(cum_weights, rng.random() * cum_weights[-1])
+
+
+def badge_count(rng: random.Random, mean: float, alpha: float) -> int:
+    """Pareto-distributed badge count averaging about ``mean``; lower ``alpha`` means a longer tail."""
+    # paretovariate() - 1 has mean 1 / (alpha - 1)
+    return round((rng.paretovariate(alpha) - 1) * mean * (alpha - 1))
+
+
+def make_user(rng: random.Random, now: datetime) -> Dict[str, Any]:
+    user_id = make_id(rng)
+    name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+    created_at = timestamp(rng, now - timedelta(days=730), now)
+    return {
+        "id": user_id,
+        "google_id": f"seed-{user_id[:8]}{user_id[-8:]}",
+        "email": f"{name.split()[0].lower()}.{user_id[:8]}@example.com",
+        "name": name,
+        "picture": "",
+        "about_me": words(rng, rng.randint(0, 30)),
+        "age": rng.choice((None, rng.randint(16, 70))),
+        "created_at": created_at,
+        "last_login": timestamp(rng, created_at, now),
+    }
+
+
+def make_course(
+    rng: random.Random,
+    owner: Dict[str, Any],
+    now: datetime,
+    sessions: Range,
+    questions: Range,
+    published_ratio: float,
+) -> Dict[str, Any]:
+    course_id = make_id(rng)
+    session_count = rng.randint(*sessions)
+    total_minutes = 0
+    course_sessions = []
+    for s in range(1, session_count + 1):
+        minutes = rng.randint(5, 45)
+        total_minutes += minutes
+        course_sessions.append({
+            "id": s,
+            "title": words(rng, rng.randint(2, 6)),
+            "duration": f"{minutes} min",
+            "description": words(rng, rng.randint(15, 60)),
+            "video_url": f"https://videos.example.com/{course_id}/{s}.mp4",
+            "asset_id": None,
+        })
+    course_questions = [
+        {
+            "question": words(rng, rng.randint(6, 16)) + "?",
+            "options": [words(rng, rng.randint(1, 5)) for _ in range(4)],
+            "correct": rng.randrange(4),
+        }
+        for _ in range(rng.randint(*questions))
+    ]
+    return {
+        "id": course_id,
+        "title": words(rng, rng.randint(3, 8)),
+        "description": words(rng, rng.randint(40, 160)),
+        "duration": f"{total_minutes // 60}h {total_minutes % 60}m",
+        "instructor": owner["name"],
+        "level": rng.choice(LEVELS),
+        "category": rng.choice(CATEGORIES),
+        "tags": rng.sample(TAGS, rng.randint(1, 5)),
+        "sessions": course_sessions,
+        "quiz": {"questions": course_questions},
+        "created_by": owner["id"],
+        "created_at": timestamp(rng, owner["created_at"], now),
+        "published": rng.random() < published_ratio,
+        "views": 0,
+        "version": 0,
+    }
+
+
+def make_badge(rng: random.Random, user: Dict[str, Any], course: Dict[str, Any], now: datetime) -> Dict[str, Any]:
+    # Same shape as server.new_badge
+    quiz_score = int(rng.triangular(60, 100, 90))
+    category = course["category"]
+    return {
+        "id": make_id(rng),
+        "user_id": user["id"],
+        "course_id": course["id"],
+        "course_title": course["title"],
+        "course_category": category,
+        "badge_name": f"{category.title()} Completion",
+        "badge_description": f"Successfully completed course with {quiz_score}% score",
+        "earned_at": timestamp(rng, max(course["created_at"], user["created_at"]), now),
+        "quiz_score": quiz_score,
+        "version": 0,
+    }
+
+
+class Dataset:
+    """A reproducible users/courses/badges dataset, generated lazily collection by collection.
+
+    Only the fields later collections refer to are kept between stages, so
+    memory grows with the number of users and courses, not with sessions,
+    quizzes or badges.
+    """
+
+    def __init__(
+        self,
+        users: int,
+        courses: int,
+        seed: int = 0,
+        sessions: Range = (4, 24),
+        questions: Range = (5, 15),
+        published_ratio: float = 0.8,
+        mean_badges: float = 5.0,
+        badge_alpha: float = 1.3,
+        popularity_exponent: float = 1.0,
+        now: Optional[datetime] = None,
+    ):
+        self.users = users
+        self.courses = courses
+        self.sessions = sessions
+        self.questions = questions
+        self.published_ratio = published_ratio
+        self.mean_badges = mean_badges
+        self.badge_alpha = badge_alpha
+        self.popularity_exponent = popularity_exponent
+        self.now = (now or datetime.utcnow()).replace(microsecond=0)
+        self._rng = random.Random(seed)
+        self._users: List[Dict[str, Any]] = []
+        self._published: List[Dict[str, Any]] = []
+
+    def generate(self, collection: str) -> Iterator[Dict[str, Any]]:
+        """Documents for ``collection``; call in COLLECTIONS order."""
+        return {"users": self._user_docs, "courses": self._course_docs, "badges": self._badge_docs}[collection]()
+
+    def _user_docs(self) -> Iterator[Dict[str, Any]]:
+        for _ in range(self.users):
+            user = make_user(self._rng, self.now)
+            self._users.append({"id": user["id"], "name": user["name"], "created_at": user["created_at"]})
+            yield user
+
+    def _course_docs(self) -> Iterator[Dict[str, Any]]:
+        if not self._users:
+            return
+        owners = zipf_weights(len(self._users), self.popularity_exponent)
+        for _ in range(self.courses):
+            owner = self._users[pick(self._rng, owners)]
+            course = make_course(self._rng, owner, self.now, self.sessions, self.questions, self.published_ratio)
+            if course["published"]:
+                self._published.append({k: course[k] for k in ("id", "title", "category", "created_at")})
+            yield course
+
+    def _badge_docs(self) -> Iterator[Dict[str, Any]]:
+        if not self._published:
+            return
+        rng = self._rng
+        popularity = zipf_weights(len(self._published), self.popularity_exponent)
+        for user in self._users:
+            count = min(badge_count(rng, self.mean_badges, self.badge_alpha), len(self._published))
+            if count > len(self._published) // 2:
+                # Rejection sampling stalls near the whole catalogue
+                chosen = rng.sample(range(len(self._published)), count)
+            else:
+                # One badge per (user, course): the badges user_course index is unique
+                chosen = set()
+                while len(chosen) < count:
+                    chosen.add(pick(rng, popularity))
+            for index in chosen:
+                yield make_badge(rng, user, self._published[index], self.now)
+
+
+def batched(docs: Iterable[Dict[str, Any]], size: int) -> Iterator[List[Dict[str, Any]]]:
+    iterator = iter(docs)
+    while batch := list(itertools.islice(iterator, size)):
+        yield batch
+
+
+async def insert_batches(
+    collection,
+    docs: Iterable[Dict[str, Any]],
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    concurrency: int = DEFAULT_CONCURRENCY,
+) -> int:
+    """Insert ``docs`` in unordered batches with up to ``concurrency`` in flight; returns the count.
+
+    The next batch is generated while earlier ones are on the wire. After
+    a batch fails no new ones are started, and the first failure is raised
+    once the in-flight ones finish.
+    """
+    slots = asyncio.Semaphore(concurrency)
+    inflight = set()
+    inserted = 0
+    # Finished tasks leave inflight, so a failure has to be kept here to be raised
+    failures: List[BaseException] = []
+
+    async def insert(batch):
+        nonlocal inserted
+        try:
+            await collection.insert_many(batch, ordered=False)
+            inserted += len(batch)
+        except Exception as e:
+            failures.append(e)
+        finally:
+            slots.release()
+
+    for batch in batched(docs, batch_size):
+        await slots.acquire()
+        if failures:
+            slots.release()
+            break
+        task = asyncio.create_task(insert(batch))
+        inflight.add(task)
+        task.add_done_callback(inflight.discard)
+    await asyncio.gather(*inflight)
+    if failures:
+        raise failures[0]
+    return inserted
+
+
+def extended_date(value: datetime) -> Dict[str, str]:
+    return {"$date": value.isoformat(timespec="milliseconds") + "Z"}
+
+
+def dump_line(doc: Dict[str, Any]) -> bytes:
+    """One document as relaxed extended JSON (``{"$date": ...}`` for datetimes)."""
+    if orjson is not None:
+        return orjson.dumps(doc, default=extended_date, option=orjson.OPT_PASSTHROUGH_DATETIME)
+    return json_util.dumps(doc, json_options=json_util.RELAXED_JSON_OPTIONS).encode("utf-8")
+
+
+def write_ndjson(path: Path, docs: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+    """Write each document to ``path`` as extended JSON, passing it through.
+
+    Lines are written before the document reaches ``insert_many``, which
+    adds ``_id`` in place.
+    """
+    with path.open("wb") as out:
+        for doc in docs:
+            out.write(dump_line(doc) + b"\n")
+            yield doc
+
+
+def read_ndjson(path: Path) -> Iterator[Dict[str, Any]]:
+    with path.open(encoding="utf-8") as lines:
+        for line in lines:
+            if line.strip():
+                yield json_util.loads(line)
+
+
+def drain(docs: Iterable[Dict[str, Any]]) -> int:
+    return sum(1 for _ in docs)
+
+
+def report(collection: str, count: int, seconds: float) -> None:
+    rate = count / seconds * 60 if seconds else 0.0
+    typer.echo(f"{collection:>8}: {count:>9,} docs in {seconds:6.1f}s ({rate:,.0f} docs/min)")
+
+
+async def run(
+    sources: Dict[str, Iterable[Dict[str, Any]]],
+    settings: Optional[DatabaseSettings],
+    drop: bool,
+    batch_size: int,
+    concurrency: int,
+) -> None:
+    client = create_client(settings) if settings else None
+    db = client[settings.db_name] if client else None
+    try:
+        if db is not None and drop:
+            # user_stats are derived from the other three and rebuilt on first read
+            for name in (*COLLECTIONS, "user_stats"):
+                await db.drop_collection(name)
+        total, started = 0, time.perf_counter()
+        for collection, docs in sources.items():
+            stage_started = time.perf_counter()
+            if db is None:
+                count = drain(docs)
+            else:
+                count = await insert_batches(db[collection], docs, batch_size, concurrency)
+            report(collection, count, time.perf_counter() - stage_started)
+            total += count
+        report("total", total, time.perf_counter() - started)
+        if db is not None:
+            created = (await ensure_indexes(db)).created
+            typer.echo(f"ensured indexes ({sum(map(len, created.values()))} created)")
+    finally:
+        if client is not None:
+            client.close()
+
+
+app = typer.Typer(add_completion=False, help=__doc__.split("\n\n")[0])
+
+MONGO_URL = typer.Option("mongodb://localhost:27017", envvar="MONGO_URL", help="MongoDB to write to.")
+DB_NAME = typer.Option("test_database", envvar="DB_NAME", help="Database to write to.")
+DROP = typer.Option(False, help="Drop users, courses, badges and user_stats first.")
+BATCH_SIZE = typer.Option(DEFAULT_BATCH_SIZE, min=1, help="Documents per insert_many.")
+CONCURRENCY = typer.Option(DEFAULT_CONCURRENCY, min=1, help="insert_many batches in flight.")
+
+
+def parse_range(value: str) -> Range:
+    low, _, high = value.partition("-")
+    bounds = (int(low), int(high or low))
+    if not 0 <= bounds[0] <= bounds[1]:
+        raise typer.BadParameter(f"expected MIN-MAX, got {value!r}")
+    return bounds
+
+
+@app.command()
+def generate(
+    users: int = typer.Option(10000, min=0, help="Users to create."),
+    courses: int = typer.Option(2000, min=0, help="Courses to create."),
+    seed: int = typer.Option(0, help="Random seed; the same seed gives the same dataset."),
+    sessions: str = typer.Option("4-24", help="Sessions per course, MIN-MAX."),
+    questions: str = typer.Option("5-15", help="Quiz questions per course, MIN-MAX."),
+    published_ratio: float = typer.Option(0.8, min=0.0, max=1.0, help="Share of courses published."),
+    mean_badges: float = typer.Option(5.0, min=0.0, help="Average badges per user."),
+    badge_alpha: float = typer.Option(1.3, min=1.01, help="Pareto shape of badges per user; lower is more skewed."),
+    ndjson_dir: Optional[Path] = typer.Option(None, file_okay=False, help="Also write the dataset here as NDJSON."),
+    no_db: bool = typer.Option(False, "--no-db", help="Skip MongoDB; only useful with --ndjson-dir."),
+    mongo_url: str = MONGO_URL,
+    db_name: str = DB_NAME,
+    drop: bool = DROP,
+    batch_size: int = BATCH_SIZE,
+    concurrency: int = CONCURRENCY,
+):
+    """Generate a dataset and insert it (and/or write it as NDJSON)."""
+    dataset = Dataset(
+        users,
+        courses,
+        seed=seed,
+        sessions=parse_range(sessions),
+        questions=parse_range(questions),
+        published_ratio=published_ratio,
+        mean_badges=mean_badges,
+        badge_alpha=badge_alpha,
+    )
+    sources = {}
+    for collection in COLLECTIONS:
+        docs = dataset.generate(collection)
+        if ndjson_dir is not None:
+            ndjson_dir.mkdir(parents=True, exist_ok=True)
+            docs = write_ndjson(ndjson_dir / f"{collection}.ndjson", docs)
+        sources[collection] = docs
+    settings = None if no_db else DatabaseSettings(url=mongo_url, db_name=db_name)
+    asyncio.run(run(sources, settings, drop, batch_size, concurrency))
+
+
+@app.command()
+def load(
+    ndjson_dir: Path = typer.Argument(..., exists=True, file_okay=False, help="Directory written by generate."),
+    mongo_url: str = MONGO_URL,
+    db_name: str = DB_NAME,
+    drop: bool = DROP,
+    batch_size: int = BATCH_SIZE,
+    concurrency: int = CONCURRENCY,
+):
+    """Insert a dataset previously written by ``generate --ndjson-dir``."""
+    sources = {
+        collection: read_ndjson(ndjson_dir / f"{collection}.ndjson")
+        for collection in COLLECTIONS
+        if (ndjson_dir / f"{collection}.ndjson").exists()
+    }
+    asyncio.run(run(sources, DatabaseSettings(url=mongo_url, db_name=db_name), drop, batch_size, concurrency))
+
+
+if __name__ == "__main__":
+    load_dotenv(ROOT_DIR / ".env")
+    app()
@@ -0,0 +1,51 @@
+import json
+from typing import Any, Optional
+
+from fastapi import Response
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:  # optional; the stdlib encoder produces the same JSON, just slower
+    orjson = None
+
+
+def to_content(value: Any) -> Any:
+    """Models (or lists of models) as plain dicts; datetimes stay objects for the encoder."""
+    if isinstance(value, BaseModel):
+        return value.model_dump()
+    if isinstance(value, list):
+        return [item.model_dump() if isinstance(item, BaseModel) else item for item in value]
+    return value
+
+
+def render_json(value: Any) -> bytes:
+    content = to_content(value)
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(
+        jsonable_encoder(content), ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+    ).encode("utf-8")
+
+
+class FastJSONResponse(Response):
+    """JSON response for models that were already validated once while being built from the DB.
+
+    Returning a Response skips FastAPI's ``response_model`` revalidation
+    and its jsonable_encoder pass; ``response_model`` still documents the
+    route in OpenAPI.
+    """
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return render_json(content)
+
+
+def fast_json(value: Any, response: Optional[Response] = None, status_code: int = 200) -> FastJSONResponse:
+    """Wrap ``value``, carrying over headers a handler already set on its injected ``response``."""
+    headers = None
+    if response is not None:
+        headers = {k: v for k, v in response.headers.items() if k not in ("content-length", "content-type")}
+    return FastJSONResponse(value, status_code=status_code, headers=headers)
@@ -1,34 +1,155 @@
-from fastapi import FastAPI, APIRouter, Depends, Request, HTTPException, status
-from fastapi.responses import RedirectResponse
+from fastapi import FastAPI, APIRouter, Depends, File, Query, Request, Response, HTTPException, UploadFile, status
+from fastapi.responses import JSONResponse, PlainTextResponse, RedirectResponse
 from fastapi.middleware.cors import CORSMiddleware
 from starlette.middleware.sessions import SessionMiddleware
 from dotenv import load_dotenv
-from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import DESCENDING, ReturnDocument
+from pymongo.errors import DuplicateKeyError, WaitQueueTimeoutError
 from authlib.integrations.starlette_client import OAuth
 from starlette.config import Config
+import asyncio
+import hmac
+import ipaddress
 import os
 import logging
 import jwt
 from pathlib import Path
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from typing import Dict, List, Literal, Optional, Union
 import uuid
 from datetime import datetime, timedelta
 
+from assets import (
+    ASSET_CHUNK_SIZE,
+    ASSET_MAX_SIZE,
+    asset_content_type,
+    asset_response,
+    check_imported_assets,
+    check_session_assets,
+    receive_chunk,
+    storage_from_env,
+    sweep_uploads,
+)
+from bulk import import_ndjson
+from cache import TTLCache
+from compression import CompressionMiddleware
+from catalog import FACET_FIELDS, catalog_counts_pipeline, catalog_match, catalog_page
+from response_cache import MemoryBackend, ResponseCache
+from user_stats import (
+    load_user_stats,
+    record_badge,
+    record_course_deleted,
+    record_course_published,
+    record_courses_created,
+)
+from http_cache import (
+    PRIVATE_CACHE_CONTROL,
+    PUBLIC_CACHE_CONTROL,
+    REVALIDATE_CACHE_CONTROL,
+    conditional,
+    document_etag,
+)
+from database import DatabaseSettings, PoolMetrics, create_client, list_database, warm_up
+from indexes import ensure_indexes
+from leaderboard import LeaderboardWindow, Leaderboards
+from metrics import CONTENT_TYPE, REGISTRY, CommandMetrics, MetricsMiddleware, snapshot_gauges, span
+from progress import ProgressBuffer
+from rate_limit import MemoryRateLimitBackend, RateLimiter, RouteLimit, parse_limits
+from pagination import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    NEXT_CURSOR_HEADER,
+    PageParams,
+    encode_cursor,
+    list_page,
+    ndjson_response,
+    page_params,
+    sort_spec,
+)
+from serialization import fast_json
+from status_rollup import load_rollups, record_status_check
+from tokens import TokenVerifier
+from views import ViewCounter
+
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
-# MongoDB connection
-mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ['DB_NAME']]
+# Read once at startup; everything that signs or verifies uses this key
+SECRET_KEY = os.environ.get('SECRET_KEY')
+
+# MongoDB connection; pool sizing, timeouts and compression come from MONGO_* env vars
+db_settings = DatabaseSettings.from_env()
+pool_metrics = PoolMetrics()
+client = create_client(db_settings, [pool_metrics, CommandMetrics()])
+db = client[db_settings.db_name]
+# Public list endpoints may read from secondaries (MONGO_LIST_READ_PREFERENCE), except those in response_cache
+list_db = list_database(client, db_settings)
+
+# Authenticated users keyed by google_id, so get_current_user can skip the DB
+user_cache = TTLCache(
+    maxsize=int(os.environ.get('USER_CACHE_SIZE', '10000')),
+    ttl=float(os.environ.get('USER_CACHE_TTL', '60')),
+)
+
+# Verified JWT payloads, memoized until each token's own expiry
+token_verifier = TokenVerifier(SECRET_KEY, maxsize=int(os.environ.get('TOKEN_CACHE_SIZE', '10000')))
+
+# Rendered public list responses, invalidated by tag when the owner's badges or courses change
+RESPONSE_CACHE_TTL = float(os.environ.get('RESPONSE_CACHE_TTL', '30'))
+response_cache = ResponseCache(
+    MemoryBackend(maxsize=int(os.environ.get('RESPONSE_CACHE_SIZE', '1024')), ttl=RESPONSE_CACHE_TTL),
+    ttl=RESPONSE_CACHE_TTL,
+)
+
+# Badge rankings, refreshed in place when a badge is awarded and rebuilt after LEADERBOARD_TTL seconds
+leaderboards = Leaderboards(ttl=float(os.environ.get('LEADERBOARD_TTL', '60')))
+
+# Course views are counted in memory and written out in one bulk_write every VIEW_FLUSH_INTERVAL seconds
+view_counter = ViewCounter()
+VIEW_FLUSH_INTERVAL = float(os.environ.get('VIEW_FLUSH_INTERVAL', '5'))
+
+# Learning progress pings are coalesced per user and course and upserted in one bulk_write every
+# PROGRESS_FLUSH_INTERVAL seconds, or sooner once PROGRESS_MAX_PENDING courses are waiting
+progress_buffer = ProgressBuffer(max_pending=int(os.environ.get('PROGRESS_MAX_PENDING', '10000')))
+PROGRESS_FLUSH_INTERVAL = float(os.environ.get('PROGRESS_FLUSH_INTERVAL', '5'))
+
+# Uploaded course assets; GridFS by default, or files under ASSET_DIR with ASSET_STORAGE=local.
+# Every ASSET_SWEEP_INTERVAL seconds, uploads older than ASSET_UPLOAD_EXPIRY that never completed are deleted
+asset_storage = storage_from_env(db, ROOT_DIR / "assets")
+ASSET_SWEEP_INTERVAL = float(os.environ.get('ASSET_SWEEP_INTERVAL', '3600'))
+
+# Per-client token buckets for each route group, plus in-flight caps on the writes so one client
+# can't hold the whole Motor pool. RATE_LIMITS overrides budgets as route=rate/burst[/concurrency],...
+WRITE_CONCURRENCY = max(db_settings.max_pool_size // 2, 1)
+ROUTE_LIMITS = {
+    "auth.read": RouteLimit(rate=10, burst=50),
+    "profile.write": RouteLimit(rate=1, burst=10),
+    "badges.write": RouteLimit(rate=2, burst=20, concurrency=WRITE_CONCURRENCY),
+    "courses.write": RouteLimit(rate=2, burst=20, concurrency=WRITE_CONCURRENCY),
+    "courses.import": RouteLimit(rate=0.05, burst=3, concurrency=4),
+    "courses.export": RouteLimit(rate=0.2, burst=5),
+    "status.write": RouteLimit(rate=5, burst=30, concurrency=WRITE_CONCURRENCY),
+    "assets.write": RouteLimit(rate=20, burst=100, concurrency=WRITE_CONCURRENCY),
+    "progress.write": RouteLimit(rate=5, burst=30),
+}
+rate_limiter = RateLimiter(
+    MemoryRateLimitBackend(maxsize=int(os.environ.get('RATE_LIMIT_BUCKETS', '100000'))),
+    {**ROUTE_LIMITS, **parse_limits(os.environ.get('RATE_LIMITS', ''))},
+    enabled=os.environ.get('RATE_LIMIT_ENABLED', '1') != '0',
+)
+
+def badges_tag(user_id: str) -> str:
+    return f"badges:{user_id}"
+
+def courses_tag(user_id: str) -> str:
+    return f"courses:{user_id}"
 
 # Create the main app without a prefix
 app = FastAPI()
 
 # Add session middleware for OAuth
-app.add_middleware(SessionMiddleware, secret_key=os.environ.get('SECRET_KEY'))
+app.add_middleware(SessionMiddleware, secret_key=SECRET_KEY)
 
 # OAuth configuration
 config = Config(ROOT_DIR / '.env')
@@ -63,18 +184,36 @@ class UserProfileUpdate(BaseModel):
 class Badge(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     user_id: str
-    course_id: int
+    course_id: Union[int, str]  # int for the built-in catalog, str for db.courses
     course_title: str
     course_category: str  # masterclasses, careerpaths, crashcourses
     badge_name: str
     badge_description: str
     earned_at: datetime = Field(default_factory=datetime.utcnow)
     quiz_score: int
+    version: int = 0  # bumped on every update; feeds the ETag
+
+# Built-in catalog (frontend courseData): courses per category, ids 1..n. Their quizzes ship in the
+# frontend bundle, so only they may be self-reported through POST /badges; uploaded courses are
+# graded server-side by POST /badges/award
+BUILTIN_COURSES = {"masterclasses": 6, "careerpaths": 6, "crashcourses": 6}
 
 class BadgeCreate(BaseModel):
     course_id: int
     course_category: str
-    quiz_score: int
+    quiz_score: int = Field(ge=0, le=100)
+
+class BadgeAward(BaseModel):
+    course_id: str
+    answers: List[Optional[int]]  # selected option index per question, None if unanswered
+
+class BadgeAwardResult(BaseModel):
+    score: int
+    passed: bool
+    badge: Optional[Badge] = None
+
+# Minimum quiz score (percent) to earn a badge
+PASSING_SCORE = 60
 
 # Course Models
 class CourseSession(BaseModel):
@@ -83,6 +222,7 @@ class CourseSession(BaseModel):
     duration: str
     description: str
     video_url: Optional[str] = ""
+    asset_id: Optional[str] = None  # an upload served from /api/assets/{asset_id}, instead of video_url
 
 class QuizQuestion(BaseModel):
     question: str
@@ -92,6 +232,14 @@ class QuizQuestion(BaseModel):
 class Quiz(BaseModel):
     questions: List[QuizQuestion]
 
+# What anyone but the author sees of a quiz; the answer key stays in the DB for grade_quiz
+class PublicQuizQuestion(BaseModel):
+    question: str
+    options: List[str]
+
+class PublicQuiz(BaseModel):
+    questions: List[PublicQuizQuestion]
+
 class Course(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     title: str
@@ -107,6 +255,41 @@ class Course(BaseModel):
     created_at: datetime = Field(default_factory=datetime.utcnow)
     published: bool = False
     views: int = 0
+    version: int = 0  # bumped by update_course and publish_course; feeds the ETag
+
+class PublicCourse(Course):
+    quiz: PublicQuiz
+
+class CourseSummary(BaseModel):
+    id: str
+    title: str
+    description: str
+    duration: str
+    instructor: str
+    level: str
+    category: str
+    tags: List[str]
+    created_by: str
+    created_at: datetime
+    published: bool = False
+    views: int = 0
+    version: int = 0
+    session_count: int = 0
+    question_count: int = 0
+
+# Pushed down to MongoDB for ?view=summary, so sessions and the quiz answer key never leave the DB
+COURSE_SUMMARY_PROJECTION = {
+    "_id": 0,
+    "id": 1, "title": 1, "description": 1, "duration": 1, "instructor": 1, "level": 1,
+    "category": 1, "tags": 1, "created_by": 1, "created_at": 1, "published": 1, "views": 1, "version": 1,
+    "session_count": {"$size": {"$ifNull": ["$sessions", []]}},
+    "question_count": {"$size": {"$ifNull": ["$quiz.questions", []]}},
+}
+
+# Pushed down for public full reads, so the answer key never leaves the DB
+PUBLIC_COURSE_PROJECTION = {"_id": 0, "quiz.questions.correct": 0}
+
+CourseView = Literal["full", "summary"]
 
 class CourseCreate(BaseModel):
     title: str
@@ -118,6 +301,80 @@ class CourseCreate(BaseModel):
     sessions: List[CourseSession]
     quiz: Quiz
 
+class AssetCreate(BaseModel):
+    filename: str = Field(min_length=1, max_length=255)
+    content_type: str
+    size: int = Field(gt=0)
+
+class Asset(BaseModel):
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    owner_id: str
+    filename: str
+    content_type: str
+    size: int
+    received: int = 0  # bytes stored so far; the offset to resume from
+    chunk_size: int = ASSET_CHUNK_SIZE
+    status: Literal["uploading", "ready"] = "uploading"
+    storage: str
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    completed_at: Optional[datetime] = None
+
+class ProgressUpdate(BaseModel):
+    completed_sessions: List[int] = Field(default_factory=list, max_length=500)
+    current_session: Optional[int] = None
+
+class CourseProgress(BaseModel):
+    user_id: str
+    course_id: str  # as in the URL, so catalog ids are strings here
+    course_category: str
+    completed_sessions: List[int] = []
+    current_session: Optional[int] = None
+    updated_at: Optional[datetime] = None
+
+class UserStats(BaseModel):
+    user_id: str
+    badges: int = 0
+    badges_by_category: Dict[str, int] = {}
+    average_quiz_score: float = 0
+    courses_created: int = 0
+    courses_published: int = 0
+    total_views: int = 0
+
+class LeaderboardLearner(BaseModel):
+    user_id: str
+    name: Optional[str] = None
+    picture: Optional[str] = None
+    badges: int
+    average_score: float
+
+class LeaderboardCourse(BaseModel):
+    course_id: Union[int, str]
+    course_category: str
+    course_title: str = ""
+    completions: int
+    average_score: float
+
+class CourseImportResult(BaseModel):
+    line: int
+    status: str  # created, error
+    id: Optional[str] = None
+    error: Optional[str] = None
+
+class CourseImportSummary(BaseModel):
+    created: int
+    failed: int
+    results: List[CourseImportResult]
+
+class FacetCount(BaseModel):
+    value: str
+    count: int
+
+class CourseCatalog(BaseModel):
+    courses: Union[List[CourseSummary], List[PublicCourse]]
+    total: int
+    facets: Dict[str, List[FacetCount]]
+    next_cursor: Optional[str] = None
+
 class StatusCheck(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     client_name: str
@@ -126,17 +383,32 @@ class StatusCheck(BaseModel):
 class StatusCheckCreate(BaseModel):
     client_name: str
 
+class StatusBucket(BaseModel):
+    start: datetime
+    count: int
+
+class StatusRollup(BaseModel):
+    client_name: str
+    last_seen: datetime
+    total: int
+    buckets: List[StatusBucket]
+
+# Keyset sort orders for list endpoints; each is backed by an index in indexes.py
+BADGE_SORT = ("earned_at", "id")
+COURSE_SORT = ("created_at", "id")
+STATUS_SORT = ("timestamp", "id")
+
 # JWT Token functions
 def create_access_token(data: dict):
     to_encode = data.copy()
     expire = datetime.utcnow() + timedelta(hours=24)
     to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, os.environ.get("SECRET_KEY"), algorithm="HS256")
+    encoded_jwt = token_verifier.encode(to_encode)
     return encoded_jwt
 
 def verify_token(token: str):
     try:
-        payload = jwt.decode(token, os.environ.get("SECRET_KEY"), algorithms=["HS256"])
+        payload = token_verifier.decode(token)
         return payload
     except jwt.exceptions.ExpiredSignatureError:
         raise HTTPException(status_code=401, detail="Token expired")
@@ -149,14 +421,52 @@ async def get_current_user(request: Request):
         raise HTTPException(status_code=401, detail="Missing or invalid authorization header")
     
     token = auth_header.split(" ")[1]
-    payload = verify_token(token)
+    with span("auth.verify_token"):
+        payload = verify_token(token)
     google_id = payload.get("sub")
     
-    user = await db.users.find_one({"google_id": google_id})
+    cached_user = user_cache.get(google_id)
+    if cached_user is not None:
+        return cached_user
+    
+    with span("auth.db"):
+        user = await db.users.find_one({"google_id": google_id})
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
-    return UserProfile(**user)
+    current_user = UserProfile(**user)
+    user_cache.set(google_id, current_user)
+    return current_user
+
+# Rate limit keys: authenticated routes are budgeted per user, anonymous ones per client address
+def user_key(current_user: UserProfile = Depends(get_current_user)) -> str:
+    return f"user:{current_user.id}"
+
+def client_ip_key(request: Request) -> str:
+    # The peer address; behind a trusted proxy run uvicorn with --proxy-headers so this is the real client
+    return f"ip:{request.client.host if request.client else 'unknown'}"
+
+def rate_limited(route: str, key=user_key):
+    return [Depends(rate_limiter.limit(route, key))]
+
+# Operational endpoints (/metrics, cache and pool stats) describe the deployment, not a user. With OPS_TOKEN set
+# they need "Authorization: Bearer <OPS_TOKEN>" (a Prometheus bearer_token); without it only loopback is served
+OPS_TOKEN = os.environ.get('OPS_TOKEN')
+
+def require_ops_access(request: Request) -> None:
+    if OPS_TOKEN:
+        supplied = request.headers.get("Authorization", "")
+        if not hmac.compare_digest(supplied.encode(), f"Bearer {OPS_TOKEN}".encode()):
+            raise HTTPException(status_code=403, detail="Invalid ops token")
+        return
+    try:
+        local = ipaddress.ip_address(request.client.host).is_loopback if request.client else False
+    except ValueError:
+        local = False
+    if not local:
+        raise HTTPException(status_code=403, detail="Operational endpoints are only served locally")
+
+ops_only = [Depends(require_ops_access)]
 
 # Authentication routes
 @api_router.get("/auth/login/google")
@@ -194,6 +504,7 @@ async def google_auth(request: Request):
             {"$set": user_data},
             upsert=True
         )
+        user_cache.pop(user_info["sub"])
         
         # Create JWT token
         access_token = create_access_token(data={
@@ -210,25 +521,28 @@ async def google_auth(request: Request):
         frontend_url = os.environ.get('FRONTEND_URL', 'https://dfe70bfd-0f3f-4410-b7d9-a3ddbd0a6aab.preview.emergentagent.com')
         return RedirectResponse(url=f"{frontend_url}/auth/error?message={str(e)}")
 
-@api_router.get("/auth/me", response_model=UserProfile)
+@api_router.get("/auth/me", response_model=UserProfile, dependencies=rate_limited("auth.read"))
 async def get_current_user_profile(current_user: UserProfile = Depends(get_current_user)):
     return current_user
 
-@api_router.put("/auth/profile", response_model=UserProfile)
+@api_router.put("/auth/profile", response_model=UserProfile, dependencies=rate_limited("profile.write"))
 async def update_user_profile(
     profile_update: UserProfileUpdate,
     current_user: UserProfile = Depends(get_current_user)
 ):
     update_data = profile_update.dict(exclude_unset=True)
     if update_data:
-        await db.users.update_one(
-            {"google_id": current_user.google_id},
-            {"$set": update_data}
-        )
-        
-        # Fetch updated user
-        updated_user = await db.users.find_one({"google_id": current_user.google_id})
-        return UserProfile(**updated_user)
+        with span("db"):
+            updated_user = await db.users.find_one_and_update(
+                {"google_id": current_user.google_id},
+                {"$set": update_data},
+                return_document=ReturnDocument.AFTER
+            )
+        user_cache.pop(current_user.google_id)
+        if not updated_user:
+            raise HTTPException(status_code=404, detail="User not found")
+        with span("model"):
+            return UserProfile(**updated_user)
     
     return current_user
 
@@ -237,168 +551,543 @@ async def logout():
     return {"message": "Logged out successfully"}
 
 # Badge endpoints
-@api_router.post("/badges", response_model=Badge)
+def new_badge(user_id: str, course_id, course_title: str, course_category: str, quiz_score: int) -> Badge:
+    # Create badge name and description based on course
+    return Badge(
+        user_id=user_id,
+        course_id=course_id,
+        course_title=course_title,
+        course_category=course_category,
+        badge_name=f"{course_category.title()} Completion",
+        badge_description=f"Successfully completed course with {quiz_score}% score",
+        quiz_score=quiz_score
+    )
+
+def session_asset_ids(course_data: CourseCreate) -> List[str]:
+    return [session.asset_id for session in course_data.sessions if session.asset_id]
+
+def grade_quiz(quiz: Quiz, answers: List[Optional[int]]) -> int:
+    questions = quiz.questions
+    if not questions:
+        return 100
+    correct = sum(
+        1 for i, question in enumerate(questions)
+        if i < len(answers) and answers[i] == question.correct
+    )
+    return round(correct * 100 / len(questions))
+
+@api_router.post("/badges", response_model=Badge, dependencies=rate_limited("badges.write"))
 async def create_badge(
     badge_data: BadgeCreate,
     current_user: UserProfile = Depends(get_current_user)
 ):
-    # Check if badge already exists for this user and course
-    existing_badge = await db.badges.find_one({
-        "user_id": current_user.id,
-        "course_id": badge_data.course_id,
-        "course_category": badge_data.course_category
-    })
-    
-    if existing_badge:
-        raise HTTPException(status_code=400, detail="Badge already earned for this course")
-    
-    # Create badge name and description based on course
-    badge_name = f"{badge_data.course_category.title()} Completion"
-    badge_description = f"Successfully completed course with {badge_data.quiz_score}% score"
-    
-    badge = Badge(
-        user_id=current_user.id,
-        course_id=badge_data.course_id,
-        course_title="",  # Will be filled by frontend
-        course_category=badge_data.course_category,
-        badge_name=badge_name,
-        badge_description=badge_description,
-        quiz_score=badge_data.quiz_score
+    if not 1 <= badge_data.course_id <= BUILTIN_COURSES.get(badge_data.course_category, 0):
+        raise HTTPException(status_code=404, detail="Course not found")
+    if badge_data.quiz_score < PASSING_SCORE:
+        raise HTTPException(status_code=400, detail="Quiz score below passing")
+    badge = new_badge(
+        current_user.id,
+        badge_data.course_id,
+        "",  # Will be filled by frontend
+        badge_data.course_category,
+        badge_data.quiz_score
     )
     
-    await db.badges.insert_one(badge.dict())
+    # The unique user_course index rejects a second badge for the same course
+    with span("db"):
+        try:
+            await db.badges.insert_one(badge.dict())
+        except DuplicateKeyError:
+            raise HTTPException(status_code=400, detail="Badge already earned for this course")
+        await record_badge(db.user_stats, current_user.id, badge.course_category, badge.quiz_score)
+        await leaderboards.badge_added(db.badges, badge.dict())
+    await response_cache.invalidate(badges_tag(current_user.id))
     return badge
 
-@api_router.get("/badges/me", response_model=List[Badge])
-async def get_my_badges(current_user: UserProfile = Depends(get_current_user)):
-    badges = await db.badges.find({"user_id": current_user.id}).to_list(1000)
-    return [Badge(**badge) for badge in badges]
+@api_router.post("/badges/award", response_model=BadgeAwardResult, dependencies=rate_limited("badges.write"))
+async def award_badge(
+    award: BadgeAward,
+    current_user: UserProfile = Depends(get_current_user)
+):
+    with span("db"):
+        course = await db.courses.find_one(
+            {"id": award.course_id, "published": True},
+            {"_id": 0, "title": 1, "category": 1, "quiz": 1}
+        )
+    if not course:
+        raise HTTPException(status_code=404, detail="Course not found")
+    
+    with span("model"):
+        score = grade_quiz(Quiz(**course["quiz"]), award.answers)
+    if score < PASSING_SCORE:
+        return BadgeAwardResult(score=score, passed=False)
+    
+    badge = new_badge(current_user.id, award.course_id, course["title"], course["category"], score)
+    key = {"user_id": badge.user_id, "course_id": badge.course_id, "course_category": badge.course_category}
+    with span("db"):
+        try:
+            result = await db.badges.update_one(key, {"$setOnInsert": badge.dict()}, upsert=True)
+        except DuplicateKeyError:
+            # A concurrent award for the same course won the race on the unique index
+            result = None
+        if result is None or result.upserted_id is None:
+            raise HTTPException(status_code=400, detail="Badge already earned for this course")
+        
+        await record_badge(db.user_stats, current_user.id, badge.course_category, score)
+        await leaderboards.badge_added(db.badges, badge.dict())
+    await response_cache.invalidate(badges_tag(current_user.id))
+    return BadgeAwardResult(score=score, passed=True, badge=badge)
+
+@api_router.get("/badges/me", response_model=List[Badge], dependencies=rate_limited("auth.read"))
+async def get_my_badges(
+    request: Request,
+    response: Response,
+    page: PageParams = Depends(page_params),
+    current_user: UserProfile = Depends(get_current_user)
+):
+    return await list_page(db.badges, {"user_id": current_user.id}, BADGE_SORT, Badge, page, request, response)
 
 @api_router.get("/badges/user/{user_id}", response_model=List[Badge])
-async def get_user_badges(user_id: str):
-    badges = await db.badges.find({"user_id": user_id}).to_list(1000)
-    return [Badge(**badge) for badge in badges]
+async def get_user_badges(
+    user_id: str,
+    request: Request,
+    response: Response,
+    page: PageParams = Depends(page_params)
+):
+    # Cached, so read from the primary: see ResponseCache
+    return await list_page(
+        db.badges, {"user_id": user_id}, BADGE_SORT, Badge, page, request, response,
+        cache_control=PUBLIC_CACHE_CONTROL, cache=response_cache, cache_tags=[badges_tag(user_id)],
+    )
 
-@api_router.put("/badges/{badge_id}", response_model=Badge)
+@api_router.put("/badges/{badge_id}", response_model=Badge, dependencies=rate_limited("badges.write"))
 async def update_badge_course_title(
     badge_id: str,
     course_title: str,
     current_user: UserProfile = Depends(get_current_user)
 ):
     # Update badge with course title
-    await db.badges.update_one(
-        {"id": badge_id, "user_id": current_user.id},
-        {"$set": {"course_title": course_title}}
-    )
-    
-    updated_badge = await db.badges.find_one({"id": badge_id})
+    with span("db"):
+        updated_badge = await db.badges.find_one_and_update(
+            {"id": badge_id, "user_id": current_user.id},
+            {"$set": {"course_title": course_title}, "$inc": {"version": 1}},
+            return_document=ReturnDocument.AFTER
+        )
     if not updated_badge:
         raise HTTPException(status_code=404, detail="Badge not found")
     
-    return Badge(**updated_badge)
+    await response_cache.invalidate(badges_tag(current_user.id))
+    with span("model"):
+        return Badge(**updated_badge)
 
 # Course endpoints
-@api_router.post("/courses", response_model=Course)
+@api_router.post("/courses", response_model=Course, dependencies=rate_limited("courses.write"))
 async def create_course(
     course_data: CourseCreate,
     current_user: UserProfile = Depends(get_current_user)
 ):
+    with span("db"):
+        await check_session_assets(db.assets, current_user.id, session_asset_ids(course_data))
     # Create course with user as instructor
-    course = Course(
-        **course_data.dict(),
-        instructor=current_user.name,
-        created_by=current_user.id
-    )
+    with span("model"):
+        course = Course(
+            **course_data.dict(),
+            instructor=current_user.name,
+            created_by=current_user.id
+        )
     
-    await db.courses.insert_one(course.dict())
+    with span("db"):
+        await db.courses.insert_one(course.dict())
+        await record_courses_created(db.user_stats, current_user.id)
+    await response_cache.invalidate(courses_tag(current_user.id))
     return course
 
-@api_router.get("/courses/created", response_model=List[Course])
-async def get_user_created_courses(current_user: UserProfile = Depends(get_current_user)):
-    courses = await db.courses.find({"created_by": current_user.id}).to_list(1000)
-    return [Course(**course) for course in courses]
+@api_router.post("/courses/import", response_model=CourseImportSummary, dependencies=rate_limited("courses.import"))
+async def import_courses(
+    request: Request,
+    current_user: UserProfile = Depends(get_current_user)
+):
+    # Body is NDJSON, one CourseCreate per line; records are validated as they arrive
+    def build(record):
+        with span("model"):
+            course_data = CourseCreate.parse_obj(record)
+            return Course(
+                **course_data.dict(),
+                instructor=current_user.name,
+                created_by=current_user.id
+            ).dict()
+    
+    async def check(courses):
+        with span("db"):
+            return await check_imported_assets(db.assets, current_user.id, courses)
+    
+    results = await import_ndjson(db.courses, request.stream(), build, check=check)
+    created = sum(1 for result in results if result["status"] == "created")
+    if created:
+        with span("db"):
+            await record_courses_created(db.user_stats, current_user.id, created)
+        await response_cache.invalidate(courses_tag(current_user.id))
+    return CourseImportSummary(created=created, failed=len(results) - created, results=results)
+
+@api_router.get("/courses/export", dependencies=rate_limited("courses.export"))
+async def export_courses(current_user: UserProfile = Depends(get_current_user)):
+    cursor = db.courses.find({"created_by": current_user.id}).sort(sort_spec(COURSE_SORT))
+    return ndjson_response(cursor.batch_size(DEFAULT_PAGE_SIZE), Course)
+
+@api_router.get("/courses", response_model=CourseCatalog)
+async def get_course_catalog(
+    category: Optional[str] = None,
+    level: Optional[str] = None,
+    tags: Optional[List[str]] = Query(None),
+    q: Optional[str] = None,
+    view: CourseView = "summary",
+    page: PageParams = Depends(page_params)
+):
+    # A listing, so cards by default; ?view=full for the public course documents
+    model, projection = course_view_model(view)
+    limit = page.limit or DEFAULT_PAGE_SIZE
+    match = catalog_match(category=category, level=level, tags=tags, search=q)
+    with span("db"):
+        courses, [counts] = await asyncio.gather(
+            catalog_page(list_db.courses, match, COURSE_SORT, page.after, limit, projection).to_list(limit + 1),
+            list_db.courses.aggregate(catalog_counts_pipeline(match)).to_list(1),
+        )
+    
+    next_cursor = None
+    if len(courses) > limit:
+        courses = courses[:limit]
+        next_cursor = encode_cursor(courses[-1], COURSE_SORT)
+    
+    with span("model"):
+        return fast_json(CourseCatalog(
+            courses=[model(**course) for course in courses],
+            total=counts["total"][0]["count"] if counts["total"] else 0,
+            facets={
+                field: [FacetCount(value=str(bucket["_id"]), count=bucket["count"]) for bucket in counts[field]]
+                for field in FACET_FIELDS
+            },
+            next_cursor=next_cursor,
+        ))
 
-@api_router.get("/courses/created/{user_id}", response_model=List[Course])
-async def get_courses_by_user(user_id: str):
-    courses = await db.courses.find({"created_by": user_id, "published": True}).to_list(1000)
-    return [Course(**course) for course in courses]
+def course_view_model(view: CourseView, public: bool = True):
+    if view == "summary":
+        return CourseSummary, COURSE_SUMMARY_PROJECTION
+    if public:
+        return PublicCourse, PUBLIC_COURSE_PROJECTION
+    return Course, None
 
-@api_router.get("/courses/{course_id}", response_model=Course)
-async def get_course(course_id: str):
-    course = await db.courses.find_one({"id": course_id})
+@api_router.get(
+    "/courses/created",
+    response_model=Union[List[Course], List[CourseSummary]],
+    dependencies=rate_limited("auth.read"),
+)
+async def get_user_created_courses(
+    request: Request,
+    response: Response,
+    view: CourseView = "full",
+    page: PageParams = Depends(page_params),
+    current_user: UserProfile = Depends(get_current_user)
+):
+    # The author's own list keeps the answer key so the course can be edited
+    model, projection = course_view_model(view, public=False)
+    query = {"created_by": current_user.id}
+    return await list_page(db.courses, query, COURSE_SORT, model, page, request, response, projection)
+
+@api_router.get("/courses/created/{user_id}", response_model=Union[List[PublicCourse], List[CourseSummary]])
+async def get_courses_by_user(
+    user_id: str,
+    request: Request,
+    response: Response,
+    view: CourseView = "full",
+    page: PageParams = Depends(page_params)
+):
+    model, projection = course_view_model(view)
+    query = {"created_by": user_id, "published": True}
+    return await list_page(
+        db.courses, query, COURSE_SORT, model, page, request, response, projection,
+        PUBLIC_CACHE_CONTROL, cache=response_cache, cache_tags=[courses_tag(user_id)],
+    )
+
+@api_router.get("/courses/{course_id}", response_model=Union[PublicCourse, CourseSummary])
+async def get_course(request: Request, response: Response, course_id: str, view: CourseView = "full"):
+    model, projection = course_view_model(view)
+    with span("db"):
+        course = await db.courses.find_one({"id": course_id}, projection)
     if not course:
         raise HTTPException(status_code=404, detail="Course not found")
-    return Course(**course)
+    
+    # Only full reads of published courses are views; summaries back listings and drafts are author previews
+    counted = view == "full" and course.get("published")
+    if counted:
+        view_counter.record(course_id, course["created_by"])
+    course["views"] = course.get("views", 0) + view_counter.pending(course_id)
+    
+    # Drafts are only fetched by their author, so keep them out of shared caches. Counted reads must
+    # reach us to be counted, so caches may store them but have to revalidate every time
+    if counted:
+        cache_control = REVALIDATE_CACHE_CONTROL
+    elif course.get("published"):
+        cache_control = PUBLIC_CACHE_CONTROL
+    else:
+        cache_control = PRIVATE_CACHE_CONTROL
+    # The served view count moves with every counted read, so it stays out of the validator: revalidations
+    # get a 304 with a slightly stale count instead of a fresh render, hence a weak ETag
+    not_modified = conditional(request, response, document_etag(course, view, weak=True), cache_control)
+    if not_modified:
+        return not_modified
+    with span("model"):
+        return fast_json(model(**course), response)
 
-@api_router.put("/courses/{course_id}", response_model=Course)
+@api_router.put("/courses/{course_id}", response_model=Course, dependencies=rate_limited("courses.write"))
 async def update_course(
     course_id: str,
     course_data: CourseCreate,
     current_user: UserProfile = Depends(get_current_user)
 ):
-    # Check if user owns the course
-    existing_course = await db.courses.find_one({"id": course_id, "created_by": current_user.id})
-    if not existing_course:
+    with span("db"):
+        await check_session_assets(db.assets, current_user.id, session_asset_ids(course_data))
+        # Ownership is part of the filter, so check and write happen in one operation
+        updated_course = await db.courses.find_one_and_update(
+            {"id": course_id, "created_by": current_user.id},
+            {"$set": course_data.dict(), "$inc": {"version": 1}},
+            return_document=ReturnDocument.AFTER
+        )
+    if not updated_course:
         raise HTTPException(status_code=404, detail="Course not found or unauthorized")
     
-    # Update course
-    await db.courses.update_one(
-        {"id": course_id},
-        {"$set": course_data.dict()}
-    )
-    
-    updated_course = await db.courses.find_one({"id": course_id})
-    return Course(**updated_course)
+    await response_cache.invalidate(courses_tag(current_user.id))
+    with span("model"):
+        return Course(**updated_course)
 
-@api_router.put("/courses/{course_id}/publish")
+@api_router.put("/courses/{course_id}/publish", dependencies=rate_limited("courses.write"))
 async def publish_course(
     course_id: str,
     current_user: UserProfile = Depends(get_current_user)
 ):
-    # Check if user owns the course
-    existing_course = await db.courses.find_one({"id": course_id, "created_by": current_user.id})
-    if not existing_course:
-        raise HTTPException(status_code=404, detail="Course not found or unauthorized")
-    
-    # Publish course
-    await db.courses.update_one(
-        {"id": course_id},
-        {"$set": {"published": True}}
-    )
-    
+    # The document as it was before the update tells us whether this call published it
+    with span("db"):
+        previous = await db.courses.find_one_and_update(
+            {"id": course_id, "created_by": current_user.id},
+            {"$set": {"published": True}, "$inc": {"version": 1}},
+            projection={"_id": 0, "published": 1},
+            return_document=ReturnDocument.BEFORE
+        )
+        if not previous:
+            raise HTTPException(status_code=404, detail="Course not found or unauthorized")
+        
+        if not previous.get("published"):
+            await record_course_published(db.user_stats, current_user.id)
+    await response_cache.invalidate(courses_tag(current_user.id))
     return {"message": "Course published successfully"}
 
-@api_router.delete("/courses/{course_id}")
+@api_router.delete("/courses/{course_id}", dependencies=rate_limited("courses.write"))
 async def delete_course(
     course_id: str,
     current_user: UserProfile = Depends(get_current_user)
 ):
-    # Check if user owns the course
-    existing_course = await db.courses.find_one({"id": course_id, "created_by": current_user.id})
-    if not existing_course:
-        raise HTTPException(status_code=404, detail="Course not found or unauthorized")
+    with span("db"):
+        deleted_course = await db.courses.find_one_and_delete(
+            {"id": course_id, "created_by": current_user.id},
+            projection={"_id": 0, "published": 1, "views": 1}
+        )
+        if not deleted_course:
+            raise HTTPException(status_code=404, detail="Course not found or unauthorized")
+        
+        view_counter.discard(course_id)
+        await record_course_deleted(db.user_stats, current_user.id, deleted_course)
+    await response_cache.invalidate(courses_tag(current_user.id))
+    return {"message": "Course deleted successfully"}
+
+# Asset uploads: create, then PUT chunk_size pieces in order (GET .../upload to find where to resume)
+@api_router.post("/assets", response_model=Asset, dependencies=rate_limited("assets.write"))
+async def create_asset(
+    asset_data: AssetCreate,
+    current_user: UserProfile = Depends(get_current_user)
+):
+    content_type = asset_content_type(asset_data.content_type)
+    if content_type is None:
+        raise HTTPException(status_code=415, detail="Unsupported asset type")
+    if asset_data.size > ASSET_MAX_SIZE:
+        raise HTTPException(status_code=413, detail="Asset too large")
     
-    # Delete course
-    await db.courses.delete_one({"id": course_id})
+    asset = Asset(
+        **{**asset_data.dict(), "content_type": content_type}, owner_id=current_user.id, storage=asset_storage.name
+    )
+    with span("storage"):
+        await asset_storage.create(asset.dict())
+    with span("db"):
+        await db.assets.insert_one(asset.dict())
+    return asset
+
+async def find_own_asset(asset_id: str, current_user: UserProfile) -> dict:
+    with span("db"):
+        asset = await db.assets.find_one({"id": asset_id, "owner_id": current_user.id}, {"_id": 0})
+    if not asset:
+        raise HTTPException(status_code=404, detail="Asset not found")
+    return asset
+
+@api_router.get("/assets/{asset_id}/upload", response_model=Asset)
+async def get_asset_upload(
+    asset_id: str,
+    current_user: UserProfile = Depends(get_current_user)
+):
+    return Asset(**await find_own_asset(asset_id, current_user))
+
+@api_router.put("/assets/{asset_id}/chunks", response_model=Asset, dependencies=rate_limited("assets.write"))
+async def upload_asset_chunk(
+    asset_id: str,
+    offset: int = Query(..., ge=0),
+    chunk: UploadFile = File(...),
+    current_user: UserProfile = Depends(get_current_user)
+):
+    asset = await find_own_asset(asset_id, current_user)
+    data = await chunk.read()
+    # Storage write plus the offset update on assets
+    with span("storage"):
+        asset = await receive_chunk(db.assets, asset_storage, asset, offset, data)
+    with span("model"):
+        return Asset(**asset)
+
+@api_router.api_route("/assets/{asset_id}", methods=["GET", "HEAD"])
+async def get_asset_content(asset_id: str, request: Request):
+    # Public by id, like the external video URLs it replaces: <video> can't send a bearer token
+    with span("db"):
+        asset = await db.assets.find_one({"id": asset_id, "status": "ready"}, {"_id": 0})
+    if not asset:
+        raise HTTPException(status_code=404, detail="Asset not found")
+    return asset_response(request, asset, asset_storage)
+
+@api_router.delete("/assets/{asset_id}", dependencies=rate_limited("assets.write"))
+async def delete_asset(
+    asset_id: str,
+    current_user: UserProfile = Depends(get_current_user)
+):
+    asset = await find_own_asset(asset_id, current_user)
+    with span("db"):
+        if await db.courses.find_one({"sessions.asset_id": asset_id}, {"_id": 1}):
+            raise HTTPException(status_code=409, detail="Asset is used by a course")
+        
+        await db.assets.delete_one({"id": asset_id})
+    with span("storage"):
+        await asset_storage.delete(asset)
+    return {"message": "Asset deleted successfully"}
+
+# Progress pings land in progress_buffer; reads overlay whatever hasn't been flushed yet
+@api_router.post("/progress/{course_category}/{course_id}", status_code=202, dependencies=rate_limited("progress.write"))
+async def record_progress(
+    course_category: str,
+    course_id: str,
+    update: ProgressUpdate,
+    current_user: UserProfile = Depends(get_current_user)
+):
+    key = (current_user.id, course_category, course_id)
+    progress_buffer.record(key, update.completed_sessions, update.current_session)
+    return {"message": "Progress recorded"}
+
+@api_router.get(
+    "/progress/{course_category}/{course_id}", response_model=CourseProgress, dependencies=rate_limited("auth.read")
+)
+async def get_progress(
+    course_category: str,
+    course_id: str,
+    current_user: UserProfile = Depends(get_current_user)
+):
+    key = (current_user.id, course_category, course_id)
+    with span("db"):
+        stored = await db.progress.find_one(
+            {"user_id": current_user.id, "course_category": course_category, "course_id": course_id}, {"_id": 0}
+        )
+    with span("model"):
+        return CourseProgress(**progress_buffer.merge(key, stored))
+
+@api_router.get("/leaderboard/learners", response_model=List[LeaderboardLearner])
+async def get_top_learners(
+    category: Optional[str] = None,
+    window: LeaderboardWindow = "all",
+    limit: int = Query(10, ge=1, le=100)
+):
+    # A cache hit never reaches the database, so "db" here is mostly rebuilds
+    with span("db"):
+        rows = await leaderboards.ranking(list_db.badges, "learners", category, window, limit)
+    with span("model"):
+        return [LeaderboardLearner(**row) for row in rows]
+
+@api_router.get("/leaderboard/courses", response_model=List[LeaderboardCourse])
+async def get_top_courses(
+    category: Optional[str] = None,
+    window: LeaderboardWindow = "all",
+    limit: int = Query(10, ge=1, le=100)
+):
+    with span("db"):
+        rows = await leaderboards.ranking(list_db.badges, "courses", category, window, limit)
+    with span("model"):
+        return [LeaderboardCourse(**row) for row in rows]
+
+@api_router.get("/users/{user_id}/stats", response_model=UserStats)
+async def get_user_stats(user_id: str):
+    with span("db"):
+        doc = await load_user_stats(db, user_id)
+    if doc is None:
+        raise HTTPException(status_code=404, detail="User not found")
     
-    return {"message": "Course deleted successfully"}
+    average = doc["quiz_score_total"] / doc["badges"] if doc["badges"] else 0
+    with span("model"):
+        return UserStats(**doc, average_quiz_score=round(average, 1))
+
+@api_router.get("/cache/stats", dependencies=ops_only)
+async def get_cache_stats():
+    return {
+        "users": user_cache.stats(),
+        "tokens": token_verifier.stats(),
+        "responses": response_cache.stats(),
+        "leaderboards": leaderboards.stats(),
+    }
+
+@api_router.get("/db/pool", dependencies=ops_only)
+async def get_pool_stats():
+    return pool_metrics.snapshot()
 
 # Existing routes
 @api_router.get("/")
 async def root():
     return {"message": "Hello World"}
 
-@api_router.post("/status", response_model=StatusCheck)
+@api_router.post("/status", response_model=StatusCheck, dependencies=rate_limited("status.write", client_ip_key))
 async def create_status_check(input: StatusCheckCreate):
     status_dict = input.dict()
     status_obj = StatusCheck(**status_dict)
-    _ = await db.status_checks.insert_one(status_obj.dict())
+    with span("db"):
+        _ = await db.status_checks.insert_one(status_obj.dict())
+        await record_status_check(db.status_rollups, status_obj.client_name, status_obj.timestamp)
     return status_obj
 
+@api_router.get("/status/latest", response_model=List[StatusCheck])
+async def get_latest_status_checks(
+    client_name: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=MAX_PAGE_SIZE)
+):
+    # Newest first, walking timestamp_id (or client_timestamp_id) backwards
+    query = {"client_name": client_name} if client_name else {}
+    cursor = list_db.status_checks.find(query, {"_id": 0}).sort([("timestamp", DESCENDING), ("id", DESCENDING)])
+    with span("db"):
+        docs = await cursor.limit(limit).to_list(limit)
+    with span("model"):
+        return [StatusCheck(**doc) for doc in docs]
+
+@api_router.get("/status/rollup", response_model=List[StatusRollup])
+async def get_status_rollup(hours: int = Query(24, ge=1, le=24 * 90)):
+    with span("db"):
+        rollups = await load_rollups(list_db.status_rollups, datetime.utcnow() - timedelta(hours=hours))
+    with span("model"):
+        return [StatusRollup(**rollup) for rollup in rollups]
+
 @api_router.get("/status", response_model=List[StatusCheck])
-async def get_status_checks():
-    status_checks = await db.status_checks.find().to_list(1000)
-    return [StatusCheck(**status_check) for status_check in status_checks]
+async def get_status_checks(
+    request: Request,
+    response: Response,
+    page: PageParams = Depends(page_params)
+):
+    return await list_page(list_db.status_checks, {}, STATUS_SORT, StatusCheck, page, request, response)
 
 # Include the router in the main app
 app.include_router(api_router)
@@ -409,8 +1098,40 @@ app.add_middleware(
     allow_origins=["*"],
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, "ETag", "Retry-After", "Upload-Offset", "Content-Range"],
 )
 
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=int(os.environ.get('COMPRESSION_MIN_SIZE', '1024')),
+    gzip_level=int(os.environ.get('GZIP_LEVEL', '6')),
+    brotli_quality=int(os.environ.get('BROTLI_QUALITY', '4')),
+)
+
+# Outermost, so latency includes every other middleware
+app.add_middleware(MetricsMiddleware)
+
+def collect_runtime_metrics():
+    yield from snapshot_gauges("mongodb_pool", "MongoDB connection pool", {"": pool_metrics.snapshot()})
+    caches = {
+        "users": user_cache.stats(),
+        "tokens": token_verifier.stats(),
+        "responses": response_cache.stats(),
+        "leaderboards": leaderboards.stats(),
+    }
+    yield from snapshot_gauges("app_cache", "In-process cache", caches, label="cache")
+    yield from snapshot_gauges("course_views", "Buffered course view counter", {"": view_counter.stats()})
+    yield from snapshot_gauges("progress_buffer", "Buffered learning progress", {"": progress_buffer.stats()})
+    yield from snapshot_gauges("rate_limit", "Rate limiter", {"": rate_limiter.stats()})
+    in_flight = {route: {"in_flight": count} for route, count in rate_limiter.in_flight().items()}
+    yield from snapshot_gauges("rate_limit_route", "Rate limited route", in_flight, label="route")
+
+REGISTRY.add_collector(collect_runtime_metrics)
+
+@app.get("/metrics", include_in_schema=False, dependencies=ops_only)
+async def metrics():
+    return PlainTextResponse(REGISTRY.render(), media_type=CONTENT_TYPE)
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -418,6 +1139,35 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+@app.exception_handler(WaitQueueTimeoutError)
+async def pool_exhausted_handler(request: Request, exc: WaitQueueTimeoutError):
+    # Shed load instead of queueing when every pooled connection stays busy past MONGO_WAIT_QUEUE_TIMEOUT_MS
+    logger.warning("MongoDB connection pool exhausted: %s", exc)
+    return JSONResponse(status_code=503, content={"detail": "Database busy"}, headers={"Retry-After": "1"})
+
+@app.on_event("startup")
+async def startup_db_client():
+    await warm_up(client, db_settings.warm_connections)
+    await ensure_indexes(db)
+    app.state.view_flusher = asyncio.create_task(view_counter.run(db, VIEW_FLUSH_INTERVAL))
+    app.state.progress_flusher = asyncio.create_task(progress_buffer.run(db.progress, PROGRESS_FLUSH_INTERVAL))
+    app.state.upload_sweeper = asyncio.create_task(sweep_uploads(db.assets, asset_storage, ASSET_SWEEP_INTERVAL))
+
 @app.on_event("shutdown")
 async def shutdown_db_client():
+    for task in (app.state.view_flusher, app.state.progress_flusher, app.state.upload_sweeper):
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+    # Write out views and progress buffered since the last periodic flush before the client goes away
+    try:
+        await view_counter.flush(db)
+    except Exception:
+        logger.exception("Failed to flush course views on shutdown")
+    try:
+        await progress_buffer.flush(db.progress)
+    except Exception:
+        logger.exception("Failed to flush learning progress on shutdown")
     client.close()
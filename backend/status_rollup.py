@@ -0,0 +1,40 @@
+import os
+from datetime import datetime, timedelta
+from typing import Any, Dict, List
+
+# Raw status checks expire after this long; per-interval rollups are kept longer
+STATUS_CHECK_TTL_SECONDS = int(os.environ.get("STATUS_CHECK_TTL_SECONDS", str(7 * 24 * 3600)))
+STATUS_ROLLUP_TTL_SECONDS = int(os.environ.get("STATUS_ROLLUP_TTL_SECONDS", str(90 * 24 * 3600)))
+STATUS_ROLLUP_INTERVAL_SECONDS = int(os.environ.get("STATUS_ROLLUP_INTERVAL_SECONDS", "300"))
+
+
+def bucket_start(timestamp: datetime, interval: int = STATUS_ROLLUP_INTERVAL_SECONDS) -> datetime:
+    """Start of the rollup interval containing ``timestamp``."""
+    epoch = datetime(1970, 1, 1)
+    seconds = int((timestamp - epoch).total_seconds())
+    return epoch + timedelta(seconds=seconds - seconds % interval)
+
+
+async def record_status_check(
+    rollups, client_name: str, timestamp: datetime, interval: int = STATUS_ROLLUP_INTERVAL_SECONDS
+) -> None:
+    """Count a check in its client's current interval; one upsert on the client_bucket_unique index."""
+    await rollups.update_one(
+        {"client_name": client_name, "bucket": bucket_start(timestamp, interval)},
+        {"$inc": {"count": 1}, "$max": {"last_seen": timestamp}},
+        upsert=True,
+    )
+
+
+async def load_rollups(rollups, since: datetime) -> List[Dict[str, Any]]:
+    """Per-client summary of the intervals starting at or after ``since``, busiest client first."""
+    clients: Dict[str, Dict[str, Any]] = {}
+    cursor = rollups.find({"bucket": {"$gte": bucket_start(since)}}, {"_id": 0}).sort("bucket", 1)
+    async for doc in cursor:
+        client = clients.setdefault(
+            doc["client_name"], {"client_name": doc["client_name"], "last_seen": doc["last_seen"], "total": 0, "buckets": []}
+        )
+        client["last_seen"] = max(client["last_seen"], doc["last_seen"])
+        client["total"] += doc["count"]
+        client["buckets"].append({"start": doc["bucket"], "count": doc["count"]})
+    return sorted(clients.values(), key=lambda c: (-c["total"], c["client_name"]))
@@ -0,0 +1,52 @@
+import hashlib
+import time
+from typing import Any, Dict, Sequence
+
+import jwt
+
+from cache import TTLCache
+
+
+class TokenVerifier:
+    """Verifies HS256 JWTs, memoizing successful decodes until the token expires.
+
+    Tokens are keyed by their SHA-256 digest, so only a byte-identical token
+    can hit the cache. A cached entry lapses exactly at the token's ``exp``,
+    after which the next call falls through to ``jwt.decode`` and raises
+    ``ExpiredSignatureError`` as usual. Tokens without ``exp`` are never cached.
+    """
+
+    def __init__(
+        self,
+        secret_key: str,
+        algorithms: Sequence[str] = ("HS256",),
+        maxsize: int = 10000,
+        clock=time.time,
+    ):
+        self.secret_key = secret_key
+        self.algorithms = list(algorithms)
+        self._clock = clock
+        self._cache = TTLCache(maxsize=maxsize, ttl=0, clock=clock)
+
+    def decode(self, token: str) -> Dict[str, Any]:
+        digest = hashlib.sha256(token.encode()).digest()
+        payload = self._cache.get(digest)
+        if payload is not None:
+            return payload
+
+        payload = jwt.decode(token, self.secret_key, algorithms=self.algorithms)
+        exp = payload.get("exp")
+        if isinstance(exp, (int, float)):
+            ttl = exp - self._clock()
+            if ttl > 0:
+                self._cache.set(digest, payload, ttl=ttl)
+        return payload
+
+    def encode(self, payload: Dict[str, Any]) -> str:
+        return jwt.encode(payload, self.secret_key, algorithm=self.algorithms[0])
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return self._cache.stats()
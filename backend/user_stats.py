@@ -0,0 +1,130 @@
+from typing import Any, Dict, Optional
+
+from pymongo import UpdateOne
+from pymongo.errors import DuplicateKeyError
+
+# Counters kept on every user_stats document; badges_by_category is a map of category -> count
+COUNTERS = ("badges", "quiz_score_total", "courses_created", "courses_published", "total_views")
+
+# How often load_user_stats rebuilds a first-read document while writes keep racing it
+REBUILD_ATTEMPTS = 3
+
+
+def category_field(category: str) -> str:
+    """Key for ``category`` inside badges_by_category; '.' and '$' would be read as field paths."""
+    return category.replace(".", "_").replace("$", "_") or "_"
+
+
+def _inc_update(inc: Dict[str, int]) -> Dict[str, Any]:
+    # Upserted, so no increment is ever lost: one that arrives before the document has been
+    # built lands on a partial document (rebuilt: false), which load_user_stats reconciles.
+    # ``increments`` counts the writes, so a rebuild can tell whether one raced it.
+    return {"$inc": {**inc, "increments": 1}, "$setOnInsert": {"rebuilt": False}}
+
+
+async def _inc(stats, user_id: str, inc: Dict[str, int]) -> None:
+    await stats.update_one({"user_id": user_id}, _inc_update(inc), upsert=True)
+
+
+async def record_badge(stats, user_id: str, category: str, score: int) -> None:
+    await _inc(stats, user_id, {
+        "badges": 1,
+        "quiz_score_total": score,
+        f"badges_by_category.{category_field(category)}": 1,
+    })
+
+
+async def record_courses_created(stats, user_id: str, count: int = 1) -> None:
+    await _inc(stats, user_id, {"courses_created": count})
+
+
+async def record_course_published(stats, user_id: str) -> None:
+    await _inc(stats, user_id, {"courses_published": 1})
+
+
+async def record_course_deleted(stats, user_id: str, course: Dict[str, Any]) -> None:
+    """``course`` is the deleted document; it needs at least ``published`` and ``views``."""
+    await _inc(stats, user_id, {
+        "courses_created": -1,
+        "courses_published": -1 if course.get("published") else 0,
+        "total_views": -course.get("views", 0),
+    })
+
+
+async def record_views(stats, views_by_user: Dict[str, int]) -> None:
+    """Add buffered course views to each owner's total in one unordered bulk write."""
+    if views_by_user:
+        await stats.bulk_write(
+            [
+                UpdateOne({"user_id": user_id}, _inc_update({"total_views": views}), upsert=True)
+                for user_id, views in views_by_user.items()
+            ],
+            ordered=False,
+        )
+
+
+async def rebuild_user_stats(db, user_id: str) -> Dict[str, Any]:
+    """Recompute a user's stats from badges and courses (two grouped, index-backed aggregations)."""
+    doc: Dict[str, Any] = {"user_id": user_id, "badges_by_category": {}, **{name: 0 for name in COUNTERS}}
+
+    badges = db.badges.aggregate([
+        {"$match": {"user_id": user_id}},
+        {"$group": {"_id": "$course_category", "count": {"$sum": 1}, "score": {"$sum": "$quiz_score"}}},
+    ])
+    async for group in badges:
+        doc["badges_by_category"][category_field(str(group["_id"]))] = group["count"]
+        doc["badges"] += group["count"]
+        doc["quiz_score_total"] += group["score"]
+
+    courses = await db.courses.aggregate([
+        {"$match": {"created_by": user_id}},
+        {"$group": {
+            "_id": None,
+            "created": {"$sum": 1},
+            "published": {"$sum": {"$cond": ["$published", 1, 0]}},
+            "views": {"$sum": "$views"},
+        }},
+    ]).to_list(1)
+    if courses:
+        doc.update(
+            courses_created=courses[0]["created"],
+            courses_published=courses[0]["published"],
+            total_views=courses[0]["views"],
+        )
+    return doc
+
+
+async def load_user_stats(db, user_id: str) -> Optional[Dict[str, Any]]:
+    """Read a user's stats document, building it on first access. ``None`` if the user doesn't exist.
+
+    A missing or partial document is rebuilt from the source collections
+    and saved only if no increment landed on it meanwhile (a missing one
+    must still be missing). Otherwise the write that raced may or may not
+    be in the snapshot, so the rebuild starts over; after REBUILD_ATTEMPTS
+    the snapshot is served unsaved and the next read tries again.
+    """
+    doc = None
+    for _ in range(REBUILD_ATTEMPTS):
+        stored = await db.user_stats.find_one({"user_id": user_id}, {"_id": 0})
+        # Documents from before the rebuilt flag were always complete
+        if stored is not None and stored.get("rebuilt", True):
+            return stored
+        if stored is None and not await db.users.find_one({"id": user_id}, {"_id": 1}):
+            return None
+
+        doc = await rebuild_user_stats(db, user_id)
+        if stored is None:
+            try:
+                await db.user_stats.insert_one({**doc, "rebuilt": True, "increments": 0})
+            except DuplicateKeyError:
+                # An increment or a concurrent first read created it
+                continue
+            return doc
+        # The snapshot replaces the partial counts, which it already includes
+        result = await db.user_stats.update_one(
+            {"user_id": user_id, "rebuilt": False, "increments": stored["increments"]},
+            {"$set": {**doc, "rebuilt": True}},
+        )
+        if result.modified_count:
+            return doc
+    return doc
@@ -0,0 +1,135 @@
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+from user_stats import record_views
+
+logger = logging.getLogger(__name__)
+
+
+class ViewCounter:
+    """Buffers course views in memory and writes them out in batches.
+
+    ``record`` is a dict update, so counting a view adds no write to the
+    read path. ``flush`` sends all pending increments as one unordered
+    ``bulk_write`` of ``$inc`` operations, then rolls the views that were
+    applied into the owners' user_stats totals the same way. Each of the
+    two writes re-queues only what it failed to apply, so a failure in one
+    never loses or repeats the other. Until the course write is
+    acknowledged, ``pending`` still includes the views being flushed, so
+    served counts don't dip mid-flush. Counts are approximate. Views
+    buffered in a process that dies without a graceful shutdown are lost.
+    """
+
+    def __init__(self):
+        # course id -> (pending views, owner user id)
+        self._pending: Dict[str, Tuple[int, str]] = {}
+        # What the current flush is writing to courses, until the write is acknowledged
+        self._inflight: Dict[str, Tuple[int, str]] = {}
+        # owner user id -> views already applied to courses but not yet to user_stats
+        self._owner_views: Dict[str, int] = {}
+        self.recorded = 0
+        self.flushes = 0
+        self.flush_failures = 0
+
+    def record(self, course_id: str, owner_id: str) -> None:
+        views, _ = self._pending.get(course_id, (0, owner_id))
+        self._pending[course_id] = (views + 1, owner_id)
+        self.recorded += 1
+
+    def pending(self, course_id: str) -> int:
+        """Views recorded for ``course_id`` but not yet written, to add to the stored count."""
+        return self._pending.get(course_id, (0, ""))[0] + self._inflight.get(course_id, (0, ""))[0]
+
+    def discard(self, course_id: str) -> None:
+        self._pending.pop(course_id, None)
+
+    def _requeue(self, entries: List[Tuple[str, Tuple[int, str]]]) -> None:
+        for course_id, (views, owner_id) in entries:
+            current, _ = self._pending.get(course_id, (0, owner_id))
+            self._pending[course_id] = (current + views, owner_id)
+
+    async def _write_courses(self, db, entries: List[Tuple[str, Tuple[int, str]]]) -> Optional[BulkWriteError]:
+        """Apply ``entries`` to courses; returns the error if some of them weren't applied."""
+        try:
+            await db.courses.bulk_write(
+                [UpdateOne({"id": course_id}, {"$inc": {"views": views}}) for course_id, (views, _) in entries],
+                ordered=False,
+            )
+        except BulkWriteError as e:
+            # Unordered, so every write but the reported ones was applied; only those go back
+            failed = {error["index"] for error in e.details.get("writeErrors", [])}
+            self._requeue([entry for i, entry in enumerate(entries) if i in failed])
+            entries = [entry for i, entry in enumerate(entries) if i not in failed]
+            error: Optional[BulkWriteError] = e
+        except Exception:
+            # Unknown how much was applied; retrying all of it may count some views twice,
+            # which beats dropping them
+            self._requeue(entries)
+            raise
+        else:
+            error = None
+        self._add_owner_views((owner_id, views) for _, (views, owner_id) in entries)
+        return error
+
+    def _add_owner_views(self, entries) -> None:
+        for owner_id, views in entries:
+            self._owner_views[owner_id] = self._owner_views.get(owner_id, 0) + views
+
+    async def _write_owner_views(self, db) -> None:
+        owner_views, self._owner_views = self._owner_views, {}
+        try:
+            await record_views(db.user_stats, owner_views)
+        except BulkWriteError as e:
+            entries = list(owner_views.items())
+            self._add_owner_views(entries[error["index"]] for error in e.details.get("writeErrors", []))
+            raise
+        except Exception:
+            self._add_owner_views(owner_views.items())
+            raise
+
+    async def flush(self, db) -> int:
+        """Write pending views to ``db``; returns the number of courses updated."""
+        if not self._pending and not self._owner_views:
+            return 0
+        pending, self._pending = self._pending, {}
+        error = None
+        try:
+            if pending:
+                self._inflight = pending
+                try:
+                    error = await self._write_courses(db, list(pending.items()))
+                finally:
+                    # Failed views are back in _pending by now, so they aren't counted twice
+                    self._inflight = {}
+            await self._write_owner_views(db)
+        except Exception:
+            self.flush_failures += 1
+            raise
+        if error is not None:
+            self.flush_failures += 1
+            raise error
+        self.flushes += 1
+        return len(pending)
+
+    async def run(self, db, interval: float) -> None:
+        """Flush every ``interval`` seconds until cancelled."""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.flush(db)
+            except Exception:
+                logger.exception("Failed to flush course views; will retry")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "pending_courses": len(self._pending),
+            "pending_views": sum(views for views, _ in self._pending.values()),
+            "pending_owner_views": sum(self._owner_views.values()),
+            "recorded": self.recorded,
+            "flushes": self.flushes,
+            "flush_failures": self.flush_failures,
+        }
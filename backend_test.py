@@ -1,923 +0,0 @@
-import requests
-import json
-import jwt
-import time
-import uuid
-from datetime import datetime, timedelta
-import unittest
-import os
-import sys
-import traceback
-from dotenv import load_dotenv
-
-# Load environment variables
-load_dotenv('/app/backend/.env')
-
-# Get backend URL from frontend .env
-with open('/app/frontend/.env', 'r') as f:
-    for line in f:
-        if line.startswith('REACT_APP_BACKEND_URL='):
-            BACKEND_URL = line.strip().split('=')[1].strip('"\'')
-            break
-
-# API base URL
-API_URL = f"{BACKEND_URL}/api"
-print(f"Using API URL: {API_URL}")
-
-# JWT Secret for creating test tokens
-JWT_SECRET = os.environ.get('SECRET_KEY', 'your-super-secret-jwt-key-here-make-it-very-long-and-random-for-production')
-
-# MongoDB connection test
-def test_mongodb_connection():
-    """Test MongoDB connection by checking the status endpoint"""
-    try:
-        # Create a status check
-        status_data = {"client_name": "backend_test.py"}
-        response = requests.post(f"{API_URL}/status", json=status_data)
-        print(f"MongoDB status check creation response: {response.status_code}")
-        
-        if response.status_code == 200:
-            # Get status checks
-            response = requests.get(f"{API_URL}/status")
-            print(f"MongoDB status check retrieval response: {response.status_code}")
-            
-            if response.status_code == 200:
-                data = response.json()
-                if isinstance(data, list) and len(data) > 0:
-                    print("✅ MongoDB connection test passed")
-                    return True
-                else:
-                    print("❌ MongoDB connection test failed: No status checks found")
-                    return False
-            else:
-                print(f"❌ MongoDB connection test failed: Could not retrieve status checks, status code: {response.status_code}")
-                return False
-        else:
-            print(f"❌ MongoDB connection test failed: Could not create status check, status code: {response.status_code}")
-            return False
-    except Exception as e:
-        print(f"❌ MongoDB connection test failed: {str(e)}")
-        traceback.print_exc()
-        return False
-
-class TestGoogleOAuth(unittest.TestCase):
-    
-    def create_test_token(self, sub="test_google_id", email="test@example.com", name="Test User", expired=False):
-        """Create a test JWT token for authentication testing"""
-        payload = {
-            "sub": sub,
-            "email": email,
-            "name": name
-        }
-        
-        if expired:
-            # Create an expired token (expired 1 hour ago)
-            payload["exp"] = datetime.utcnow() - timedelta(hours=1)
-        else:
-            # Valid for 24 hours
-            payload["exp"] = datetime.utcnow() + timedelta(hours=24)
-            
-        return jwt.encode(payload, JWT_SECRET, algorithm="HS256")
-    
-    def test_root_endpoint(self):
-        """Test the root endpoint to ensure API is accessible"""
-        try:
-            response = requests.get(f"{API_URL}/")
-            print(f"Root endpoint response: {response.status_code}")
-            self.assertEqual(response.status_code, 200)
-            data = response.json()
-            self.assertEqual(data["message"], "Hello World")
-            print("✅ Root endpoint test passed")
-        except Exception as e:
-            print(f"❌ Root endpoint test failed: {str(e)}")
-            traceback.print_exc()
-    
-    def test_google_login_redirect(self):
-        """Test that the Google login endpoint redirects to Google"""
-        try:
-            response = requests.get(f"{API_URL}/auth/login/google", allow_redirects=False)
-            print(f"Google login redirect response: {response.status_code}")
-            # FastAPI uses 302 for redirects
-            self.assertEqual(response.status_code, 302)  # Found redirect
-            location = response.headers.get('Location', '')
-            print(f"Redirect location: {location}")
-            self.assertTrue('accounts.google.com' in location, f"Expected Google redirect, got: {location}")
-            print("✅ Google login redirect test passed")
-        except Exception as e:
-            print(f"❌ Google login redirect test failed: {str(e)}")
-            traceback.print_exc()
-    
-    def test_auth_me_unauthorized(self):
-        """Test that /auth/me requires authentication"""
-        try:
-            response = requests.get(f"{API_URL}/auth/me")
-            print(f"Unauthorized /auth/me response: {response.status_code}")
-            self.assertEqual(response.status_code, 401)
-            print("✅ Unauthorized access to /auth/me test passed")
-        except Exception as e:
-            print(f"❌ Unauthorized access to /auth/me test failed: {str(e)}")
-            traceback.print_exc()
-    
-    def test_auth_me_invalid_token(self):
-        """Test that /auth/me rejects invalid tokens"""
-        try:
-            headers = {"Authorization": "Bearer invalid_token_here"}
-            response = requests.get(f"{API_URL}/auth/me", headers=headers)
-            print(f"Invalid token response: {response.status_code}")
-            self.assertEqual(response.status_code, 401)
-            print("✅ Invalid token test passed")
-        except Exception as e:
-            print(f"❌ Invalid token test failed: {str(e)}")
-            traceback.print_exc()
-    
-    def test_auth_me_expired_token(self):
-        """Test that /auth/me rejects expired tokens"""
-        try:
-            expired_token = self.create_test_token(expired=True)
-            headers = {"Authorization": f"Bearer {expired_token}"}
-            response = requests.get(f"{API_URL}/auth/me", headers=headers)
-            print(f"Expired token response: {response.status_code}")
-            self.assertEqual(response.status_code, 401)
-            print("✅ Expired token test passed")
-        except Exception as e:
-            print(f"❌ Expired token test failed: {str(e)}")
-            traceback.print_exc()
-    
-    def test_auth_me_valid_token(self):
-        """
-        Test /auth/me with a valid token
-        Note: This test will fail in a real environment as the token is mocked
-        and the user doesn't exist in the database
-        """
-        try:
-            valid_token = self.create_test_token()
-            headers = {"Authorization": f"Bearer {valid_token}"}
-            response = requests.get(f"{API_URL}/auth/me", headers=headers)
-            print(f"Valid token response: {response.status_code}")
-            # This will fail with 404 "User not found" as our test user doesn't exist in DB
-            # We're just checking that token validation works
-            self.assertEqual(response.status_code, 404)
-            print("✅ Valid token format test passed (expected 404 as test user doesn't exist)")
-        except Exception as e:
-            print(f"❌ Valid token format test failed: {str(e)}")
-            traceback.print_exc()
-    
-    def test_profile_update_unauthorized(self):
-        """Test that profile update requires authentication"""
-        try:
-            data = {"name": "Updated Name", "about_me": "Test bio", "age": 30}
-            response = requests.put(f"{API_URL}/auth/profile", json=data)
-            print(f"Unauthorized profile update response: {response.status_code}")
-            self.assertEqual(response.status_code, 401)
-            print("✅ Unauthorized profile update test passed")
-        except Exception as e:
-            print(f"❌ Unauthorized profile update test failed: {str(e)}")
-            traceback.print_exc()
-    
-    def test_profile_update_invalid_token(self):
-        """Test that profile update rejects invalid tokens"""
-        try:
-            data = {"name": "Updated Name", "about_me": "Test bio", "age": 30}
-            headers = {"Authorization": "Bearer invalid_token_here"}
-            response = requests.put(f"{API_URL}/auth/profile", json=data, headers=headers)
-            print(f"Invalid token profile update response: {response.status_code}")
-            self.assertEqual(response.status_code, 401)
-            print("✅ Invalid token for profile update test passed")
-        except Exception as e:
-            print(f"❌ Invalid token for profile update test failed: {str(e)}")
-            traceback.print_exc()
-    
-    def test_profile_update_valid_token(self):
-        """
-        Test profile update with a valid token
-        Note: This test will fail in a real environment as the token is mocked
-        and the user doesn't exist in the database
-        """
-        try:
-            valid_token = self.create_test_token()
-            headers = {"Authorization": f"Bearer {valid_token}"}
-            data = {"name": "Updated Name", "about_me": "Test bio", "age": 30}
-            response = requests.put(f"{API_URL}/auth/profile", json=data, headers=headers)
-            print(f"Valid token profile update response: {response.status_code}")
-            # This will fail with 404 "User not found" as our test user doesn't exist in DB
-            # We're just checking that token validation works
-            self.assertEqual(response.status_code, 404)
-            print("✅ Valid token format for profile update test passed (expected 404 as test user doesn't exist)")
-        except Exception as e:
-            print(f"❌ Valid token format for profile update test failed: {str(e)}")
-            traceback.print_exc()
-    
-    def test_logout(self):
-        """Test the logout endpoint"""
-        try:
-            response = requests.post(f"{API_URL}/auth/logout")
-            print(f"Logout response: {response.status_code}")
-            self.assertEqual(response.status_code, 200)
-            data = response.json()
-            self.assertEqual(data["message"], "Logged out successfully")
-            print("✅ Logout test passed")
-        except Exception as e:
-            print(f"❌ Logout test failed: {str(e)}")
-            traceback.print_exc()
-    
-    def test_invalid_profile_data(self):
-        """Test profile update with invalid data"""
-        try:
-            valid_token = self.create_test_token()
-            headers = {"Authorization": f"Bearer {valid_token}"}
-            
-            # Test with invalid age (string instead of int)
-            data = {"age": "thirty"}
-            response = requests.put(f"{API_URL}/auth/profile", json=data, headers=headers)
-            print(f"Invalid profile data response: {response.status_code}")
-            # Since our test user doesn't exist in the database, we get a 404 instead of 422
-            # This is expected behavior in our test environment
-            self.assertEqual(response.status_code, 404)
-            print("✅ Invalid profile data test passed (expected 404 as test user doesn't exist)")
-        except Exception as e:
-            print(f"❌ Invalid profile data test failed: {str(e)}")
-            traceback.print_exc()
-
-class TestBadgeSystem(unittest.TestCase):
-    """Test class for the badge system endpoints"""
-    
-    def create_test_token(self, sub="test_google_id", email="test@example.com", name="Test User", expired=False):
-        """Create a test JWT token for authentication testing"""
-        payload = {
-            "sub": sub,
-            "email": email,
-            "name": name
-        }
-        
-        if expired:
-            # Create an expired token (expired 1 hour ago)
-            payload["exp"] = datetime.utcnow() - timedelta(hours=1)
-        else:
-            # Valid for 24 hours
-            payload["exp"] = datetime.utcnow() + timedelta(hours=24)
-            
-        return jwt.encode(payload, JWT_SECRET, algorithm="HS256")
-    
-    def test_create_badge_unauthorized(self):
-        """Test that badge creation requires authentication"""
-        try:
-            badge_data = {
-                "course_id": 101,
-                "course_category": "masterclasses",
-                "quiz_score": 95
-            }
-            response = requests.post(f"{API_URL}/badges", json=badge_data)
-            print(f"Unauthorized badge creation response: {response.status_code}")
-            self.assertEqual(response.status_code, 401)
-            print("✅ Unauthorized badge creation test passed")
-        except Exception as e:
-            print(f"❌ Unauthorized badge creation test failed: {str(e)}")
-            traceback.print_exc()
-    
-    def test_create_badge_invalid_token(self):
-        """Test that badge creation rejects invalid tokens"""
-        try:
-            badge_data = {
-                "course_id": 101,
-                "course_category": "masterclasses",
-                "quiz_score": 95
-            }
-            headers = {"Authorization": "Bearer invalid_token_here"}
-            response = requests.post(f"{API_URL}/badges", json=badge_data, headers=headers)
-            print(f"Invalid token badge creation response: {response.status_code}")
-            self.assertEqual(response.status_code, 401)
-            print("✅ Invalid token for badge creation test passed")
-        except Exception as e:
-            print(f"❌ Invalid token for badge creation test failed: {str(e)}")
-            traceback.print_exc()
-    
-    def test_create_badge_valid_token(self):
-        """
-        Test badge creation with a valid token
-        Note: This test will fail in a real environment as the token is mocked
-        and the user doesn't exist in the database
-        """
-        try:
-            valid_token = self.create_test_token()
-            headers = {"Authorization": f"Bearer {valid_token}"}
-            badge_data = {
-                "course_id": 101,
-                "course_category": "masterclasses",
-                "quiz_score": 95
-            }
-            response = requests.post(f"{API_URL}/badges", json=badge_data, headers=headers)
-            print(f"Valid token badge creation response: {response.status_code}")
-            # This will fail with 404 "User not found" as our test user doesn't exist in DB
-            # We're just checking that token validation works
-            self.assertEqual(response.status_code, 404)
-            print("✅ Valid token format for badge creation test passed (expected 404 as test user doesn't exist)")
-        except Exception as e:
-            print(f"❌ Valid token format for badge creation test failed: {str(e)}")
-            traceback.print_exc()
-    
-    def test_get_my_badges_unauthorized(self):
-        """Test that getting user's badges requires authentication"""
-        try:
-            response = requests.get(f"{API_URL}/badges/me")
-            print(f"Unauthorized get my badges response: {response.status_code}")
-            self.assertEqual(response.status_code, 401)
-            print("✅ Unauthorized get my badges test passed")
-        except Exception as e:
-            print(f"❌ Unauthorized get my badges test failed: {str(e)}")
-            traceback.print_exc()
-    
-    def test_get_my_badges_invalid_token(self):
-        """Test that getting user's badges rejects invalid tokens"""
-        try:
-            headers = {"Authorization": "Bearer invalid_token_here"}
-            response = requests.get(f"{API_URL}/badges/me", headers=headers)
-            print(f"Invalid token get my badges response: {response.status_code}")
-            self.assertEqual(response.status_code, 401)
-            print("✅ Invalid token for get my badges test passed")
-        except Exception as e:
-            print(f"❌ Invalid token for get my badges test failed: {str(e)}")
-            traceback.print_exc()
-    
-    def test_get_my_badges_valid_token(self):
-        """
-        Test getting user's badges with a valid token
-        Note: This test will fail in a real environment as the token is mocked
-        and the user doesn't exist in the database
-        """
-        try:
-            valid_token = self.create_test_token()
-            headers = {"Authorization": f"Bearer {valid_token}"}
-            response = requests.get(f"{API_URL}/badges/me", headers=headers)
-            print(f"Valid token get my badges response: {response.status_code}")
-            # This will fail with 404 "User not found" as our test user doesn't exist in DB
-            # We're just checking that token validation works
-            self.assertEqual(response.status_code, 404)
-            print("✅ Valid token format for get my badges test passed (expected 404 as test user doesn't exist)")
-        except Exception as e:
-            print(f"❌ Valid token format for get my badges test failed: {str(e)}")
-            traceback.print_exc()
-    
-    def test_get_user_badges(self):
-        """Test getting badges for a specific user (public endpoint)"""
-        try:
-            user_id = str(uuid.uuid4())  # Random user ID
-            response = requests.get(f"{API_URL}/badges/user/{user_id}")
-            print(f"Get user badges response: {response.status_code}")
-            self.assertEqual(response.status_code, 200)
-            data = response.json()
-            self.assertIsInstance(data, list)
-            print("✅ Get user badges test passed")
-        except Exception as e:
-            print(f"❌ Get user badges test failed: {str(e)}")
-            traceback.print_exc()
-    
-    def test_update_badge_unauthorized(self):
-        """Test that updating a badge requires authentication"""
-        try:
-            badge_id = str(uuid.uuid4())  # Random badge ID
-            response = requests.put(f"{API_URL}/badges/{badge_id}?course_title=Updated%20Course")
-            print(f"Unauthorized badge update response: {response.status_code}")
-            self.assertEqual(response.status_code, 401)
-            print("✅ Unauthorized badge update test passed")
-        except Exception as e:
-            print(f"❌ Unauthorized badge update test failed: {str(e)}")
-            traceback.print_exc()
-    
-    def test_update_badge_invalid_token(self):
-        """Test that updating a badge rejects invalid tokens"""
-        try:
-            badge_id = str(uuid.uuid4())  # Random badge ID
-            headers = {"Authorization": "Bearer invalid_token_here"}
-            response = requests.put(f"{API_URL}/badges/{badge_id}?course_title=Updated%20Course", headers=headers)
-            print(f"Invalid token badge update response: {response.status_code}")
-            self.assertEqual(response.status_code, 401)
-            print("✅ Invalid token for badge update test passed")
-        except Exception as e:
-            print(f"❌ Invalid token for badge update test failed: {str(e)}")
-            traceback.print_exc()
-    
-    def test_update_badge_valid_token(self):
-        """
-        Test updating a badge with a valid token
-        Note: This test will fail in a real environment as the token is mocked
-        and the user doesn't exist in the database
-        """
-        try:
-            valid_token = self.create_test_token()
-            headers = {"Authorization": f"Bearer {valid_token}"}
-            badge_id = str(uuid.uuid4())  # Random badge ID
-            response = requests.put(f"{API_URL}/badges/{badge_id}?course_title=Updated%20Course", headers=headers)
-            print(f"Valid token badge update response: {response.status_code}")
-            # This will fail with 404 "User not found" as our test user doesn't exist in DB
-            # We're just checking that token validation works
-            self.assertEqual(response.status_code, 404)
-            print("✅ Valid token format for badge update test passed (expected 404 as test user doesn't exist)")
-        except Exception as e:
-            print(f"❌ Valid token format for badge update test failed: {str(e)}")
-            traceback.print_exc()
-
-class TestCourseManagement(unittest.TestCase):
-    """Test class for the course management endpoints"""
-    
-    def create_test_token(self, sub="test_google_id", email="test@example.com", name="Test User", expired=False):
-        """Create a test JWT token for authentication testing"""
-        payload = {
-            "sub": sub,
-            "email": email,
-            "name": name
-        }
-        
-        if expired:
-            # Create an expired token (expired 1 hour ago)
-            payload["exp"] = datetime.utcnow() - timedelta(hours=1)
-        else:
-            # Valid for 24 hours
-            payload["exp"] = datetime.utcnow() + timedelta(hours=24)
-            
-        return jwt.encode(payload, JWT_SECRET, algorithm="HS256")
-    
-    def test_create_course_unauthorized(self):
-        """Test that course creation requires authentication"""
-        try:
-            course_data = {
-                "title": "Test Course",
-                "description": "A test course for API testing",
-                "duration": "2 hours",
-                "level": "Beginner",
-                "category": "masterclasses",
-                "tags": ["test", "api"],
-                "sessions": [
-                    {
-                        "id": 1,
-                        "title": "Introduction",
-                        "duration": "30 minutes",
-                        "description": "Introduction to the course",
-                        "video_url": "https://example.com/video1"
-                    }
-                ],
-                "quiz": {
-                    "questions": [
-                        {
-                            "question": "What is this course about?",
-                            "options": ["Testing", "Development", "Design", "Marketing"],
-                            "correct": 0
-                        }
-                    ]
-                }
-            }
-            response = requests.post(f"{API_URL}/courses", json=course_data)
-            print(f"Unauthorized course creation response: {response.status_code}")
-            self.assertEqual(response.status_code, 401)
-            print("✅ Unauthorized course creation test passed")
-        except Exception as e:
-            print(f"❌ Unauthorized course creation test failed: {str(e)}")
-            traceback.print_exc()
-    
-    def test_create_course_invalid_token(self):
-        """Test that course creation rejects invalid tokens"""
-        try:
-            course_data = {
-                "title": "Test Course",
-                "description": "A test course for API testing",
-                "duration": "2 hours",
-                "level": "Beginner",
-                "category": "masterclasses",
-                "tags": ["test", "api"],
-                "sessions": [
-                    {
-                        "id": 1,
-                        "title": "Introduction",
-                        "duration": "30 minutes",
-                        "description": "Introduction to the course",
-                        "video_url": "https://example.com/video1"
-                    }
-                ],
-                "quiz": {
-                    "questions": [
-                        {
-                            "question": "What is this course about?",
-                            "options": ["Testing", "Development", "Design", "Marketing"],
-                            "correct": 0
-                        }
-                    ]
-                }
-            }
-            headers = {"Authorization": "Bearer invalid_token_here"}
-            response = requests.post(f"{API_URL}/courses", json=course_data, headers=headers)
-            print(f"Invalid token course creation response: {response.status_code}")
-            self.assertEqual(response.status_code, 401)
-            print("✅ Invalid token for course creation test passed")
-        except Exception as e:
-            print(f"❌ Invalid token for course creation test failed: {str(e)}")
-            traceback.print_exc()
-    
-    def test_create_course_valid_token(self):
-        """
-        Test course creation with a valid token
-        Note: This test will fail in a real environment as the token is mocked
-        and the user doesn't exist in the database
-        """
-        try:
-            valid_token = self.create_test_token()
-            headers = {"Authorization": f"Bearer {valid_token}"}
-            course_data = {
-                "title": "Test Course",
-                "description": "A test course for API testing",
-                "duration": "2 hours",
-                "level": "Beginner",
-                "category": "masterclasses",
-                "tags": ["test", "api"],
-                "sessions": [
-                    {
-                        "id": 1,
-                        "title": "Introduction",
-                        "duration": "30 minutes",
-                        "description": "Introduction to the course",
-                        "video_url": "https://example.com/video1"
-                    }
-                ],
-                "quiz": {
-                    "questions": [
-                        {
-                            "question": "What is this course about?",
-                            "options": ["Testing", "Development", "Design", "Marketing"],
-                            "correct": 0
-                        }
-                    ]
-                }
-            }
-            response = requests.post(f"{API_URL}/courses", json=course_data, headers=headers)
-            print(f"Valid token course creation response: {response.status_code}")
-            # This will fail with 404 "User not found" as our test user doesn't exist in DB
-            # We're just checking that token validation works
-            self.assertEqual(response.status_code, 404)
-            print("✅ Valid token format for course creation test passed (expected 404 as test user doesn't exist)")
-        except Exception as e:
-            print(f"❌ Valid token format for course creation test failed: {str(e)}")
-            traceback.print_exc()
-    
-    def test_get_user_created_courses_unauthorized(self):
-        """Test that getting user's created courses requires authentication"""
-        try:
-            response = requests.get(f"{API_URL}/courses/created")
-            print(f"Unauthorized get user created courses response: {response.status_code}")
-            self.assertEqual(response.status_code, 401)
-            print("✅ Unauthorized get user created courses test passed")
-        except Exception as e:
-            print(f"❌ Unauthorized get user created courses test failed: {str(e)}")
-            traceback.print_exc()
-    
-    def test_get_user_created_courses_invalid_token(self):
-        """Test that getting user's created courses rejects invalid tokens"""
-        try:
-            headers = {"Authorization": "Bearer invalid_token_here"}
-            response = requests.get(f"{API_URL}/courses/created", headers=headers)
-            print(f"Invalid token get user created courses response: {response.status_code}")
-            self.assertEqual(response.status_code, 401)
-            print("✅ Invalid token for get user created courses test passed")
-        except Exception as e:
-            print(f"❌ Invalid token for get user created courses test failed: {str(e)}")
-            traceback.print_exc()
-    
-    def test_get_user_created_courses_valid_token(self):
-        """
-        Test getting user's created courses with a valid token
-        Note: This test will fail in a real environment as the token is mocked
-        and the user doesn't exist in the database
-        """
-        try:
-            valid_token = self.create_test_token()
-            headers = {"Authorization": f"Bearer {valid_token}"}
-            response = requests.get(f"{API_URL}/courses/created", headers=headers)
-            print(f"Valid token get user created courses response: {response.status_code}")
-            # This will fail with 404 "User not found" as our test user doesn't exist in DB
-            # We're just checking that token validation works
-            self.assertEqual(response.status_code, 404)
-            print("✅ Valid token format for get user created courses test passed (expected 404 as test user doesn't exist)")
-        except Exception as e:
-            print(f"❌ Valid token format for get user created courses test failed: {str(e)}")
-            traceback.print_exc()
-    
-    def test_get_courses_by_user(self):
-        """Test getting courses created by a specific user (public endpoint)"""
-        try:
-            user_id = str(uuid.uuid4())  # Random user ID
-            response = requests.get(f"{API_URL}/courses/created/{user_id}")
-            print(f"Get courses by user response: {response.status_code}")
-            self.assertEqual(response.status_code, 200)
-            data = response.json()
-            self.assertIsInstance(data, list)
-            print("✅ Get courses by user test passed")
-        except Exception as e:
-            print(f"❌ Get courses by user test failed: {str(e)}")
-            traceback.print_exc()
-    
-    def test_get_course(self):
-        """Test getting a specific course (public endpoint)"""
-        try:
-            course_id = str(uuid.uuid4())  # Random course ID
-            response = requests.get(f"{API_URL}/courses/{course_id}")
-            print(f"Get course response: {response.status_code}")
-            # Should return 404 for non-existent course
-            self.assertEqual(response.status_code, 404)
-            print("✅ Get course test passed (expected 404 for non-existent course)")
-        except Exception as e:
-            print(f"❌ Get course test failed: {str(e)}")
-            traceback.print_exc()
-    
-    def test_update_course_unauthorized(self):
-        """Test that updating a course requires authentication"""
-        try:
-            course_id = str(uuid.uuid4())  # Random course ID
-            course_data = {
-                "title": "Updated Course",
-                "description": "An updated test course",
-                "duration": "3 hours",
-                "level": "Intermediate",
-                "category": "masterclasses",
-                "tags": ["test", "api", "updated"],
-                "sessions": [
-                    {
-                        "id": 1,
-                        "title": "Updated Introduction",
-                        "duration": "45 minutes",
-                        "description": "Updated introduction to the course",
-                        "video_url": "https://example.com/updated-video1"
-                    }
-                ],
-                "quiz": {
-                    "questions": [
-                        {
-                            "question": "What is this updated course about?",
-                            "options": ["Testing", "Development", "Design", "Marketing"],
-                            "correct": 0
-                        }
-                    ]
-                }
-            }
-            response = requests.put(f"{API_URL}/courses/{course_id}", json=course_data)
-            print(f"Unauthorized course update response: {response.status_code}")
-            self.assertEqual(response.status_code, 401)
-            print("✅ Unauthorized course update test passed")
-        except Exception as e:
-            print(f"❌ Unauthorized course update test failed: {str(e)}")
-            traceback.print_exc()
-    
-    def test_update_course_invalid_token(self):
-        """Test that updating a course rejects invalid tokens"""
-        try:
-            course_id = str(uuid.uuid4())  # Random course ID
-            course_data = {
-                "title": "Updated Course",
-                "description": "An updated test course",
-                "duration": "3 hours",
-                "level": "Intermediate",
-                "category": "masterclasses",
-                "tags": ["test", "api", "updated"],
-                "sessions": [
-                    {
-                        "id": 1,
-                        "title": "Updated Introduction",
-                        "duration": "45 minutes",
-                        "description": "Updated introduction to the course",
-                        "video_url": "https://example.com/updated-video1"
-                    }
-                ],
-                "quiz": {
-                    "questions": [
-                        {
-                            "question": "What is this updated course about?",
-                            "options": ["Testing", "Development", "Design", "Marketing"],
-                            "correct": 0
-                        }
-                    ]
-                }
-            }
-            headers = {"Authorization": "Bearer invalid_token_here"}
-            response = requests.put(f"{API_URL}/courses/{course_id}", json=course_data, headers=headers)
-            print(f"Invalid token course update response: {response.status_code}")
-            self.assertEqual(response.status_code, 401)
-            print("✅ Invalid token for course update test passed")
-        except Exception as e:
-            print(f"❌ Invalid token for course update test failed: {str(e)}")
-            traceback.print_exc()
-    
-    def test_update_course_valid_token(self):
-        """
-        Test updating a course with a valid token
-        Note: This test will fail in a real environment as the token is mocked
-        and the user doesn't exist in the database
-        """
-        try:
-            valid_token = self.create_test_token()
-            headers = {"Authorization": f"Bearer {valid_token}"}
-            course_id = str(uuid.uuid4())  # Random course ID
-            course_data = {
-                "title": "Updated Course",
-                "description": "An updated test course",
-                "duration": "3 hours",
-                "level": "Intermediate",
-                "category": "masterclasses",
-                "tags": ["test", "api", "updated"],
-                "sessions": [
-                    {
-                        "id": 1,
-                        "title": "Updated Introduction",
-                        "duration": "45 minutes",
-                        "description": "Updated introduction to the course",
-                        "video_url": "https://example.com/updated-video1"
-                    }
-                ],
-                "quiz": {
-                    "questions": [
-                        {
-                            "question": "What is this updated course about?",
-                            "options": ["Testing", "Development", "Design", "Marketing"],
-                            "correct": 0
-                        }
-                    ]
-                }
-            }
-            response = requests.put(f"{API_URL}/courses/{course_id}", json=course_data, headers=headers)
-            print(f"Valid token course update response: {response.status_code}")
-            # This will fail with 404 "User not found" as our test user doesn't exist in DB
-            # We're just checking that token validation works
-            self.assertEqual(response.status_code, 404)
-            print("✅ Valid token format for course update test passed (expected 404 as test user doesn't exist)")
-        except Exception as e:
-            print(f"❌ Valid token format for course update test failed: {str(e)}")
-            traceback.print_exc()
-    
-    def test_publish_course_unauthorized(self):
-        """Test that publishing a course requires authentication"""
-        try:
-            course_id = str(uuid.uuid4())  # Random course ID
-            response = requests.put(f"{API_URL}/courses/{course_id}/publish")
-            print(f"Unauthorized course publish response: {response.status_code}")
-            self.assertEqual(response.status_code, 401)
-            print("✅ Unauthorized course publish test passed")
-        except Exception as e:
-            print(f"❌ Unauthorized course publish test failed: {str(e)}")
-            traceback.print_exc()
-    
-    def test_publish_course_invalid_token(self):
-        """Test that publishing a course rejects invalid tokens"""
-        try:
-            course_id = str(uuid.uuid4())  # Random course ID
-            headers = {"Authorization": "Bearer invalid_token_here"}
-            response = requests.put(f"{API_URL}/courses/{course_id}/publish", headers=headers)
-            print(f"Invalid token course publish response: {response.status_code}")
-            self.assertEqual(response.status_code, 401)
-            print("✅ Invalid token for course publish test passed")
-        except Exception as e:
-            print(f"❌ Invalid token for course publish test failed: {str(e)}")
-            traceback.print_exc()
-    
-    def test_publish_course_valid_token(self):
-        """
-        Test publishing a course with a valid token
-        Note: This test will fail in a real environment as the token is mocked
-        and the user doesn't exist in the database
-        """
-        try:
-            valid_token = self.create_test_token()
-            headers = {"Authorization": f"Bearer {valid_token}"}
-            course_id = str(uuid.uuid4())  # Random course ID
-            response = requests.put(f"{API_URL}/courses/{course_id}/publish", headers=headers)
-            print(f"Valid token course publish response: {response.status_code}")
-            # This will fail with 404 "User not found" as our test user doesn't exist in DB
-            # We're just checking that token validation works
-            self.assertEqual(response.status_code, 404)
-            print("✅ Valid token format for course publish test passed (expected 404 as test user doesn't exist)")
-        except Exception as e:
-            print(f"❌ Valid token format for course publish test failed: {str(e)}")
-            traceback.print_exc()
-    
-    def test_delete_course_unauthorized(self):
-        """Test that deleting a course requires authentication"""
-        try:
-            course_id = str(uuid.uuid4())  # Random course ID
-            response = requests.delete(f"{API_URL}/courses/{course_id}")
-            print(f"Unauthorized course delete response: {response.status_code}")
-            self.assertEqual(response.status_code, 401)
-            print("✅ Unauthorized course delete test passed")
-        except Exception as e:
-            print(f"❌ Unauthorized course delete test failed: {str(e)}")
-            traceback.print_exc()
-    
-    def test_delete_course_invalid_token(self):
-        """Test that deleting a course rejects invalid tokens"""
-        try:
-            course_id = str(uuid.uuid4())  # Random course ID
-            headers = {"Authorization": "Bearer invalid_token_here"}
-            response = requests.delete(f"{API_URL}/courses/{course_id}", headers=headers)
-            print(f"Invalid token course delete response: {response.status_code}")
-            self.assertEqual(response.status_code, 401)
-            print("✅ Invalid token for course delete test passed")
-        except Exception as e:
-            print(f"❌ Invalid token for course delete test failed: {str(e)}")
-            traceback.print_exc()
-    
-    def test_delete_course_valid_token(self):
-        """
-        Test deleting a course with a valid token
-        Note: This test will fail in a real environment as the token is mocked
-        and the user doesn't exist in the database
-        """
-        try:
-            valid_token = self.create_test_token()
-            headers = {"Authorization": f"Bearer {valid_token}"}
-            course_id = str(uuid.uuid4())  # Random course ID
-            response = requests.delete(f"{API_URL}/courses/{course_id}", headers=headers)
-            print(f"Valid token course delete response: {response.status_code}")
-            # This will fail with 404 "User not found" as our test user doesn't exist in DB
-            # We're just checking that token validation works
-            self.assertEqual(response.status_code, 404)
-            print("✅ Valid token format for course delete test passed (expected 404 as test user doesn't exist)")
-        except Exception as e:
-            print(f"❌ Valid token format for course delete test failed: {str(e)}")
-            traceback.print_exc()
-
-def run_tests():
-    """Run all the tests"""
-    print(f"Testing API at: {API_URL}")
-    
-    # First test MongoDB connection
-    mongodb_connected = test_mongodb_connection()
-    print(f"MongoDB connection test result: {'✅ Connected' if mongodb_connected else '❌ Not connected'}")
-    
-    # Create test suite
-    test_suite = unittest.TestSuite()
-    
-    # OAuth tests
-    test_suite.addTest(TestGoogleOAuth('test_root_endpoint'))
-    test_suite.addTest(TestGoogleOAuth('test_google_login_redirect'))
-    test_suite.addTest(TestGoogleOAuth('test_auth_me_unauthorized'))
-    test_suite.addTest(TestGoogleOAuth('test_auth_me_invalid_token'))
-    test_suite.addTest(TestGoogleOAuth('test_auth_me_expired_token'))
-    test_suite.addTest(TestGoogleOAuth('test_auth_me_valid_token'))
-    test_suite.addTest(TestGoogleOAuth('test_profile_update_unauthorized'))
-    test_suite.addTest(TestGoogleOAuth('test_profile_update_invalid_token'))
-    test_suite.addTest(TestGoogleOAuth('test_profile_update_valid_token'))
-    test_suite.addTest(TestGoogleOAuth('test_logout'))
-    test_suite.addTest(TestGoogleOAuth('test_invalid_profile_data'))
-    
-    # Badge system tests
-    test_suite.addTest(TestBadgeSystem('test_create_badge_unauthorized'))
-    test_suite.addTest(TestBadgeSystem('test_create_badge_invalid_token'))
-    test_suite.addTest(TestBadgeSystem('test_create_badge_valid_token'))
-    test_suite.addTest(TestBadgeSystem('test_get_my_badges_unauthorized'))
-    test_suite.addTest(TestBadgeSystem('test_get_my_badges_invalid_token'))
-    test_suite.addTest(TestBadgeSystem('test_get_my_badges_valid_token'))
-    test_suite.addTest(TestBadgeSystem('test_get_user_badges'))
-    test_suite.addTest(TestBadgeSystem('test_update_badge_unauthorized'))
-    test_suite.addTest(TestBadgeSystem('test_update_badge_invalid_token'))
-    test_suite.addTest(TestBadgeSystem('test_update_badge_valid_token'))
-    
-    # Course management tests
-    test_suite.addTest(TestCourseManagement('test_create_course_unauthorized'))
-    test_suite.addTest(TestCourseManagement('test_create_course_invalid_token'))
-    test_suite.addTest(TestCourseManagement('test_create_course_valid_token'))
-    test_suite.addTest(TestCourseManagement('test_get_user_created_courses_unauthorized'))
-    test_suite.addTest(TestCourseManagement('test_get_user_created_courses_invalid_token'))
-    test_suite.addTest(TestCourseManagement('test_get_user_created_courses_valid_token'))
-    test_suite.addTest(TestCourseManagement('test_get_courses_by_user'))
-    test_suite.addTest(TestCourseManagement('test_get_course'))
-    test_suite.addTest(TestCourseManagement('test_update_course_unauthorized'))
-    test_suite.addTest(TestCourseManagement('test_update_course_invalid_token'))
-    test_suite.addTest(TestCourseManagement('test_update_course_valid_token'))
-    test_suite.addTest(TestCourseManagement('test_publish_course_unauthorized'))
-    test_suite.addTest(TestCourseManagement('test_publish_course_invalid_token'))
-    test_suite.addTest(TestCourseManagement('test_publish_course_valid_token'))
-    test_suite.addTest(TestCourseManagement('test_delete_course_unauthorized'))
-    test_suite.addTest(TestCourseManagement('test_delete_course_invalid_token'))
-    test_suite.addTest(TestCourseManagement('test_delete_course_valid_token'))
-    
-    # Run the tests
-    runner = unittest.TextTestRunner()
-    result = runner.run(test_suite)
-    
-    # Print summary
-    print("\n=== TEST SUMMARY ===")
-    print(f"Total tests: {result.testsRun}")
-    print(f"Failures: {len(result.failures)}")
-    print(f"Errors: {len(result.errors)}")
-    
-    # Print failures and errors
-    if result.failures:
-        print("\n=== FAILURES ===")
-        for test, error in result.failures:
-            print(f"Test: {test}")
-            print(f"Error: {error}")
-    
-    if result.errors:
-        print("\n=== ERRORS ===")
-        for test, error in result.errors:
-            print(f"Test: {test}")
-            print(f"Error: {error}")
-    
-    return len(result.failures) == 0 and len(result.errors) == 0
-
-if __name__ == "__main__":
-    success = run_tests()
-    sys.exit(0 if success else 1)
\ No newline at end of file
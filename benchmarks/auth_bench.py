@@ -0,0 +1,51 @@
+"""Per-request auth cost: plain jwt.decode vs the memoizing TokenVerifier.
+
+Run with ``python benchmarks/auth_bench.py [--iterations N]``.
+"""
+import argparse
+import os
+import sys
+import time
+import timeit
+from pathlib import Path
+
+import jwt
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from tokens import TokenVerifier  # noqa: E402
+
+SECRET = os.environ.get("SECRET_KEY", "benchmark-secret-key-that-is-long-enough-for-hs256")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=100000)
+    args = parser.parse_args()
+
+    os.environ["SECRET_KEY"] = SECRET
+    token = jwt.encode(
+        {"sub": "bench-user", "email": "bench@example.com", "name": "Bench", "exp": int(time.time()) + 3600},
+        SECRET,
+        algorithm="HS256",
+    )
+    verifier = TokenVerifier(SECRET)
+
+    def before():
+        jwt.decode(token, os.environ.get("SECRET_KEY"), algorithms=["HS256"])
+
+    def after():
+        verifier.decode(token)
+
+    results = {}
+    for name, fn in (("jwt.decode + environ", before), ("TokenVerifier", after)):
+        fn()
+        seconds = min(timeit.repeat(fn, number=args.iterations, repeat=3))
+        results[name] = seconds / args.iterations * 1e6
+        print(f"{name:<22} {results[name]:8.2f} us/request")
+
+    print(f"speedup                {results['jwt.decode + environ'] / results['TokenVerifier']:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
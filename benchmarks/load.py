@@ -0,0 +1,404 @@
+"""In-process load test for the FastAPI backend.
+
+Boots ``server.app`` in this process, seeds users, courses, badges and
+uploaded assets into a scratch database, then drives concurrent requests
+at every API endpoint through httpx's ASGI transport and reports latency
+percentiles and throughput per endpoint.
+
+    python benchmarks/load.py --users 200 --requests 500 --concurrency 32 --output bench.json
+    python benchmarks/load.py --baseline bench.json      # diff against an earlier run
+
+MongoDB comes from --mongo-url (default $MONGO_URL or localhost). Pass
+--in-memory to use mongomock-motor instead when no mongod is available;
+numbers from the in-memory store are only useful relative to each other.
+The Google OAuth endpoints are skipped because they redirect to Google.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, Optional, Set
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+
+@dataclass
+class Scenario:
+    name: str
+    call: Callable[[object, int], Awaitable[object]]
+    expected: Set[int] = field(default_factory=lambda: {200})
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    rank = max(int(round(pct / 100 * len(sorted_values) + 0.5)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+# Size of every benchmark asset: one chunk, so a single PUT completes an upload
+ASSET_SIZE = 64 * 1024
+
+
+def course_payload(i: int, sessions: int = 5, questions: int = 5) -> dict:
+    return {
+        "title": f"Bench course {i}",
+        "description": f"Benchmark course number {i} covering async Python and MongoDB",
+        "duration": "2h",
+        "level": random.choice(["Beginner", "Intermediate", "Advanced"]),
+        "category": random.choice(["masterclasses", "careerpaths", "crashcourses"]),
+        "tags": random.sample(["Python", "React", "MongoDB", "FastAPI", "AWS", "Docker"], 2),
+        "sessions": [
+            {"id": s, "title": f"Session {s}", "duration": "20m", "description": "Lecture", "video_url": ""}
+            for s in range(sessions)
+        ],
+        "quiz": {"questions": [
+            {"question": f"Question {q}", "options": ["a", "b", "c", "d"], "correct": q % 4}
+            for q in range(questions)
+        ]},
+    }
+
+
+async def seed(db, server, users: int, courses_per_user: int, badges_per_user: int, doomed: int):
+    """Insert the dataset and return the handles the scenarios need."""
+    profiles = [
+        server.UserProfile(google_id=f"bench-{i}", email=f"bench{i}@example.com", name=f"Bench {i}")
+        for i in range(users)
+    ]
+    await db.users.insert_many([p.dict() for p in profiles])
+
+    courses_by_user: Dict[str, List[str]] = {p.id: [] for p in profiles}
+    course_docs = []
+    for i in range(users * courses_per_user):
+        owner = profiles[i % users]
+        course = server.Course(
+            **course_payload(i), instructor=owner.name, created_by=owner.id, published=i % 4 != 0
+        )
+        courses_by_user[owner.id].append(course.id)
+        course_docs.append(course.dict())
+    if course_docs:
+        await db.courses.insert_many(course_docs)
+
+    badges_by_user: Dict[str, List[str]] = {p.id: [] for p in profiles}
+    badge_docs = []
+    for p in profiles:
+        for b in range(badges_per_user):
+            badge = server.new_badge(p.id, b, f"Course {b}", "masterclasses", random.randint(60, 100))
+            badges_by_user[p.id].append(badge.id)
+            badge_docs.append(badge.dict())
+    if badge_docs:
+        await db.badges.insert_many(badge_docs)
+
+    doomed_ids = []
+    doomed_docs = []
+    for i in range(doomed):
+        owner = profiles[i % users]
+        course = server.Course(**course_payload(i), instructor=owner.name, created_by=owner.id)
+        doomed_ids.append((owner, course.id))
+        doomed_docs.append(course.dict())
+    if doomed_docs:
+        await db.courses.insert_many(doomed_docs)
+
+    published = [c["id"] for c in course_docs if c["published"]]
+    return profiles, courses_by_user, badges_by_user, doomed_ids, published
+
+
+async def seed_assets(db, server, profiles, uploads: int):
+    """One completed video per user to read back, plus ``uploads`` empty uploads to send chunks to."""
+    data = os.urandom(ASSET_SIZE)
+    ready, uploading = [], []
+    for i in range(len(profiles) + uploads):
+        owner = profiles[i % len(profiles)]
+        asset = server.Asset(
+            owner_id=owner.id, filename=f"bench-{i}.mp4", content_type="video/mp4", size=ASSET_SIZE,
+            storage=server.asset_storage.name,
+        ).dict()
+        await server.asset_storage.create(asset)
+        if i < len(profiles):
+            await server.asset_storage.write(asset, 0, data)
+            await server.asset_storage.complete(asset)
+            asset.update(received=ASSET_SIZE, status="ready")
+            ready.append((owner, asset["id"]))
+        else:
+            uploading.append((owner, asset["id"]))
+        await db.assets.insert_one(asset)
+    return ready, uploading, data
+
+
+def build_scenarios(server, profiles, courses_by_user, badges_by_user, doomed, published, assets) -> List[Scenario]:
+    headers = {}
+    for p in profiles:
+        token = server.create_access_token({"sub": p.google_id, "email": p.email, "name": p.name})
+        headers[p.id] = {"Authorization": f"Bearer {token}"}
+
+    # The in-process client is a loopback peer, so ops routes only need the token when OPS_TOKEN is set
+    ops_headers = {"Authorization": f"Bearer {server.OPS_TOKEN}"} if server.OPS_TOKEN else {}
+
+    def user(i):
+        return profiles[i % len(profiles)]
+
+    def owned_course(i):
+        owner = user(i)
+        return owner, courses_by_user[owner.id][i % len(courses_by_user[owner.id])]
+
+    import_body = "\n".join(json.dumps(course_payload(i)) for i in range(10))
+    ready_assets, uploads, asset_data = assets
+    windows = ["all", "7d", "30d", "365d"]
+
+    def progress_url(i):
+        return f"/api/progress/masterclasses/{i % 6 + 1}"
+
+    async def award(client, i):
+        owner = user(i)
+        course_id = published[(i // len(profiles)) % len(published)]
+        return await client.post(
+            "/api/badges/award", json={"course_id": course_id, "answers": [q % 4 for q in range(5)]},
+            headers=headers[owner.id])
+
+    async def self_reported_badge(client, i):
+        # Only the built-in catalog can be self-reported, so most of these are duplicates (400)
+        category, count = list(server.BUILTIN_COURSES.items())[i % len(server.BUILTIN_COURSES)]
+        return await client.post(
+            "/api/badges", json={"course_id": 1 + i // len(profiles) % count, "course_category": category, "quiz_score": 90},
+            headers=headers[user(i).id])
+
+    async def update_course(client, i):
+        owner, course_id = owned_course(i)
+        return await client.put(f"/api/courses/{course_id}", json=course_payload(i), headers=headers[owner.id])
+
+    async def publish_course(client, i):
+        owner, course_id = owned_course(i)
+        return await client.put(f"/api/courses/{course_id}/publish", headers=headers[owner.id])
+
+    async def delete_course(client, i):
+        owner, course_id = doomed[i % len(doomed)]
+        return await client.delete(f"/api/courses/{course_id}", headers=headers[owner.id])
+
+    async def update_badge(client, i):
+        owner = user(i)
+        badge_id = badges_by_user[owner.id][i % len(badges_by_user[owner.id])]
+        return await client.put(
+            f"/api/badges/{badge_id}", params={"course_title": f"Title {i}"}, headers=headers[owner.id])
+
+    async def upload_chunk(client, i):
+        owner, asset_id = uploads[i % len(uploads)]
+        return await client.put(
+            f"/api/assets/{asset_id}/chunks", params={"offset": 0}, files={"chunk": ("chunk", asset_data)},
+            headers=headers[owner.id])
+
+    async def delete_asset(client, i):
+        owner, asset_id = uploads[i % len(uploads)]
+        return await client.delete(f"/api/assets/{asset_id}", headers=headers[owner.id])
+
+    scenarios = [
+        Scenario("GET /api/", lambda c, i: c.get("/api/")),
+        Scenario("POST /api/status", lambda c, i: c.post("/api/status", json={"client_name": f"bench-{i % 10}"})),
+        Scenario("GET /api/status", lambda c, i: c.get("/api/status")),
+        Scenario("GET /api/status/latest", lambda c, i: c.get(
+            "/api/status/latest", params={"client_name": f"bench-{i % 10}"} if i % 2 else {})),
+        Scenario("GET /api/status/rollup", lambda c, i: c.get("/api/status/rollup")),
+        Scenario("GET /api/auth/me", lambda c, i: c.get("/api/auth/me", headers=headers[user(i).id])),
+        Scenario("PUT /api/auth/profile", lambda c, i: c.put(
+            "/api/auth/profile", json={"about_me": f"Bench {i}"}, headers=headers[user(i).id])),
+        Scenario("POST /api/auth/logout", lambda c, i: c.post("/api/auth/logout")),
+        Scenario("POST /api/badges", self_reported_badge, {200, 400}),
+        Scenario("GET /api/badges/me", lambda c, i: c.get("/api/badges/me", headers=headers[user(i).id])),
+        Scenario("GET /api/badges/user/{user_id}", lambda c, i: c.get(f"/api/badges/user/{user(i).id}")),
+        Scenario("PUT /api/badges/{badge_id}", update_badge),
+        Scenario("GET /api/courses", lambda c, i: c.get("/api/courses", params={"limit": 20})),
+        Scenario("GET /api/courses/created", lambda c, i: c.get("/api/courses/created", headers=headers[user(i).id])),
+        Scenario("GET /api/courses/created/{user_id}", lambda c, i: c.get(f"/api/courses/created/{user(i).id}")),
+        Scenario("GET /api/courses/{course_id}", lambda c, i: c.get(f"/api/courses/{owned_course(i)[1]}")),
+        Scenario("POST /api/courses", lambda c, i: c.post(
+            "/api/courses", json=course_payload(i), headers=headers[user(i).id])),
+        Scenario("PUT /api/courses/{course_id}", update_course),
+        Scenario("PUT /api/courses/{course_id}/publish", publish_course),
+        Scenario("DELETE /api/courses/{course_id}", delete_course, {200, 404}),
+        Scenario("POST /api/courses/import", lambda c, i: c.post(
+            "/api/courses/import", content=import_body,
+            headers={**headers[user(i).id], "Content-Type": "application/x-ndjson"})),
+        Scenario("GET /api/courses/export", lambda c, i: c.get("/api/courses/export", headers=headers[user(i).id])),
+        Scenario("POST /api/badges/award", award, {200, 400}),
+        Scenario("GET /api/leaderboard/learners", lambda c, i: c.get(
+            "/api/leaderboard/learners", params={"window": windows[i % len(windows)]})),
+        Scenario("GET /api/leaderboard/courses", lambda c, i: c.get(
+            "/api/leaderboard/courses", params={"window": windows[i % len(windows)], "category": "masterclasses"})),
+        Scenario("GET /api/users/{user_id}/stats", lambda c, i: c.get(f"/api/users/{user(i).id}/stats")),
+        Scenario("POST /api/progress/{course_category}/{course_id}", lambda c, i: c.post(
+            progress_url(i), json={"completed_sessions": [i % 5], "current_session": i % 5 + 1},
+            headers=headers[user(i).id]), {202}),
+        Scenario("GET /api/progress/{course_category}/{course_id}", lambda c, i: c.get(
+            progress_url(i), headers=headers[user(i).id])),
+        Scenario("POST /api/assets", lambda c, i: c.post(
+            "/api/assets", json={"filename": f"new-{i}.mp4", "content_type": "video/mp4", "size": ASSET_SIZE},
+            headers=headers[user(i).id])),
+        Scenario("GET /api/assets/{asset_id}/upload", lambda c, i: c.get(
+            f"/api/assets/{ready_assets[i % len(ready_assets)][1]}/upload",
+            headers=headers[ready_assets[i % len(ready_assets)][0].id])),
+        Scenario("PUT /api/assets/{asset_id}/chunks", upload_chunk),
+        Scenario("GET /api/assets/{asset_id}", lambda c, i: c.get(
+            f"/api/assets/{ready_assets[i % len(ready_assets)][1]}")),
+        Scenario("GET /api/assets/{asset_id} (range)", lambda c, i: c.get(
+            f"/api/assets/{ready_assets[i % len(ready_assets)][1]}", headers={"Range": "bytes=0-8191"}), {206}),
+        Scenario("HEAD /api/assets/{asset_id}", lambda c, i: c.head(
+            f"/api/assets/{ready_assets[i % len(ready_assets)][1]}")),
+        Scenario("DELETE /api/assets/{asset_id}", delete_asset, {200, 404}),
+        Scenario("GET /api/cache/stats", lambda c, i: c.get("/api/cache/stats", headers=ops_headers)),
+        Scenario("GET /api/db/pool", lambda c, i: c.get("/api/db/pool", headers=ops_headers)),
+        Scenario("GET /metrics", lambda c, i: c.get("/metrics", headers=ops_headers)),
+    ]
+    return scenarios
+
+
+async def run_scenario(client, scenario: Scenario, requests: int, concurrency: int) -> dict:
+    latencies: List[float] = []
+    errors = 0
+    counter = iter(range(requests))
+
+    async def worker():
+        nonlocal errors
+        for i in counter:
+            started = time.perf_counter()
+            try:
+                response = await scenario.call(client, i)
+            except Exception:
+                # The ASGI transport re-raises handler errors, e.g. queries mongomock can't run
+                errors += 1
+                continue
+            latencies.append(time.perf_counter() - started)
+            if response.status_code not in scenario.expected:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": requests,
+        "errors": errors,
+        "rps": round(requests / elapsed, 1) if elapsed else 0.0,
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 3) if latencies else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+    }
+
+
+def print_report(results: Dict[str, dict], baseline: Optional[Dict[str, dict]]):
+    header = f"{'endpoint':<50} {'rps':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>7}"
+    if baseline:
+        header += f" {'p95 Δ':>8} {'rps Δ':>8}"
+    print(header)
+    for name, r in results.items():
+        line = f"{name:<50} {r['rps']:>9.1f} {r['p50_ms']:>9.2f} {r['p95_ms']:>9.2f} {r['p99_ms']:>9.2f} {r['errors']:>7}"
+        base = (baseline or {}).get(name)
+        if base:
+            def delta(key):
+                return f"{(r[key] - base[key]) / base[key] * 100:+.0f}%" if base[key] else "n/a"
+            line += f" {delta('p95_ms'):>8} {delta('rps'):>8}"
+        print(line)
+
+
+async def main(args):
+    os.environ["MONGO_URL"] = args.mongo_url
+    os.environ.setdefault("SECRET_KEY", "benchmark-secret-key-that-is-long-enough-for-hs256")
+    # Every simulated client shares one address and hammers the same routes; measure the handlers, not the limiter
+    os.environ.setdefault("RATE_LIMIT_ENABLED", "0")
+    db_name = f"bench_{uuid.uuid4().hex[:8]}"
+    os.environ["DB_NAME"] = db_name
+
+    import httpx
+    import server
+
+    if args.in_memory:
+        try:
+            from mongomock_motor import AsyncMongoMockClient
+        except ImportError:
+            sys.exit("--in-memory needs mongomock-motor (pip install mongomock-motor)")
+        mongo = AsyncMongoMockClient()
+        server.db = server.list_db = mongo[db_name]
+        # GridFS needs a real server; keep uploads on local disk instead
+        asset_dir = tempfile.TemporaryDirectory(prefix="bench-assets-")
+        from assets import LocalAssetStorage
+
+        server.asset_storage = LocalAssetStorage(Path(asset_dir.name))
+    else:
+        await server.warm_up(server.client, server.db_settings.warm_connections)
+    db = server.db
+    await server.ensure_indexes(db)
+
+    random.seed(args.seed)
+    started = time.perf_counter()
+    profiles, courses_by_user, badges_by_user, doomed, published = await seed(
+        db, server, args.users, args.courses_per_user, args.badges_per_user, args.requests)
+    assets = await seed_assets(db, server, profiles, args.requests)
+    print(f"Seeded {args.users} users, {args.users * args.courses_per_user} courses, "
+          f"{args.users * args.badges_per_user} badges, {args.users + args.requests} assets "
+          f"in {time.perf_counter() - started:.1f}s")
+
+    scenarios = build_scenarios(server, profiles, courses_by_user, badges_by_user, doomed, published, assets)
+    if args.only:
+        scenarios = [s for s in scenarios if any(pattern in s.name for pattern in args.only)]
+
+    results = {}
+    transport = httpx.ASGITransport(app=server.app)
+    limits = httpx.Limits(max_connections=args.concurrency)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", limits=limits) as client:
+            for scenario in scenarios:
+                results[scenario.name] = await run_scenario(client, scenario, args.requests, args.concurrency)
+    finally:
+        if not args.in_memory and not args.keep:
+            await server.client.drop_database(db_name)
+        if args.in_memory:
+            asset_dir.cleanup()
+
+    baseline = None
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text())["endpoints"]
+    print_report(results, baseline)
+
+    if args.output:
+        report = {
+            "meta": {
+                "users": args.users,
+                "courses_per_user": args.courses_per_user,
+                "badges_per_user": args.badges_per_user,
+                "requests": args.requests,
+                "concurrency": args.concurrency,
+                "in_memory": args.in_memory,
+            },
+            "endpoints": results,
+        }
+        Path(args.output).write_text(json.dumps(report, indent=2) + "\n")
+        print(f"Wrote {args.output}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mongo-url", default=os.environ.get("MONGO_URL", "mongodb://localhost:27017"))
+    parser.add_argument("--in-memory", action="store_true", help="use mongomock-motor instead of mongod")
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--courses-per-user", type=int, default=5)
+    parser.add_argument("--badges-per-user", type=int, default=10)
+    parser.add_argument("--requests", type=int, default=200, help="requests per endpoint")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--only", nargs="*", help="only run endpoints whose name contains one of these")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="write results as JSON")
+    parser.add_argument("--baseline", help="JSON from an earlier --output run to diff against")
+    parser.add_argument("--keep", action="store_true", help="keep the scratch database")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
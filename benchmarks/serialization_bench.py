@@ -0,0 +1,130 @@
+"""Cost of serializing a 1000-course listing: FastAPI's response_model path vs FastJSONResponse.
+
+Both apps build the same ``Course`` models from raw documents, as the
+handlers do after reading MongoDB; the difference is everything after.
+Run with ``python benchmarks/serialization_bench.py [--courses N] [--requests N]``.
+"""
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import time
+from pathlib import Path
+from typing import List
+
+import httpx
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "benchmark")
+os.environ.setdefault("SECRET_KEY", "benchmark-secret-key-that-is-long-enough-for-hs256")
+
+from serialization import fast_json, orjson  # noqa: E402
+from server import Course  # noqa: E402
+
+
+def course_documents(count: int):
+    return [
+        Course(
+            title=f"Course {i}",
+            description="A course about things " * 5,
+            duration="3h",
+            instructor="Bench",
+            level="Intermediate",
+            category="crashcourses",
+            tags=["Python", "Async", "MongoDB"],
+            sessions=[
+                {"id": s, "title": f"Session {s}", "duration": "20m", "description": "Details " * 10, "video_url": ""}
+                for s in range(8)
+            ],
+            quiz={"questions": [
+                {"question": f"Question {q}?", "options": ["a", "b", "c", "d"], "correct": q % 4} for q in range(5)
+            ]},
+            created_by="bench-user",
+        ).dict()
+        for i in range(count)
+    ]
+
+
+def build_apps(docs):
+    default, fast = FastAPI(), FastAPI()
+
+    @default.get("/courses", response_model=List[Course])
+    async def default_listing():
+        return [Course(**doc) for doc in docs]
+
+    @fast.get("/courses", response_model=List[Course])
+    async def fast_listing():
+        return fast_json([Course(**doc) for doc in docs])
+
+    return default, fast
+
+
+async def measure(app, requests: int) -> float:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        body = (await client.get("/courses")).content  # warm up
+        best = float("inf")
+        for _ in range(requests):
+            started = time.perf_counter()
+            await client.get("/courses")
+            best = min(best, time.perf_counter() - started)
+    return best * 1000, len(body)
+
+
+async def serialization_only(models, repeat: int):
+    """Models -> response body bytes, without HTTP: the part FastJSONResponse replaces."""
+    field = create_response_field(name="Response_courses", type_=List[Course], mode="serialization")
+
+    async def default_path():
+        return JSONResponse(await serialize_response(field=field, response_content=models)).body
+
+    async def fast_path():
+        return fast_json(models).body
+
+    timings = {}
+    for name, fn in (("response_model", default_path), ("FastJSONResponse", fast_path)):
+        await fn()
+        best = float("inf")
+        for _ in range(repeat):
+            started = time.perf_counter()
+            await fn()
+            best = min(best, time.perf_counter() - started)
+        timings[name] = best * 1000
+    return timings
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--courses", type=int, default=1000)
+    parser.add_argument("--requests", type=int, default=20)
+    args = parser.parse_args()
+
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    docs = course_documents(args.courses)
+    default, fast = build_apps(docs)
+    encoder = "orjson" if orjson is not None else "json (orjson not installed)"
+    print(f"{args.courses} courses, best of {args.requests}")
+    print("serialization only (models already built):")
+    timings = await serialization_only([Course(**doc) for doc in docs], args.requests)
+    for name, ms in timings.items():
+        print(f"  {name:<30} {ms:8.1f} ms")
+    print(f"  {'speedup':<30} {timings['response_model'] / timings['FastJSONResponse']:8.1f}x")
+
+    print("full request (build models + serialize + HTTP):")
+    results = {}
+    for name, app in (("response_model", default), (f"FastJSONResponse/{encoder}", fast)):
+        results[name], size = await measure(app, args.requests)
+        print(f"  {name:<30} {results[name]:8.1f} ms/request  ({size / 1024:.0f} KiB)")
+
+    baseline, optimized = results.values()
+    print(f"  {'speedup':<30} {baseline / optimized:8.1f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
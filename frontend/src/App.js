@@ -608,6 +608,26 @@ const CourseDetail = () => {
   const [badgeAwarded, setBadgeAwarded] = useState(false);
 
   const course = courseData[category]?.find(c => c.id === parseInt(courseId));
+  const progressUrl = `${BACKEND_URL}/api/progress/${category}/${courseId}`;
+
+  // Resume where the learner left off; progress is saved server-side for signed-in users
+  useEffect(() => {
+    if (!isAuthenticated || !course) return;
+    let cancelled = false;
+    fetch(progressUrl, { headers: getAuthHeaders() })
+      .then(response => (response.ok ? response.json() : null))
+      .then(saved => {
+        if (cancelled || !saved) return;
+        setCompletedSessions(prev => new Set([...prev, ...saved.completed_sessions]));
+        if (saved.current_session) {
+          setCurrentSession(saved.current_session);
+        }
+      })
+      .catch(error => console.error('Failed to load progress:', error));
+    return () => {
+      cancelled = true;
+    };
+  }, [isAuthenticated, course, progressUrl, getAuthHeaders]);
 
   if (!course) {
     return (
@@ -628,10 +648,25 @@ const CourseDetail = () => {
 
   const handleCompleteSession = () => {
     setCompletedSessions(prev => new Set([...prev, currentSession]));
+    const nextSession = isLastSession ? currentSession : currentSession + 1;
+    if (isAuthenticated) {
+      // Fire and forget: the server batches these, and a lost ping is recovered by the next one
+      fetch(progressUrl, {
+        method: 'POST',
+        headers: {
+          'Content-Type': 'application/json',
+          ...getAuthHeaders()
+        },
+        body: JSON.stringify({
+          completed_sessions: [...completedSessions, currentSession],
+          current_session: nextSession
+        })
+      }).catch(error => console.error('Failed to save progress:', error));
+    }
     if (isLastSession) {
       setShowQuiz(true);
     } else {
-      setCurrentSession(currentSession + 1);
+      setCurrentSession(nextSession);
     }
   };
 
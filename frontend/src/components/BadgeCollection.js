@@ -1,6 +1,7 @@
 import React, { useState, useEffect } from 'react';
 import Badge from './Badge';
 import { useAuth } from '../contexts/AuthContext';
+import { fetchAllPages } from '../utils/pagination';
 
 const BACKEND_URL = process.env.REACT_APP_BACKEND_URL;
 
@@ -22,14 +23,13 @@ const BadgeCollection = ({ userId, showTitle = true, maxDisplay = null }) => {
         
         const headers = userId ? {} : getAuthHeaders();
         
-        const response = await fetch(endpoint, { headers });
+        const { response, items } = await fetchAllPages(endpoint, { headers });
         
         if (!response.ok) {
           throw new Error('Failed to fetch badges');
         }
         
-        const badgeData = await response.json();
-        setBadges(badgeData);
+        setBadges(items);
       } catch (err) {
         setError(err.message);
       } finally {
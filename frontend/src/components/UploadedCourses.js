@@ -1,6 +1,7 @@
 import React, { useState, useEffect } from 'react';
 import { useAuth } from '../contexts/AuthContext';
 import { useNavigate } from 'react-router-dom';
+import { fetchAllPages } from '../utils/pagination';
 
 const BACKEND_URL = process.env.REACT_APP_BACKEND_URL;
 
@@ -19,12 +20,12 @@ const UploadedCourses = ({ userId, showTitle = true }) => {
         
         // Fetch courses created by the current user or specific user
         const endpoint = userId 
-          ? `/api/courses/created/${userId}`
-          : '/api/courses/created';
+          ? `/api/courses/created/${userId}?view=summary`
+          : '/api/courses/created?view=summary';
         
         const headers = userId ? {} : getAuthHeaders();
         
-        const response = await fetch(`${BACKEND_URL}${endpoint}`, { 
+        const { response, items } = await fetchAllPages(`${BACKEND_URL}${endpoint}`, { 
           headers: {
             'Content-Type': 'application/json',
             ...headers
@@ -32,8 +33,7 @@ const UploadedCourses = ({ userId, showTitle = true }) => {
         });
         
         if (response.ok) {
-          const coursesData = await response.json();
-          setCourses(coursesData);
+          setCourses(items);
         } else if (response.status === 401) {
           // User not authenticated
           setCourses([]);
@@ -132,8 +132,8 @@ const UploadedCourses = ({ userId, showTitle = true }) => {
                   <span className="capitalize">{course.category}</span>
                 </div>
                 <div className="flex justify-between items-center text-xs text-gray-400">
-                  <span>{course.sessions?.length || 0} sessions</span>
-                  <span>{course.quiz?.questions?.length || 0} quiz questions</span>
+                  <span>{course.session_count || 0} sessions</span>
+                  <span>{course.question_count || 0} quiz questions</span>
                 </div>
               </div>
               <div className="flex flex-wrap gap-1 mb-4">
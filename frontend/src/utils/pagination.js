@@ -0,0 +1,24 @@
+// List endpoints return one page at a time and name the next one in this header
+const NEXT_CURSOR_HEADER = 'X-Next-Cursor';
+
+// Fetches every page of a paged list endpoint by following the next-page cursor.
+// Resolves to { response, items }: response is the first failed one, or the last page.
+export const fetchAllPages = async (url, options = {}) => {
+  const items = [];
+  let after = null;
+  for (;;) {
+    const pageUrl = new URL(url, window.location.origin);
+    if (after) {
+      pageUrl.searchParams.set('after', after);
+    }
+    const response = await fetch(pageUrl, options);
+    if (!response.ok) {
+      return { response, items };
+    }
+    items.push(...(await response.json()));
+    after = response.headers.get(NEXT_CURSOR_HEADER);
+    if (!after) {
+      return { response, items };
+    }
+  }
+};
@@ -0,0 +1,215 @@
+import functools
+import os
+import sys
+import time
+import uuid
+from pathlib import Path
+
+import pytest
+from pymongo import monitoring
+from pymongo.errors import BulkWriteError
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "test_database")
+os.environ.setdefault("SECRET_KEY", "test-secret-key-that-is-long-enough-for-hs256")
+
+
+@functools.lru_cache(maxsize=None)
+def mongo_available():
+    from pymongo import MongoClient
+
+    client = MongoClient(os.environ["MONGO_URL"], serverSelectionTimeoutMS=500)
+    try:
+        client.admin.command("ping")
+        return True
+    except Exception:
+        return False
+    finally:
+        client.close()
+
+
+class CommandLog(monitoring.CommandListener):
+    """Records the name of every command the client sends to MongoDB."""
+
+    def __init__(self):
+        self.names = []
+
+    def started(self, event):
+        self.names.append(event.command_name)
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+    def clear(self):
+        self.names.clear()
+
+
+class FakeClock:
+    """Stands in for ``clock=`` arguments; tests move time by setting ``now``.
+
+    With ``tick`` set, every reading first advances ``now`` by that much.
+    """
+
+    def __init__(self, now=0.0, tick=None):
+        self.now = now
+        self.tick = tick
+
+    def __call__(self):
+        if self.tick is not None:
+            self.now += self.tick
+        return self.now
+
+
+class RecordingCollection:
+    """Records the unordered insert_many and bulk_write calls a Motor collection would receive.
+
+    Writes at the ``failing`` indexes come back as BulkWriteError writeErrors
+    while the rest count as applied, as in an unordered write; ``down``
+    fails the whole call.
+    """
+
+    def __init__(self, failing=(), down=False):
+        self.failing = set(failing)
+        self.down = down
+        self.batches = []  # documents, per insert_many
+        self.requests = []  # requests, per bulk_write
+        self.applied = []  # every write that didn't fail
+
+    def _write(self, ordered, writes):
+        assert ordered is False
+        if self.down:
+            raise ConnectionError("database unavailable")
+        self.applied.extend(write for i, write in enumerate(writes) if i not in self.failing)
+        if self.failing:
+            errors = [{"index": i, "code": 2, "errmsg": "write failed"} for i in sorted(self.failing)]
+            raise BulkWriteError({"writeErrors": errors})
+
+    async def insert_many(self, docs, ordered=True):
+        self.batches.append(docs)
+        self._write(ordered, docs)
+
+    async def bulk_write(self, requests, ordered=True):
+        self.requests.append(requests)
+        self._write(ordered, requests)
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def recording_collection():
+    """The RecordingCollection class, to build as many fakes as a test needs."""
+    return RecordingCollection
+
+
+@pytest.fixture(scope="session")
+def make_course():
+    """Builds a minimal Course owned by ``created_by``; keyword arguments override any field."""
+    from server import Course
+
+    def make(created_by="u-1", **fields):
+        defaults = {
+            "title": "Course", "description": "", "duration": "1h", "instructor": "Ada", "level": "Beginner",
+            "category": "crashcourses", "tags": [], "sessions": [], "quiz": {"questions": []},
+        }
+        return Course(**{**defaults, "created_by": created_by, **fields})
+
+    return make
+
+
+@pytest.fixture(scope="session")
+def course_payload():
+    """The CourseCreate body that would create or update ``course`` over the API."""
+    from server import CourseCreate
+
+    def payload(course, **fields):
+        return {**CourseCreate(**course.dict()).dict(), **fields}
+
+    return payload
+
+
+@pytest.fixture(scope="session")
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+def command_log():
+    return CommandLog()
+
+
+@pytest.fixture
+async def mongo_db(command_log):
+    """A throwaway database on the MongoDB at MONGO_URL; skips if none is running."""
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    if not mongo_available():
+        pytest.skip("MongoDB is not reachable at MONGO_URL")
+    client = AsyncIOMotorClient(os.environ["MONGO_URL"], event_listeners=[command_log])
+    db = client[f"test_{uuid.uuid4().hex[:12]}"]
+    yield db
+    await client.drop_database(db.name)
+    client.close()
+
+
+@pytest.fixture
+def make_user(mongo_db):
+    """Inserts a UserProfile for ``google_id`` into ``mongo_db`` and returns it."""
+    from server import UserProfile
+
+    async def make(google_id, name="Owner"):
+        user = UserProfile(google_id=google_id, email=f"{google_id}@example.com", name=name)
+        await mongo_db.users.insert_one(user.dict())
+        return user
+
+    return make
+
+
+@pytest.fixture(scope="session")
+async def app_client():
+    """One pooled httpx client talking to server.app in-process, shared by the whole session.
+
+    On its own it is for requests that never reach MongoDB (auth rejections,
+    static routes); use ``api_client`` for anything that does.
+    """
+    import httpx
+    import server
+
+    transport = httpx.ASGITransport(app=server.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as client:
+        yield client
+
+
+@pytest.fixture
+async def api_client(app_client, mongo_db, monkeypatch):
+    """``app_client`` with server.app backed by ``mongo_db`` and its in-process caches emptied."""
+    import server
+
+    monkeypatch.setattr(server, "db", mongo_db)
+    monkeypatch.setattr(server, "list_db", mongo_db)
+    server.user_cache.clear()
+    server.token_verifier.clear()
+    server.response_cache.backend.clear()
+    server.leaderboards.clear()
+    server.rate_limiter.backend.clear()
+    monkeypatch.setattr(server, "progress_buffer", server.ProgressBuffer())
+    return app_client
+
+
+@pytest.fixture(scope="session")
+def auth_headers():
+    """Builds an Authorization header carrying a valid token for ``google_id``."""
+    import server
+
+    def headers(google_id):
+        token = server.token_verifier.encode({"sub": google_id, "exp": int(time.time()) + 3600})
+        return {"Authorization": f"Bearer {token}"}
+
+    return headers
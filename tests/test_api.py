@@ -0,0 +1,284 @@
+"""End-to-end API checks against server.app over in-process ASGI (formerly backend_test.py)."""
+import time
+import uuid
+
+import pytest
+
+import metrics
+from indexes import ensure_indexes
+
+pytestmark = pytest.mark.anyio
+
+# Fixed rather than random so test ids match across pytest-xdist workers
+MISSING_ID = "00000000-0000-4000-8000-000000000000"
+
+COURSE = {
+    "title": "Test Course",
+    "description": "A test course for API testing",
+    "duration": "2 hours",
+    "level": "Beginner",
+    "category": "masterclasses",
+    "tags": ["test", "api"],
+    "sessions": [{
+        "id": 1,
+        "title": "Introduction",
+        "duration": "30 minutes",
+        "description": "Introduction to the course",
+        "video_url": "https://example.com/video1",
+    }],
+    "quiz": {"questions": [{
+        "question": "What is this course about?",
+        "options": ["Testing", "Development", "Design", "Marketing"],
+        "correct": 0,
+    }]},
+}
+BADGE = {"course_id": 1, "course_category": "masterclasses", "quiz_score": 95}
+
+AUTHENTICATED_ROUTES = [
+    ("GET", "/api/auth/me", {}),
+    ("PUT", "/api/auth/profile", {"json": {"name": "Updated Name", "about_me": "Test bio", "age": 30}}),
+    ("POST", "/api/badges", {"json": BADGE}),
+    ("GET", "/api/badges/me", {}),
+    ("PUT", f"/api/badges/{MISSING_ID}", {"params": {"course_title": "Updated Course"}}),
+    ("POST", "/api/courses", {"json": COURSE}),
+    ("GET", "/api/courses/created", {}),
+    ("PUT", f"/api/courses/{MISSING_ID}", {"json": COURSE}),
+    ("PUT", f"/api/courses/{MISSING_ID}/publish", {}),
+    ("DELETE", f"/api/courses/{MISSING_ID}", {}),
+]
+route_ids = [f"{method} {path.replace(MISSING_ID, '{id}')}" for method, path, _ in AUTHENTICATED_ROUTES]
+
+
+OPS_ROUTES = ["/metrics", "/api/cache/stats", "/api/db/pool"]
+
+
+@pytest.fixture(scope="session")
+def credentials():
+    """Authorization headers for each way a request can fail authentication, minted once."""
+    import server
+
+    expired = server.token_verifier.encode({"sub": "test_google_id", "exp": int(time.time()) - 3600})
+    return {
+        "missing": {},
+        "not bearer": {"Authorization": "Basic dXNlcjpwYXNz"},
+        "malformed": {"Authorization": "Bearer invalid_token_here"},
+        "expired": {"Authorization": f"Bearer {expired}"},
+    }
+
+
+@pytest.fixture
+async def user(make_user):
+    return await make_user(f"g-{uuid.uuid4().hex[:8]}", name="API User")
+
+
+@pytest.mark.parametrize("credential", ["missing", "not bearer", "malformed", "expired"])
+@pytest.mark.parametrize("method,path,kwargs", AUTHENTICATED_ROUTES, ids=route_ids)
+async def test_authenticated_routes_reject_bad_credentials(app_client, credentials, method, path, kwargs, credential):
+    response = await app_client.request(method, path, headers=credentials[credential], **kwargs)
+    assert response.status_code == 401
+
+
+@pytest.mark.parametrize("method,path,kwargs", AUTHENTICATED_ROUTES, ids=route_ids)
+async def test_valid_token_for_unknown_user_is_404(api_client, auth_headers, method, path, kwargs):
+    response = await api_client.request(method, path, headers=auth_headers("no-such-google-id"), **kwargs)
+    assert response.status_code == 404
+    assert response.json()["detail"] == "User not found"
+
+
+async def test_root(app_client):
+    response = await app_client.get("/api/")
+    assert response.status_code == 200
+    assert response.json() == {"message": "Hello World"}
+
+
+async def test_logout(app_client):
+    response = await app_client.post("/api/auth/logout")
+    assert response.status_code == 200
+    assert response.json()["message"] == "Logged out successfully"
+
+
+async def test_google_login_redirects_to_google(app_client, monkeypatch):
+    import server
+
+    # Pre-seed the discovery document so authlib doesn't fetch it from Google
+    metadata = {"authorization_endpoint": "https://accounts.google.com/o/oauth2/v2/auth", "_loaded_at": time.time()}
+    monkeypatch.setattr(server.oauth.google, "server_metadata", metadata)
+
+    response = await app_client.get("/api/auth/login/google", follow_redirects=False)
+
+    assert response.status_code == 302
+    assert response.headers["location"].startswith("https://accounts.google.com/")
+
+
+async def test_status_round_trip(api_client):
+    created = await api_client.post("/api/status", json={"client_name": "test_api"})
+    assert created.status_code == 200
+
+    checks = (await api_client.get("/api/status")).json()
+    assert [check["id"] for check in checks] == [created.json()["id"]]
+
+
+async def test_write_and_list_handlers_time_db_and_model_spans(api_client):
+    route = "/api/status"
+    before = {name: metrics.SPAN_LATENCY.count(route, name) for name in ("db", "model")}
+    await api_client.post(route, json={"client_name": "test_api"})
+    await api_client.get(route)
+    assert metrics.SPAN_LATENCY.count(route, "db") == before["db"] + 2
+    assert metrics.SPAN_LATENCY.count(route, "model") == before["model"] + 1
+
+
+@pytest.mark.parametrize("path", ["/api/badges/user/{id}", "/api/courses/created/{id}"])
+async def test_public_lists_for_unknown_user_are_empty(api_client, path):
+    response = await api_client.get(path.format(id=MISSING_ID))
+    assert response.status_code == 200
+    assert response.json() == []
+
+
+async def test_missing_course_is_404(api_client):
+    assert (await api_client.get(f"/api/courses/{MISSING_ID}")).status_code == 404
+
+
+async def test_profile_update(api_client, auth_headers, user):
+    headers = auth_headers(user.google_id)
+
+    response = await api_client.put("/api/auth/profile", json={"about_me": "Test bio", "age": 30}, headers=headers)
+    assert response.status_code == 200
+    assert response.json()["about_me"] == "Test bio"
+
+    invalid = await api_client.put("/api/auth/profile", json={"age": "thirty"}, headers=headers)
+    assert invalid.status_code == 422
+
+
+async def test_course_lifecycle(api_client, auth_headers, user):
+    headers = auth_headers(user.google_id)
+
+    created = await api_client.post("/api/courses", json=COURSE, headers=headers)
+    assert created.status_code == 200
+    course = created.json()
+    assert course["instructor"] == user.name and course["published"] is False
+
+    own = (await api_client.get("/api/courses/created", headers=headers)).json()
+    assert [c["id"] for c in own] == [course["id"]]
+    assert (await api_client.get(f"/api/courses/created/{user.id}")).json() == []
+
+    updated = await api_client.put(f"/api/courses/{course['id']}", json={**COURSE, "title": "Renamed"}, headers=headers)
+    assert updated.json()["title"] == "Renamed"
+
+    assert (await api_client.put(f"/api/courses/{course['id']}/publish", headers=headers)).status_code == 200
+    public = (await api_client.get(f"/api/courses/created/{user.id}")).json()
+    assert [c["title"] for c in public] == ["Renamed"]
+
+    assert (await api_client.delete(f"/api/courses/{course['id']}", headers=headers)).status_code == 200
+    assert (await api_client.get(f"/api/courses/{course['id']}")).status_code == 404
+
+
+async def test_badge_lifecycle(api_client, auth_headers, user, mongo_db):
+    await ensure_indexes(mongo_db)  # the duplicate check is the unique user_course index
+    headers = auth_headers(user.google_id)
+
+    created = await api_client.post("/api/badges", json=BADGE, headers=headers)
+    assert created.status_code == 200
+    badge = created.json()
+
+    duplicate = await api_client.post("/api/badges", json=BADGE, headers=headers)
+    assert duplicate.status_code == 400
+
+    renamed = await api_client.put(f"/api/badges/{badge['id']}", params={"course_title": "Updated Course"}, headers=headers)
+    assert renamed.json()["course_title"] == "Updated Course"
+
+    mine = (await api_client.get("/api/badges/me", headers=headers)).json()
+    public = (await api_client.get(f"/api/badges/user/{user.id}")).json()
+    assert [b["course_title"] for b in mine] == [b["course_title"] for b in public] == ["Updated Course"]
+
+
+async def test_self_reported_badges_are_limited_to_the_builtin_catalog(api_client, auth_headers, user):
+    headers = auth_headers(user.google_id)
+
+    unknown = await api_client.post("/api/badges", json={**BADGE, "course_id": 101}, headers=headers)
+    assert unknown.status_code == 404
+    failing = await api_client.post("/api/badges", json={**BADGE, "quiz_score": 10}, headers=headers)
+    assert failing.status_code == 400
+    inflated = await api_client.post("/api/badges", json={**BADGE, "quiz_score": 1000}, headers=headers)
+    assert inflated.status_code == 422
+
+
+async def published_course(api_client, headers):
+    course = (await api_client.post("/api/courses", json=COURSE, headers=headers)).json()
+    await api_client.put(f"/api/courses/{course['id']}/publish", headers=headers)
+    return course
+
+
+async def test_public_course_reads_hide_the_answer_key(api_client, auth_headers, user):
+    headers = auth_headers(user.google_id)
+    course = await published_course(api_client, headers)
+
+    reads = [
+        (await api_client.get(f"/api/courses/{course['id']}")).json(),
+        (await api_client.get("/api/courses", params={"view": "full"})).json()["courses"][0],
+        (await api_client.get(f"/api/courses/created/{user.id}")).json()[0],
+    ]
+    for read in reads:
+        assert read["quiz"]["questions"][0]["options"] == COURSE["quiz"]["questions"][0]["options"]
+        assert "correct" not in read["quiz"]["questions"][0]
+
+    # The author's own list keeps it for editing
+    own = (await api_client.get("/api/courses/created", headers=headers)).json()
+    assert own[0]["quiz"]["questions"][0]["correct"] == 0
+
+
+async def test_catalog_lists_summaries(api_client, auth_headers, user):
+    course = await published_course(api_client, auth_headers(user.google_id))
+
+    [summary] = (await api_client.get("/api/courses")).json()["courses"]
+    assert summary["id"] == course["id"]
+    assert "sessions" not in summary and "quiz" not in summary
+    assert (summary["session_count"], summary["question_count"]) == (len(COURSE["sessions"]), 1)
+
+
+async def test_award_badge(api_client, auth_headers, user, mongo_db):
+    await ensure_indexes(mongo_db)
+    headers = auth_headers(user.google_id)
+    course = await published_course(api_client, headers)
+
+    failed = await api_client.post("/api/badges/award", json={"course_id": course["id"], "answers": [2]}, headers=headers)
+    assert failed.status_code == 200
+    assert failed.json() == {"score": 0, "passed": False, "badge": None}
+
+    passed = await api_client.post("/api/badges/award", json={"course_id": course["id"], "answers": [0]}, headers=headers)
+    result = passed.json()
+    assert result["score"] == 100 and result["passed"] is True
+    assert result["badge"]["course_title"] == COURSE["title"]
+
+    duplicate = await api_client.post("/api/badges/award", json={"course_id": course["id"], "answers": [0]}, headers=headers)
+    assert duplicate.status_code == 400
+    mine = (await api_client.get("/api/badges/me", headers=headers)).json()
+    assert [badge["id"] for badge in mine] == [result["badge"]["id"]]
+
+
+async def test_award_badge_for_unpublished_course_is_404(api_client, auth_headers, user):
+    headers = auth_headers(user.google_id)
+    draft = (await api_client.post("/api/courses", json=COURSE, headers=headers)).json()
+
+    response = await api_client.post("/api/badges/award", json={"course_id": draft["id"], "answers": [0]}, headers=headers)
+    assert response.status_code == 404
+
+
+@pytest.mark.parametrize("path", OPS_ROUTES)
+async def test_ops_routes_are_only_served_locally(app_client, path):
+    import httpx
+    import server
+
+    assert (await app_client.get(path)).status_code == 200
+    remote = httpx.ASGITransport(app=server.app, client=("203.0.113.7", 40000))
+    async with httpx.AsyncClient(transport=remote, base_url="http://testserver") as client:
+        assert (await client.get(path)).status_code == 403
+
+
+@pytest.mark.parametrize("path", OPS_ROUTES)
+async def test_ops_routes_require_the_token_once_set(app_client, monkeypatch, path):
+    import server
+
+    monkeypatch.setattr(server, "OPS_TOKEN", "ops-secret")
+    assert (await app_client.get(path)).status_code == 403
+    assert (await app_client.get(path, headers={"Authorization": "Bearer wrong"})).status_code == 403
+    assert (await app_client.get(path, headers={"Authorization": "Bearer ops-secret"})).status_code == 200
@@ -0,0 +1,285 @@
+import json
+from datetime import datetime, timedelta
+
+import httpx
+import pytest
+from starlette.applications import Starlette
+from starlette.routing import Route
+
+from assets import (
+    ASSET_CHUNK_SIZE,
+    FileRangeResponse,
+    GridFSAssetStorage,
+    LocalAssetStorage,
+    RangeNotSatisfiable,
+    asset_content_type,
+    expire_uploads,
+    parse_range,
+)
+
+pytestmark = pytest.mark.anyio
+
+CONTENT = bytes(range(256)) * (ASSET_CHUNK_SIZE // 256) + b"tail of the video"
+COURSE = {
+    "title": "Video course",
+    "description": "Sessions served from uploads",
+    "duration": "1h",
+    "level": "Beginner",
+    "category": "masterclasses",
+    "tags": [],
+    "quiz": {"questions": []},
+}
+
+
+@pytest.mark.parametrize("header,expected", [
+    (None, None),
+    ("bytes=0-9", (0, 9)),
+    ("bytes=10-", (10, 99)),
+    ("bytes=-10", (90, 99)),
+    ("bytes=-500", (0, 99)),
+    ("bytes=90-500", (90, 99)),
+    ("bytes=0-1,5-6", None),
+    ("bytes=5-2", None),
+    ("bytes=a-b", None),
+    ("items=0-9", None),
+])
+def test_parse_range(header, expected):
+    assert parse_range(header, 100) == expected
+
+
+@pytest.mark.parametrize("content_type,expected", [
+    ("video/mp4", "video/mp4"),
+    ("Image/PNG; charset=binary", "image/png"),
+    ("application/pdf", "application/pdf"),
+    ("image/svg+xml", None),
+    ("IMAGE/SVG+XML; charset=utf-8", None),
+    ("text/html", None),
+])
+def test_asset_content_type(content_type, expected):
+    assert asset_content_type(content_type) == expected
+
+
+@pytest.mark.parametrize("header", ["bytes=100-", "bytes=-0"])
+def test_unsatisfiable_range(header):
+    with pytest.raises(RangeNotSatisfiable):
+        parse_range(header, 100)
+
+
+async def test_file_range_response_streams_the_range(tmp_path):
+    path = tmp_path / "video.bin"
+    path.write_bytes(CONTENT)
+
+    async def endpoint(request):
+        return FileRangeResponse(path, 1000, 70000, 206, media_type="video/mp4")
+
+    app = Starlette(routes=[Route("/", endpoint)])
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.get("/")
+    assert response.status_code == 206
+    assert response.content == CONTENT[1000:71000]
+
+
+async def test_file_range_response_hands_the_file_to_zerocopy_servers(tmp_path):
+    path = tmp_path / "video.bin"
+    path.write_bytes(CONTENT)
+    messages = []
+
+    async def send(message):
+        if message["type"] == "http.response.zerocopy":
+            message = {**message, "file": message["file"].name}
+        messages.append(message)
+
+    scope = {"type": "http", "method": "GET", "extensions": {"http.response.zerocopy": {}}}
+    await FileRangeResponse(path, 10, 20)(scope, None, send)
+    assert messages[1] == {"type": "http.response.zerocopy", "file": str(path), "offset": 10, "count": 20}
+
+
+@pytest.fixture(params=["local", "gridfs"])
+async def storage(request, api_client, mongo_db, tmp_path, monkeypatch):
+    import server
+
+    from indexes import ensure_indexes
+
+    await ensure_indexes(mongo_db)
+    storage = LocalAssetStorage(tmp_path) if request.param == "local" else GridFSAssetStorage(mongo_db)
+    monkeypatch.setattr(server, "asset_storage", storage)
+    return storage
+
+
+@pytest.fixture
+async def user(make_user):
+    return await make_user("asset-owner")
+
+
+async def upload(client, headers, content, content_type="video/mp4"):
+    asset = (await client.post(
+        "/api/assets", json={"filename": "intro.mp4", "content_type": content_type, "size": len(content)}, headers=headers
+    )).json()
+    for offset in range(0, len(content), asset["chunk_size"]):
+        chunk = content[offset:offset + asset["chunk_size"]]
+        response = await client.put(
+            f"/api/assets/{asset['id']}/chunks", params={"offset": offset}, files={"chunk": chunk}, headers=headers
+        )
+        assert response.status_code == 200
+        asset = response.json()
+    return asset
+
+
+async def test_resumable_upload(api_client, storage, user, auth_headers):
+    headers = auth_headers(user.google_id)
+    created = await api_client.post(
+        "/api/assets", json={"filename": "intro.mp4", "content_type": "video/mp4", "size": len(CONTENT)}, headers=headers
+    )
+    asset = created.json()
+    assert asset["status"] == "uploading" and asset["received"] == 0
+
+    def put(offset, data):
+        return api_client.put(
+            f"/api/assets/{asset['id']}/chunks", params={"offset": offset}, files={"chunk": data}, headers=headers
+        )
+
+    first = CONTENT[:ASSET_CHUNK_SIZE]
+    assert (await put(0, first)).json()["received"] == ASSET_CHUNK_SIZE
+
+    # A re-sent chunk says where to resume
+    again = await put(0, first)
+    assert again.status_code == 409
+    assert again.headers["Upload-Offset"] == str(ASSET_CHUNK_SIZE)
+    status = await api_client.get(f"/api/assets/{asset['id']}/upload", headers=headers)
+    assert status.json()["received"] == ASSET_CHUNK_SIZE
+
+    assert (await put(ASSET_CHUNK_SIZE, b"short")).status_code == 400
+    assert (await api_client.get(f"/api/assets/{asset['id']}")).status_code == 404  # not complete yet
+
+    done = await put(ASSET_CHUNK_SIZE, CONTENT[ASSET_CHUNK_SIZE:])
+    assert done.json()["status"] == "ready"
+
+    full = await api_client.get(f"/api/assets/{asset['id']}")
+    assert full.status_code == 200
+    assert full.headers["accept-ranges"] == "bytes"
+    assert full.headers["x-content-type-options"] == "nosniff"
+    assert full.headers["content-security-policy"] == "sandbox"
+    assert full.headers["content-disposition"] == "inline"
+    assert full.content == CONTENT
+
+
+async def test_head_does_not_read_the_content(api_client, storage, user, auth_headers, monkeypatch):
+    asset = await upload(api_client, auth_headers(user.google_id), CONTENT)
+
+    def unread(*args):
+        raise AssertionError("HEAD must not read the asset")
+
+    monkeypatch.setattr(storage, "response", unread)
+    head = await api_client.head(f"/api/assets/{asset['id']}")
+    assert head.status_code == 200
+    assert head.headers["content-length"] == str(len(CONTENT))
+    assert head.content == b""
+
+
+async def test_documents_are_served_as_downloads(api_client, storage, user, auth_headers):
+    pdf = await upload(api_client, auth_headers(user.google_id), b"%PDF-1.4 not really", "application/pdf")
+    response = await api_client.get(f"/api/assets/{pdf['id']}")
+    assert response.headers["content-disposition"] == "attachment"
+    assert response.headers["content-security-policy"] == "sandbox"
+
+
+@pytest.mark.parametrize("content_type", ["text/x-sh", "image/svg+xml"])
+async def test_unsupported_asset_type(api_client, storage, user, auth_headers, content_type):
+    response = await api_client.post(
+        "/api/assets", json={"filename": "upload", "content_type": content_type, "size": 10},
+        headers=auth_headers(user.google_id),
+    )
+    assert response.status_code == 415
+
+
+async def test_range_requests(api_client, storage, user, auth_headers):
+    asset = await upload(api_client, auth_headers(user.google_id), CONTENT)
+    url = f"/api/assets/{asset['id']}"
+    # Spans the boundary between two GridFS chunks
+    start, end = 256 * 1024 - 10, 256 * 1024 + 9
+
+    partial = await api_client.get(url, headers={"Range": f"bytes={start}-{end}"})
+    assert partial.status_code == 206
+    assert partial.headers["content-range"] == f"bytes {start}-{end}/{len(CONTENT)}"
+    assert partial.content == CONTENT[start:end + 1]
+
+    suffix = await api_client.get(url, headers={"Range": "bytes=-17"})
+    assert suffix.content == b"tail of the video"
+
+    unsatisfiable = await api_client.get(url, headers={"Range": f"bytes={len(CONTENT)}-"})
+    assert unsatisfiable.status_code == 416
+    assert unsatisfiable.headers["content-range"] == f"bytes */{len(CONTENT)}"
+
+    stale = await api_client.get(url, headers={"Range": "bytes=0-9", "If-Range": '"other"'})
+    assert stale.status_code == 200 and len(stale.content) == len(CONTENT)
+
+    cached = await api_client.get(url, headers={"If-None-Match": full_etag(asset)})
+    assert cached.status_code == 304
+
+
+def full_etag(asset):
+    return f'"{asset["id"]}"'
+
+
+async def test_sessions_reference_completed_uploads(api_client, storage, user, auth_headers):
+    headers = auth_headers(user.google_id)
+    asset = await upload(api_client, headers, CONTENT)
+    session = {"id": 1, "title": "Intro", "duration": "5m", "description": "Welcome", "asset_id": asset["id"]}
+
+    course = await api_client.post("/api/courses", json={**COURSE, "sessions": [session]}, headers=headers)
+    assert course.status_code == 200
+    assert course.json()["sessions"][0]["asset_id"] == asset["id"]
+
+    unknown = {**session, "asset_id": "no-such-asset"}
+    assert (await api_client.post("/api/courses", json={**COURSE, "sessions": [unknown]}, headers=headers)).status_code == 400
+
+    in_use = await api_client.delete(f"/api/assets/{asset['id']}", headers=headers)
+    assert in_use.status_code == 409
+
+    await api_client.delete(f"/api/courses/{course.json()['id']}", headers=headers)
+    assert (await api_client.delete(f"/api/assets/{asset['id']}", headers=headers)).status_code == 200
+    assert (await api_client.get(f"/api/assets/{asset['id']}")).status_code == 404
+
+
+async def test_imported_courses_may_only_reference_own_uploads(api_client, storage, user, auth_headers, make_user):
+    headers = auth_headers(user.google_id)
+    asset = await upload(api_client, headers, CONTENT)
+    other = await make_user("asset-borrower", name="Borrower")
+
+    def course(asset_id):
+        session = {"id": 1, "title": "Intro", "duration": "5m", "description": "", "asset_id": asset_id}
+        return json.dumps({**COURSE, "sessions": [session]})
+
+    body = "\n".join([course(asset["id"]), course(None)])
+    response = await api_client.post(
+        "/api/courses/import", content=body,
+        headers={**auth_headers(other.google_id), "Content-Type": "application/x-ndjson"},
+    )
+    assert [result["status"] for result in response.json()["results"]] == ["error", "created"]
+
+    response = await api_client.post(
+        "/api/courses/import", content=course(asset["id"]), headers={**headers, "Content-Type": "application/x-ndjson"}
+    )
+    assert response.json()["created"] == 1
+
+
+async def test_abandoned_uploads_expire_with_their_content(api_client, storage, user, auth_headers, mongo_db):
+    headers = auth_headers(user.google_id)
+    done = await upload(api_client, headers, CONTENT)
+    abandoned = (await api_client.post(
+        "/api/assets", json={"filename": "big.mp4", "content_type": "video/mp4", "size": len(CONTENT)}, headers=headers
+    )).json()
+    await api_client.put(
+        f"/api/assets/{abandoned['id']}/chunks", params={"offset": 0}, files={"chunk": CONTENT[:ASSET_CHUNK_SIZE]},
+        headers=headers,
+    )
+
+    assert await expire_uploads(mongo_db.assets, storage, datetime.utcnow() - timedelta(hours=1)) == 0
+    assert await expire_uploads(mongo_db.assets, storage, datetime.utcnow() + timedelta(seconds=1)) == 1
+
+    assert await mongo_db.assets.find_one({"id": abandoned["id"]}) is None
+    assert (await api_client.get(f"/api/assets/{done['id']}")).content == CONTENT
+    if isinstance(storage, GridFSAssetStorage):
+        assert await mongo_db["asset_content.chunks"].count_documents({"files_id": abandoned["id"]}) == 0
+    else:
+        assert not any(path.name.startswith(abandoned["id"]) for path in storage.root.rglob("*"))
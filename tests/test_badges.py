@@ -0,0 +1,16 @@
+from server import Quiz, grade_quiz
+
+QUIZ = Quiz(questions=[{"question": f"q{i}", "options": ["a", "b", "c"], "correct": i % 3} for i in range(4)])
+
+
+def test_all_correct_scores_100():
+    assert grade_quiz(QUIZ, [0, 1, 2, 0]) == 100
+
+
+def test_partial_and_missing_answers():
+    assert grade_quiz(QUIZ, [0, 1, None]) == 50
+    assert grade_quiz(QUIZ, []) == 0
+
+
+def test_extra_answers_are_ignored():
+    assert grade_quiz(QUIZ, [0, 1, 2, 0, 1, 1]) == 100
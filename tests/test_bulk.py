@@ -0,0 +1,77 @@
+import json
+
+import pytest
+
+from bulk import import_ndjson, ndjson_lines
+
+pytestmark = pytest.mark.anyio
+
+
+async def chunked(data, size):
+    for i in range(0, len(data), size):
+        yield data[i:i + size]
+
+
+def build(record):
+    if "title" not in record:
+        raise ValueError("title is required")
+    return {"id": record["title"].lower(), **record}
+
+
+async def test_lines_survive_arbitrary_chunk_boundaries():
+    data = b'{"a": 1}\n\n{"b": 2}\n{"c": 3}'
+    lines = [item async for item in ndjson_lines(chunked(data, 3))]
+    assert lines == [(1, b'{"a": 1}'), (3, b'{"b": 2}'), (4, b'{"c": 3}')]
+
+
+def batch_ids(collection):
+    return [[doc["id"] for doc in batch] for batch in collection.batches]
+
+
+async def test_invalid_records_are_reported_per_line_and_valid_ones_batched(recording_collection):
+    records = [{"title": "A"}, {"name": "no title"}, {"title": "B"}, {"title": "C"}]
+    data = "\n".join(json.dumps(r) for r in records).encode() + b"\nnot json\n"
+    collection = recording_collection()
+
+    results = await import_ndjson(collection, chunked(data, 7), build, batch_size=2)
+
+    assert batch_ids(collection) == [["a", "b"], ["c"]]
+    assert [(r["line"], r["status"]) for r in results] == [
+        (1, "created"), (2, "error"), (3, "created"), (4, "created"), (5, "error"),
+    ]
+    assert results[1]["error"] == "title is required"
+
+
+async def test_batch_check_rejects_documents_before_insert(recording_collection):
+    records = [{"title": t} for t in ("A", "Bad", "C")]
+    data = "\n".join(json.dumps(r) for r in records).encode()
+    collection = recording_collection()
+
+    async def check(docs):
+        return ["refused" if doc["id"] == "bad" else None for doc in docs]
+
+    results = await import_ndjson(collection, chunked(data, 64), build, batch_size=10, check=check)
+
+    assert batch_ids(collection) == [["a", "c"]]
+    assert [(r["status"], r.get("id"), r.get("error")) for r in results] == [
+        ("created", "a", None), ("error", None, "refused"), ("created", "c", None),
+    ]
+
+
+async def test_import_and_export_round_trip(
+    mongo_db, api_client, auth_headers, make_user, make_course, course_payload
+):
+    user = await make_user("g-importer")
+    course = course_payload(make_course(user.id, title="Imported"))
+    body = "\n".join(json.dumps({**course, "title": f"Imported {i}"}) for i in range(25)) + "\n{}\n"
+    headers = {**auth_headers(user.google_id), "Content-Type": "application/x-ndjson"}
+
+    response = await api_client.post("/api/courses/import", content=body, headers=headers)
+    assert response.status_code == 200
+    summary = response.json()
+    assert (summary["created"], summary["failed"]) == (25, 1)
+
+    response = await api_client.get("/api/courses/export", headers=auth_headers(user.google_id))
+    exported = [json.loads(line) for line in response.text.splitlines()]
+    assert len(exported) == 25
+    assert {c["created_by"] for c in exported} == {user.id}
@@ -0,0 +1,65 @@
+from datetime import datetime
+
+import pytest
+
+from catalog import catalog_counts_pipeline, catalog_match, catalog_page
+
+pytestmark = pytest.mark.anyio
+
+SORT = ("created_at", "id")
+
+
+def course(id, category, level, tags, published=True, title="Course"):
+    return {
+        "id": id, "title": title, "description": "", "category": category, "level": level,
+        "tags": tags, "published": published, "created_at": datetime(2024, 1, int(id[1:])),
+    }
+
+
+def test_match_combines_filters():
+    assert catalog_match(category="crashcourses", level="Beginner", tags=["React"], search="hooks") == {
+        "published": True,
+        "category": "crashcourses",
+        "level": "Beginner",
+        "tags": {"$all": ["React"]},
+        "$text": {"$search": "hooks"},
+    }
+
+
+def test_match_without_filters_only_lists_published():
+    assert catalog_match() == {"published": True}
+
+
+async def test_page_and_counts_cover_the_published_catalog(mongo_db):
+    await mongo_db.courses.insert_many([
+        course("c1", "masterclasses", "Advanced", ["React", "Hooks"]),
+        course("c2", "masterclasses", "Beginner", ["React"]),
+        course("c3", "crashcourses", "Beginner", ["Python"]),
+        course("c4", "crashcourses", "Beginner", ["Python"], published=False),
+    ])
+
+    page = await catalog_page(mongo_db.courses, catalog_match(), SORT, None, 2).to_list(None)
+    result = (await mongo_db.courses.aggregate(catalog_counts_pipeline(catalog_match())).to_list(1))[0]
+
+    assert [c["id"] for c in page] == ["c1", "c2", "c3"]
+    assert result["total"] == [{"count": 3}]
+    assert {b["_id"]: b["count"] for b in result["category"]} == {"masterclasses": 2, "crashcourses": 1}
+    assert {b["_id"]: b["count"] for b in result["level"]} == {"Beginner": 2, "Advanced": 1}
+    assert {b["_id"]: b["count"] for b in result["tags"]} == {"React": 2, "Hooks": 1, "Python": 1}
+
+
+async def test_summary_projection_drops_sessions_and_quiz(mongo_db):
+    from server import COURSE_SUMMARY_PROJECTION, CourseSummary
+
+    doc = course("c1", "masterclasses", "Advanced", ["React"])
+    doc.update(
+        duration="1h", instructor="Ada", created_by="u-1",
+        sessions=[{"id": 1, "title": "Intro", "duration": "5m", "description": ""}] * 3,
+        quiz={"questions": [{"question": "?", "options": ["a", "b"], "correct": 1}] * 2},
+    )
+    await mongo_db.courses.insert_one(doc)
+
+    summary = await mongo_db.courses.find_one({"id": "c1"}, COURSE_SUMMARY_PROJECTION)
+    assert "sessions" not in summary and "quiz" not in summary
+    assert CourseSummary(**summary).session_count == 3
+    assert CourseSummary(**summary).question_count == 2
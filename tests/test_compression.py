@@ -0,0 +1,129 @@
+import gzip
+import json
+
+import httpx
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Route
+
+from compression import CompressionMiddleware, negotiate
+from metrics import COMPRESSION_BYTES
+
+pytestmark = pytest.mark.anyio
+
+PAYLOAD = [{"title": f"Course {i}", "description": "Lots of repeated text " * 5} for i in range(50)]
+
+
+async def large(request):
+    if request.headers.get("if-none-match", "").removeprefix("W/") == '"v1"':
+        return Response(status_code=304, headers={"ETag": '"v1"'})
+    return JSONResponse(PAYLOAD, headers={"ETag": '"v1"'})
+
+
+async def small(request):
+    return JSONResponse({"ok": True})
+
+
+async def stream(request):
+    async def lines():
+        for item in PAYLOAD:
+            yield json.dumps(item) + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+async def image(request):
+    return Response(b"\x89PNG" + b"\x00" * 4096, media_type="image/png")
+
+
+app = CompressionMiddleware(
+    Starlette(routes=[Route(path, fn) for path, fn in [("/large", large), ("/small", small), ("/stream", stream), ("/image", image)]]),
+    minimum_size=500,
+)
+
+
+@pytest.fixture
+async def client():
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+
+
+async def raw_get(client, path, accept_encoding):
+    # httpx would decode transparently; stream the raw bytes to see what went over the wire
+    async with client.stream("GET", path, headers={"Accept-Encoding": accept_encoding}) as response:
+        return response, b"".join([chunk async for chunk in response.aiter_raw()])
+
+
+@pytest.mark.parametrize("header,expected", [
+    ("gzip", "gzip"),
+    ("gzip;q=0.5, br", "br"),
+    ("br;q=0.2, gzip;q=0.8", "gzip"),
+    ("*", "br"),
+    ("identity", None),
+    ("gzip;q=0", None),
+    ("", None),
+])
+def test_negotiate(header, expected):
+    assert negotiate(header, ("br", "gzip")) == expected
+
+
+async def test_large_json_is_gzipped_with_weak_etag(client):
+    before = COMPRESSION_BYTES.value("gzip", "in")
+    response, body = await raw_get(client, "/large", "gzip")
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["etag"] == 'W/"v1"'
+    assert "Accept-Encoding" in response.headers["vary"]
+    assert int(response.headers["content-length"]) == len(body)
+    assert json.loads(gzip.decompress(body)) == PAYLOAD
+    assert len(body) < len(json.dumps(PAYLOAD)) / 5
+    assert COMPRESSION_BYTES.value("gzip", "in") > before
+
+
+@pytest.mark.parametrize("accept_encoding,etag,vary", [("gzip", 'W/"v1"', "Accept-Encoding"), ("identity", '"v1"', None)])
+async def test_not_modified_carries_the_headers_of_the_negotiated_response(client, accept_encoding, etag, vary):
+    response = await client.get("/large", headers={"Accept-Encoding": accept_encoding, "If-None-Match": 'W/"v1"'})
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
+    assert response.headers.get("vary") == vary
+    assert "content-encoding" not in response.headers
+
+
+@pytest.mark.parametrize("path", ["/small", "/image"])
+async def test_small_or_binary_bodies_are_left_alone(client, path):
+    response, _ = await raw_get(client, path, "gzip, br")
+    assert "content-encoding" not in response.headers
+
+
+async def test_streamed_ndjson_is_compressed_chunk_by_chunk(client):
+    response, body = await raw_get(client, "/stream", "gzip")
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert "content-length" not in response.headers
+    lines = gzip.decompress(body).decode().splitlines()
+    assert [json.loads(line) for line in lines] == PAYLOAD
+
+
+async def test_brotli_when_available(client):
+    brotli = pytest.importorskip("brotli")
+    response, body = await raw_get(client, "/large", "br")
+
+    assert response.headers["content-encoding"] == "br"
+    assert json.loads(brotli.decompress(body)) == PAYLOAD
+
+
+async def test_zerocopy_file_responses_pass_through():
+    async def sendfile_app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"text/plain")]})
+        await send({"type": "http.response.zerocopy", "file": None, "offset": 0, "count": 10})
+
+    messages = []
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {"type": "http", "method": "GET", "headers": [(b"accept-encoding", b"gzip")]}
+    await CompressionMiddleware(sendfile_app, minimum_size=0)(scope, None, send)
+    assert [m["type"] for m in messages] == ["http.response.start", "http.response.zerocopy"]
+    assert (b"content-encoding", b"gzip") not in messages[0]["headers"]
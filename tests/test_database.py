@@ -0,0 +1,61 @@
+import pytest
+
+from database import DatabaseSettings, PoolMetrics
+
+ENV = {"MONGO_URL": "mongodb://db:27017", "DB_NAME": "app"}
+
+
+def test_settings_default_to_driver_behaviour():
+    settings = DatabaseSettings.from_env(ENV)
+    assert settings.client_options() == {
+        "maxPoolSize": 100,
+        "minPoolSize": 0,
+        "waitQueueTimeoutMS": None,
+        "serverSelectionTimeoutMS": 30000,
+    }
+    assert settings.warm_connections == 1
+
+
+def test_settings_from_env():
+    settings = DatabaseSettings.from_env({
+        **ENV,
+        "MONGO_MAX_POOL_SIZE": "200",
+        "MONGO_MIN_POOL_SIZE": "20",
+        "MONGO_WAIT_QUEUE_TIMEOUT_MS": "250",
+        "MONGO_COMPRESSORS": "zstd,snappy",
+        "MONGO_LIST_READ_PREFERENCE": "secondaryPreferred",
+    })
+    options = settings.client_options()
+    assert options["maxPoolSize"] == 200
+    assert options["minPoolSize"] == 20
+    assert options["waitQueueTimeoutMS"] == 250
+    assert options["compressors"] == "zstd,snappy"
+    assert settings.warm_connections == 20
+
+
+def test_unknown_read_preference_is_rejected():
+    with pytest.raises(ValueError):
+        DatabaseSettings.from_env({**ENV, "MONGO_LIST_READ_PREFERENCE": "fastest"})
+
+
+def test_pool_metrics_track_wait_time_and_in_use(clock):
+    metrics = PoolMetrics(clock=clock)
+
+    metrics.connection_created(None)
+    metrics.connection_check_out_started(None)
+    clock.now = 0.25
+    metrics.connection_checked_out(None)
+    metrics.connection_check_out_started(None)
+    clock.now = 0.5
+    metrics.connection_check_out_failed(None)
+
+    snapshot = metrics.snapshot()
+    assert snapshot["open_connections"] == 1
+    assert snapshot["in_use"] == 1
+    assert snapshot["waiting"] == 0
+    assert snapshot["checkouts"] == 1
+    assert snapshot["checkout_failures"] == 1
+    assert snapshot["checkout_wait_seconds_max"] == 0.25
+
+    metrics.connection_checked_in(None)
+    assert metrics.snapshot()["in_use"] == 0
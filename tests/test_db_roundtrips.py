@@ -0,0 +1,57 @@
+import pytest
+
+from server import new_badge
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def owner(make_user):
+    return await make_user("g-owner")
+
+
+async def test_each_mutation_is_one_round_trip(
+    mongo_db, command_log, api_client, auth_headers, owner, make_course, course_payload
+):
+    course = make_course(owner.id, title="Async Python", tags=["Python"])
+    doomed = make_course(owner.id)
+    badge = new_badge(owner.id, 101, "", "masterclasses", 90)
+    await mongo_db.courses.insert_many([course.dict(), doomed.dict()])
+    await mongo_db.badges.insert_one(badge.dict())
+    headers = auth_headers(owner.google_id)
+
+    # Warm the user cache so only the handler's own commands are counted
+    assert (await api_client.get("/api/auth/me", headers=headers)).status_code == 200
+
+    # Publishing and deleting also adjust the owner's user_stats counters
+    requests = [
+        ("PUT", f"/api/courses/{course.id}", {"json": course_payload(course, title="Renamed")}, ["findAndModify"]),
+        ("PUT", f"/api/courses/{course.id}/publish", {}, ["findAndModify", "update"]),
+        ("PUT", f"/api/courses/{course.id}/publish", {}, ["findAndModify"]),
+        ("DELETE", f"/api/courses/{doomed.id}", {}, ["findAndModify", "update"]),
+        ("PUT", f"/api/badges/{badge.id}", {"params": {"course_title": "Async Python"}}, ["findAndModify"]),
+        ("PUT", "/api/auth/profile", {"json": {"about_me": "Hi"}}, ["findAndModify"]),
+    ]
+    for method, path, kwargs, expected in requests:
+        command_log.clear()
+        response = await api_client.request(method, path, headers=headers, **kwargs)
+        assert response.status_code == 200, (method, path, response.text)
+        assert command_log.names == expected, (method, path)
+
+
+async def test_ownership_is_enforced_in_the_write(
+    mongo_db, command_log, api_client, auth_headers, owner, make_user, make_course
+):
+    other = await make_user("g-other", name="Other")
+    course = make_course(owner.id)
+    await mongo_db.courses.insert_one(course.dict())
+    headers = auth_headers(other.google_id)
+    await api_client.get("/api/auth/me", headers=headers)
+
+    for method, path in [("PUT", f"/api/courses/{course.id}/publish"), ("DELETE", f"/api/courses/{course.id}")]:
+        command_log.clear()
+        response = await api_client.request(method, path, headers=headers)
+        assert response.status_code == 404
+        assert command_log.names == ["findAndModify"]
+
+    assert (await mongo_db.courses.find_one({"id": course.id}))["published"] is False
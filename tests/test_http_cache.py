@@ -0,0 +1,101 @@
+import pytest
+from starlette.requests import Request
+from starlette.responses import Response
+
+from http_cache import conditional, document_etag, list_etag
+
+pytestmark = pytest.mark.anyio
+
+
+def request_with(if_none_match=None):
+    headers = [(b"if-none-match", if_none_match.encode())] if if_none_match else []
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": headers, "query_string": b""})
+
+
+def test_etag_changes_with_version_and_variant():
+    doc = {"id": "c-1", "version": 3}
+    assert document_etag(doc, "full") == document_etag(dict(doc), "full")
+    assert document_etag(doc, "full") != document_etag({**doc, "version": 4}, "full")
+    assert document_etag(doc, "full") != document_etag(doc, "summary")
+
+
+def test_list_etag_changes_when_a_document_is_added_or_bumped():
+    docs = [{"id": "a", "version": 0}, {"id": "b", "version": 1}]
+    assert list_etag(docs) != list_etag(docs + [{"id": "c"}])
+    assert list_etag(docs) != list_etag([docs[0], {"id": "b", "version": 2}])
+
+
+@pytest.mark.parametrize("header", ['"x", "{etag}"', 'W/"{etag}"', "*"])
+def test_matching_if_none_match_returns_304(header):
+    etag = document_etag({"id": "c-1"})
+    response = Response()
+    response.headers["X-Next-Cursor"] = "abc"
+
+    result = conditional(request_with(header.format(etag=etag.strip('"'))), response, etag, "public, max-age=60")
+
+    assert result.status_code == 304
+    assert result.body == b""
+    assert result.headers["etag"] == etag
+    assert result.headers["cache-control"] == "public, max-age=60"
+    assert result.headers["x-next-cursor"] == "abc"
+
+
+def test_weak_etag_matches_either_form():
+    etag = document_etag({"id": "c-1"}, weak=True)
+    assert etag.startswith('W/"')
+    for header in (etag, etag.removeprefix("W/")):
+        assert conditional(request_with(header), Response(), etag, "public, no-cache").status_code == 304
+
+
+def test_stale_or_missing_validator_falls_through():
+    etag = document_etag({"id": "c-1"})
+    for request in (request_with(), request_with('"stale"')):
+        response = Response()
+        assert conditional(request, response, etag, "public") is None
+        assert response.headers["etag"] == etag
+
+
+async def test_course_read_revalidates_until_updated(
+    mongo_db, api_client, auth_headers, make_user, make_course, course_payload
+):
+    owner = await make_user("g-etag")
+    course = make_course(owner.id, title="Cached", published=True)
+    await mongo_db.courses.insert_one(course.dict())
+
+    # Summaries aren't counted as views, so they revalidate until the course changes
+    summary = f"/api/courses/{course.id}?view=summary"
+    first = await api_client.get(summary)
+    etag = first.headers["etag"]
+    assert first.headers["cache-control"].startswith("public, max-age")
+
+    again = await api_client.get(summary, headers={"If-None-Match": etag})
+    assert again.status_code == 304 and again.content == b""
+
+    changes = course_payload(course, title="Changed")
+    await api_client.put(f"/api/courses/{course.id}", json=changes, headers=auth_headers(owner.google_id))
+    changed = await api_client.get(summary, headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+
+    listing = await api_client.get(f"/api/courses/created/{owner.id}")
+    cached = await api_client.get(f"/api/courses/created/{owner.id}", headers={"If-None-Match": listing.headers["etag"]})
+    assert cached.status_code == 304
+
+
+async def test_counted_course_reads_revalidate_and_are_still_counted(mongo_db, api_client, monkeypatch, make_course):
+    import server
+    from server import ViewCounter
+
+    monkeypatch.setattr(server, "view_counter", ViewCounter())
+    course = make_course("u-views", title="Counted", published=True)
+    await mongo_db.courses.insert_one(course.dict())
+
+    first = await api_client.get(f"/api/courses/{course.id}")
+    assert first.headers["cache-control"] == "public, no-cache"
+    second = await api_client.get(f"/api/courses/{course.id}", headers={"If-None-Match": first.headers["etag"]})
+
+    # The revalidation reached the origin, so it counts, but the view count alone doesn't change the body
+    assert first.headers["etag"].startswith("W/")
+    assert second.status_code == 304 and second.headers["etag"] == first.headers["etag"]
+    assert first.json()["views"] == 1
+    assert server.view_counter.pending(course.id) == 2
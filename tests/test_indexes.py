@@ -0,0 +1,121 @@
+from datetime import datetime
+
+import pytest
+from pymongo import ASCENDING, IndexModel
+
+from catalog import catalog_counts_pipeline, catalog_match, catalog_page
+from indexes import INDEXES, ensure_indexes, index_report
+from pagination import encode_cursor, sort_spec
+from server import BADGE_SORT, COURSE_SORT, STATUS_SORT
+
+pytestmark = pytest.mark.anyio
+
+
+def plan_stages(plan):
+    """Collect every "stage" value from a (possibly nested) explain plan."""
+    stages = []
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            stages.append(plan["stage"])
+        for value in plan.values():
+            stages.extend(plan_stages(value))
+    elif isinstance(plan, list):
+        for value in plan:
+            stages.extend(plan_stages(value))
+    return stages
+
+
+# The filter (and keyset sort, for list endpoints) each endpoint sends to MongoDB
+ENDPOINT_QUERIES = [
+    ("get_current_user", "users", {"google_id": "g-1"}, None),
+    ("create_badge", "badges", {"user_id": "u-1", "course_id": 1, "course_category": "masterclasses"}, None),
+    ("get_my_badges", "badges", {"user_id": "u-1"}, BADGE_SORT),
+    ("update_badge_course_title", "badges", {"id": "b-1"}, None),
+    ("get_user_created_courses", "courses", {"created_by": "u-1"}, COURSE_SORT),
+    ("get_courses_by_user", "courses", {"created_by": "u-1", "published": True}, COURSE_SORT),
+    ("get_course", "courses", {"id": "c-1"}, None),
+    ("update_course", "courses", {"id": "c-1", "created_by": "u-1"}, None),
+    ("get_status_checks", "status_checks", {}, STATUS_SORT),
+    ("get_top_learners (window)", "badges", {"earned_at": {"$gte": datetime(2024, 1, 1)}}, None),
+    ("get_top_learners (category)", "badges", {"course_category": "masterclasses"}, None),
+    ("badge_added (learner)", "badges", {"earned_at": {"$gte": datetime(2024, 1, 1)}, "user_id": "u-1"}, None),
+    ("badge_added (course)", "badges", {"course_category": "masterclasses", "course_id": 1}, None),
+    ("get_latest_status_checks", "status_checks", {"client_name": "probe"}, STATUS_SORT),
+    ("get_status_rollup", "status_rollups", {"bucket": {"$gte": datetime(2024, 1, 1)}}, ("bucket",)),
+    ("get_user_stats", "user_stats", {"user_id": "u-1"}, None),
+    ("get_user_stats (first read)", "users", {"id": "u-1"}, None),
+    ("get_progress", "progress", {"user_id": "u-1", "course_category": "masterclasses", "course_id": "1"}, None),
+    ("upload_asset_chunk", "assets", {"id": "a-1", "owner_id": "u-1"}, None),
+    ("delete_asset", "courses", {"sessions.asset_id": "a-1"}, None),
+    ("expire_uploads", "assets", {"status": "uploading", "created_at": {"$lt": datetime(2024, 1, 1)}}, None),
+    ("get_asset_content (gridfs)", "asset_content.chunks", {"files_id": "a-1", "n": {"$gte": 0, "$lte": 3}}, ("n",)),
+]
+
+
+async def test_ensure_indexes_is_idempotent(mongo_db):
+    first = await ensure_indexes(mongo_db)
+    assert first.created == {c: [m.document["name"] for m in models] for c, models in INDEXES.items()}
+    assert not first.failed
+
+    second = await ensure_indexes(mongo_db)
+    assert second.created == {}
+    assert second.missing == {}
+
+
+async def test_report_lists_extra_indexes(mongo_db):
+    await ensure_indexes(mongo_db)
+    await mongo_db.users.create_indexes([IndexModel([("email", ASCENDING)], name="email_adhoc")])
+
+    report = await index_report(mongo_db)
+    assert report.extra == {"users": ["email_adhoc"]}
+    assert report.missing == {}
+
+
+async def test_changed_ttl_is_reported_and_applied(mongo_db):
+    declared = {"status_checks": [IndexModel([("timestamp", ASCENDING)], name="timestamp_ttl", expireAfterSeconds=60)]}
+    await ensure_indexes(mongo_db, declared)
+    changed = {"status_checks": [IndexModel([("timestamp", ASCENDING)], name="timestamp_ttl", expireAfterSeconds=120)]}
+
+    assert (await index_report(mongo_db, changed)).drifted == {"status_checks": ["timestamp_ttl"]}
+    report = await ensure_indexes(mongo_db, changed)
+    assert report.modified == {"status_checks": ["timestamp_ttl"]}
+    info = await mongo_db.status_checks.index_information()
+    assert info["timestamp_ttl"]["expireAfterSeconds"] == 120
+    assert (await index_report(mongo_db, changed)).drifted == {}
+
+
+@pytest.mark.parametrize("endpoint,collection,query,sort", ENDPOINT_QUERIES, ids=[q[0] for q in ENDPOINT_QUERIES])
+async def test_endpoint_queries_use_an_index(mongo_db, endpoint, collection, query, sort):
+    await ensure_indexes(mongo_db)
+
+    cursor = mongo_db[collection].find(query)
+    if sort:
+        cursor = cursor.sort(sort_spec(sort))
+    explain = await cursor.explain()
+    stages = plan_stages(explain["queryPlanner"]["winningPlan"])
+    assert "IXSCAN" in stages
+    assert "COLLSCAN" not in stages
+    # Keyset pages must come off the index in order, not from an in-memory sort
+    assert "SORT" not in stages
+
+
+async def test_catalog_page_is_read_off_the_index(mongo_db):
+    await ensure_indexes(mongo_db)
+    after = encode_cursor({"created_at": datetime(2024, 1, 1), "id": "c-1"}, COURSE_SORT)
+
+    explain = await catalog_page(mongo_db.courses, catalog_match(level="Beginner"), COURSE_SORT, after, 20).explain()
+    stages = plan_stages(explain["queryPlanner"]["winningPlan"])
+    assert "IXSCAN" in stages
+    assert "COLLSCAN" not in stages
+    assert "SORT" not in stages
+
+
+async def test_catalog_counts_match_off_the_index(mongo_db):
+    await ensure_indexes(mongo_db)
+
+    explain = await mongo_db.command(
+        "aggregate", "courses", pipeline=catalog_counts_pipeline(catalog_match(level="Beginner")), explain=True
+    )
+    stages = plan_stages(explain)
+    assert "IXSCAN" in stages
+    assert "COLLSCAN" not in stages
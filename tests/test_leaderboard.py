@@ -0,0 +1,128 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from leaderboard import TOP_N, Leaderboards, badge_match
+from server import new_badge
+
+pytestmark = pytest.mark.anyio
+
+
+class FakeBadges:
+    """Stands in for db.badges, returning canned rows and counting aggregations."""
+
+    def __init__(self, rows, count=0):
+        self.rows = rows
+        self.calls = 0
+        self.count = count
+        self.counted = []
+
+    async def count_documents(self, match):
+        self.counted.append(match)
+        return self.count
+
+    def aggregate(self, pipeline):
+        self.calls += 1
+        rows = [dict(row) for row in self.rows]
+
+        class Cursor:
+            async def to_list(self, length):
+                return rows
+
+        return Cursor()
+
+
+def test_match_uses_category_and_window():
+    now = datetime(2024, 6, 1)
+    assert badge_match(None, "all", now) == {}
+    assert badge_match("masterclasses", "7d", now) == {
+        "course_category": "masterclasses",
+        "earned_at": {"$gte": datetime(2024, 5, 25)},
+    }
+
+
+async def test_badge_for_a_ranked_learner_updates_the_cached_ranking_in_place():
+    badges = FakeBadges([
+        {"user_id": "a", "badges": 3, "average_score": 90.0},
+        {"user_id": "b", "badges": 3, "average_score": 80.0},
+    ])
+    boards = Leaderboards()
+    await boards.ranking(badges, "learners", None, "all", 10)
+
+    await boards.badge_added(badges, {"user_id": "b", "course_id": 1, "course_category": "crashcourses", "quiz_score": 100})
+    rows = await boards.ranking(badges, "learners", None, "all", 10)
+
+    assert badges.calls == 1
+    assert [(r["user_id"], r["badges"], r["average_score"]) for r in rows] == [("b", 4, 85.0), ("a", 3, 90.0)]
+
+
+async def test_in_place_re_sort_breaks_ties_by_id_like_the_pipeline():
+    learners = FakeBadges([
+        {"user_id": "a", "badges": 4, "average_score": 85.0},
+        {"user_id": "c", "badges": 4, "average_score": 85.0},
+        {"user_id": "b", "badges": 3, "average_score": 80.0},
+    ])
+    courses = FakeBadges([
+        {"course_id": "x", "course_category": "masterclasses", "completions": 2, "average_score": 90.0},
+        {"course_id": 1, "course_category": "masterclasses", "completions": 1, "average_score": 80.0},
+    ])
+    boards = Leaderboards()
+    await boards.ranking(learners, "learners", None, "all", 10)
+    await boards.ranking(courses, "courses", None, "all", 10)
+
+    badge = {"user_id": "b", "course_id": 1, "course_category": "masterclasses", "quiz_score": 100}
+    await boards.badge_added(learners, badge)
+
+    assert [r["user_id"] for r in await boards.ranking(learners, "learners", None, "all", 10)] == ["a", "b", "c"]
+    # Numbers sort before strings, as in MongoDB
+    assert [r["course_id"] for r in await boards.ranking(courses, "courses", None, "all", 10)] == [1, "x"]
+
+
+async def test_badge_for_an_unranked_learner_drops_the_ranking():
+    badges = FakeBadges([{"user_id": "a", "badges": 3, "average_score": 90.0}])
+    boards = Leaderboards()
+    await boards.ranking(badges, "learners", None, "all", 10)
+    await boards.ranking(badges, "learners", "careerpaths", "all", 10)
+
+    await boards.badge_added(badges, {"user_id": "z", "course_id": 1, "course_category": "crashcourses", "quiz_score": 70})
+    await boards.ranking(badges, "learners", None, "all", 10)
+    await boards.ranking(badges, "learners", "careerpaths", "all", 10)
+
+    assert badges.calls == 3  # only the overall ranking was rebuilt
+
+
+@pytest.mark.parametrize("count,rebuilt", [(2, False), (3, True)])
+async def test_badge_for_an_unranked_learner_only_drops_a_full_ranking_it_can_enter(count, rebuilt):
+    # Full, with the cutoff row at 3 badges
+    rows = [{"user_id": f"u-{i:03}", "badges": 3, "average_score": 90.0} for i in range(TOP_N)]
+    badges = FakeBadges(rows, count=count)
+    boards = Leaderboards()
+    await boards.ranking(badges, "learners", None, "all", 10)
+
+    await boards.badge_added(badges, {"user_id": "z", "course_id": 1, "course_category": "crashcourses", "quiz_score": 70})
+    await boards.ranking(badges, "learners", None, "all", 10)
+
+    assert badges.counted == [{"user_id": "z"}]
+    assert badges.calls == (2 if rebuilt else 1)
+
+
+async def test_rankings_come_from_badges(mongo_db, api_client, make_user):
+    ada = await make_user("g-ada", name="Ada")
+    bob = await make_user("g-bob", name="Bob")
+    old = new_badge(bob.id, 3, "Old", "crashcourses", 100)
+    old.earned_at = datetime.utcnow() - timedelta(days=60)
+    await mongo_db.badges.insert_many([
+        new_badge(ada.id, 1, "Python", "masterclasses", 90).dict(),
+        new_badge(ada.id, 2, "Go", "crashcourses", 70).dict(),
+        new_badge(bob.id, 1, "Python", "masterclasses", 60).dict(),
+        old.dict(),
+    ])
+
+    learners = (await api_client.get("/api/leaderboard/learners", params={"window": "30d"})).json()
+    assert [(r["name"], r["badges"]) for r in learners] == [("Ada", 2), ("Bob", 1)]
+
+    courses = (await api_client.get("/api/leaderboard/courses", params={"category": "masterclasses"})).json()
+    assert courses == [{
+        "course_id": 1, "course_category": "masterclasses", "course_title": "Python",
+        "completions": 2, "average_score": 75.0,
+    }]
@@ -0,0 +1,54 @@
+import httpx
+import pytest
+from fastapi import FastAPI
+
+import metrics
+from metrics import Histogram, MetricsMiddleware, Registry, span
+
+pytestmark = pytest.mark.anyio
+
+
+def test_histogram_renders_cumulative_buckets():
+    histogram = Histogram("latency_seconds", "Latency", ("route",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(value, "/a")
+
+    assert histogram.render() == [
+        "# HELP latency_seconds Latency",
+        "# TYPE latency_seconds histogram",
+        'latency_seconds_bucket{route="/a",le="0.1"} 2',
+        'latency_seconds_bucket{route="/a",le="1"} 3',
+        'latency_seconds_bucket{route="/a",le="+Inf"} 4',
+        'latency_seconds_sum{route="/a"} 3.65',
+        'latency_seconds_count{route="/a"} 4',
+    ]
+
+
+def test_label_values_are_escaped():
+    registry = Registry()
+    counter = registry.counter("hits_total", "Hits", ("path",))
+    counter.inc('a"b\\c')
+    assert 'hits_total{path="a\\"b\\\\c"} 1' in registry.render()
+
+
+async def test_middleware_labels_by_route_template_and_times_spans():
+    app = FastAPI()
+
+    @app.get("/items/{item_id}")
+    async def get_item(item_id: str):
+        with span("db"):
+            pass
+        return {"id": item_id}
+
+    app.add_middleware(MetricsMiddleware)
+    before = metrics.HTTP_REQUESTS.value("GET", "/items/{item_id}", "200")
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        for item_id in ("a", "b"):
+            assert (await client.get(f"/items/{item_id}")).status_code == 200
+        assert (await client.get("/nope")).status_code == 404
+
+    assert metrics.HTTP_REQUESTS.value("GET", "/items/{item_id}", "200") == before + 2
+    assert metrics.HTTP_REQUESTS.value("GET", "unmatched", "404") >= 1
+    assert metrics.SPAN_LATENCY.count("/items/{item_id}", "db") >= 2
+    assert metrics.HTTP_IN_FLIGHT.value("GET") == 0
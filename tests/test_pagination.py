@@ -0,0 +1,49 @@
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+from pymongo import ReadPreference
+
+from pagination import PageParams, decode_cursor, encode_cursor, keyset_filter, list_page
+
+SORT = ("earned_at", "id")
+
+
+def test_cursor_round_trips_datetimes_and_strings():
+    doc = {"earned_at": datetime(2024, 5, 1, 12, 30, 15, 123000), "id": "b-1", "quiz_score": 90}
+    assert decode_cursor(encode_cursor(doc, SORT), SORT) == [doc["earned_at"], "b-1"]
+
+
+def test_keyset_filter_resumes_after_cursor():
+    doc = {"earned_at": datetime(2024, 5, 1), "id": "b-1"}
+    query = keyset_filter({"user_id": "u-1"}, SORT, encode_cursor(doc, SORT))
+    assert query == {
+        "$and": [
+            {"user_id": "u-1"},
+            {"$or": [
+                {"earned_at": {"$gt": doc["earned_at"]}},
+                {"earned_at": doc["earned_at"], "id": {"$gt": "b-1"}},
+            ]},
+        ]
+    }
+
+
+def test_no_cursor_leaves_query_untouched():
+    assert keyset_filter({"user_id": "u-1"}, SORT, None) == {"user_id": "u-1"}
+
+
+@pytest.mark.parametrize("cursor", ["not-base64!", "bm90IGpzb24", encode_cursor({"id": "x"}, ("id",))])
+def test_malformed_cursor_is_rejected(cursor):
+    with pytest.raises(HTTPException) as exc:
+        decode_cursor(cursor, SORT)
+    assert exc.value.status_code == 400
+
+
+@pytest.mark.anyio
+async def test_cached_pages_must_read_from_the_primary():
+    secondary = SimpleNamespace(read_preference=ReadPreference.SECONDARY_PREFERRED)
+    with pytest.raises(ValueError):
+        await list_page(
+            secondary, {}, ("id",), dict, PageParams(after=None, limit=None), None, None, cache=object()
+        )
@@ -0,0 +1,150 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from pymongo import UpdateOne
+
+from progress import ProgressBuffer
+
+pytestmark = pytest.mark.anyio
+
+KEY = ("u-1", "masterclasses", "3")
+
+
+@pytest.fixture
+def ticking_clock(clock):
+    clock.now, clock.tick = datetime(2024, 6, 1), timedelta(seconds=1)
+    return clock
+
+
+def test_pings_coalesce_per_course(ticking_clock):
+    buffer = ProgressBuffer(clock=ticking_clock)
+    buffer.record(KEY, [1], current_session=2)
+    buffer.record(KEY, [1, 2], current_session=3)
+    buffer.record(("u-2", "masterclasses", "3"), [1])
+
+    assert buffer.stats()["pending_courses"] == 2
+    assert buffer.stats()["recorded"] == 3
+    progress = buffer.merge(KEY, None)
+    assert progress["completed_sessions"] == [1, 2]
+    assert progress["current_session"] == 3
+
+
+def test_merge_overlays_pending_pings_on_the_stored_document(ticking_clock):
+    buffer = ProgressBuffer(clock=ticking_clock)
+    stored = {"user_id": "u-1", "course_category": "masterclasses", "course_id": "3",
+              "completed_sessions": [1, 4], "current_session": 5, "updated_at": datetime(2024, 1, 1)}
+
+    assert buffer.merge(KEY, stored) == stored
+    buffer.record(KEY, [2])
+    merged = buffer.merge(KEY, stored)
+    assert merged["completed_sessions"] == [1, 2, 4]
+    assert merged["current_session"] == 5  # the ping didn't move the player
+    assert merged["updated_at"] > stored["updated_at"]
+
+
+async def test_flush_is_one_bulk_write_of_upserts(ticking_clock, recording_collection):
+    clock = ticking_clock
+    buffer = ProgressBuffer(clock=clock)
+    buffer.record(KEY, [2, 1], current_session=3)
+    buffer.record(("u-2", "crashcourses", "7"), [])
+    collection = recording_collection()
+
+    assert await buffer.flush(collection) == 2
+    assert collection.requests == [[
+        UpdateOne(
+            {"user_id": "u-1", "course_category": "masterclasses", "course_id": "3"},
+            {"$addToSet": {"completed_sessions": {"$each": [1, 2]}},
+             "$max": {"updated_at": clock.now - timedelta(seconds=1)},
+             "$set": {"current_session": 3}},
+            upsert=True,
+        ),
+        UpdateOne(
+            {"user_id": "u-2", "course_category": "crashcourses", "course_id": "7"},
+            {"$addToSet": {"completed_sessions": {"$each": []}}, "$max": {"updated_at": clock.now}},
+            upsert=True,
+        ),
+    ]]
+    assert await buffer.flush(collection) == 0
+    assert len(collection.requests) == 1
+
+
+async def test_failed_flush_keeps_pings_and_newer_ones_win(ticking_clock, recording_collection):
+    buffer = ProgressBuffer(clock=ticking_clock)
+    buffer.record(KEY, [1], current_session=2)
+
+    with pytest.raises(ConnectionError):
+        await buffer.flush(recording_collection(down=True))
+    buffer.record(KEY, [2], current_session=3)
+
+    assert buffer.stats()["flush_failures"] == 1
+    progress = buffer.merge(KEY, None)
+    assert progress["completed_sessions"] == [1, 2]
+    assert progress["current_session"] == 3
+
+
+async def test_reads_see_pings_while_their_flush_is_in_flight(ticking_clock, recording_collection):
+    buffer = ProgressBuffer(clock=ticking_clock)
+    buffer.record(KEY, [1], current_session=2)
+    release = asyncio.Event()
+
+    class BlockedCollection(recording_collection):
+        async def bulk_write(self, requests, ordered=True):
+            await release.wait()
+            await super().bulk_write(requests, ordered)
+
+    flush = asyncio.create_task(buffer.flush(BlockedCollection()))
+    await asyncio.sleep(0)
+    assert buffer.stats()["pending_courses"] == 0
+    buffer.record(KEY, [3])
+
+    # Neither written nor pending any more, yet still visible, with newer pings on top
+    progress = buffer.merge(KEY, None)
+    assert progress["completed_sessions"] == [1, 3] and progress["current_session"] == 2
+
+    release.set()
+    assert await flush == 1
+    assert buffer.merge(KEY, None)["completed_sessions"] == [3]
+
+
+async def test_full_buffer_flushes_before_the_interval(recording_collection):
+    buffer = ProgressBuffer(max_pending=2)
+    collection = recording_collection()
+    flusher = asyncio.create_task(buffer.run(collection, interval=3600))
+    try:
+        buffer.record(("u-1", "masterclasses", "1"), [1])
+        buffer.record(("u-1", "masterclasses", "2"), [1])
+        for _ in range(100):
+            if collection.requests:
+                break
+            await asyncio.sleep(0)
+    finally:
+        flusher.cancel()
+    assert len(collection.requests[0]) == 2
+
+
+async def test_progress_round_trip(api_client, mongo_db, auth_headers, make_user):
+    import server
+
+    user = await make_user("progress-user")
+    headers = auth_headers(user.google_id)
+    url = "/api/progress/masterclasses/3"
+
+    recorded = await api_client.post(url, json={"completed_sessions": [1], "current_session": 2}, headers=headers)
+    assert recorded.status_code == 202
+    assert await mongo_db.progress.count_documents({}) == 0  # written behind
+
+    progress = (await api_client.get(url, headers=headers)).json()
+    assert progress["completed_sessions"] == [1] and progress["current_session"] == 2
+
+    await server.progress_buffer.flush(mongo_db.progress)
+    await api_client.post(url, json={"completed_sessions": [2], "current_session": 3}, headers=headers)
+    progress = (await api_client.get(url, headers=headers)).json()
+    assert progress["completed_sessions"] == [1, 2] and progress["current_session"] == 3
+
+    await server.progress_buffer.flush(mongo_db.progress)
+    stored = await mongo_db.progress.find_one({"user_id": user.id}, {"_id": 0})
+    assert sorted(stored["completed_sessions"]) == [1, 2] and stored["current_session"] == 3
+
+    other = (await api_client.get("/api/progress/masterclasses/4", headers=headers)).json()
+    assert other["completed_sessions"] == [] and other["updated_at"] is None
@@ -0,0 +1,123 @@
+import asyncio
+
+import httpx
+import pytest
+from fastapi import Depends, FastAPI, Header, HTTPException
+
+from metrics import RATE_LIMITED
+from rate_limit import MemoryRateLimitBackend, RateLimiter, RouteLimit, parse_limits
+
+pytestmark = pytest.mark.anyio
+
+
+def client_key(x_client: str = Header("anonymous")) -> str:
+    return x_client
+
+
+def build_app(limiter, release=None):
+    app = FastAPI()
+
+    @app.post("/write", dependencies=[Depends(limiter.limit("write", client_key))])
+    async def write():
+        if release is not None:
+            await release.wait()
+        return {"ok": True}
+
+    return app
+
+
+async def test_bucket_allows_burst_then_refills_at_rate(clock):
+    backend = MemoryRateLimitBackend(clock=clock)
+
+    assert [await backend.take("k", rate=2, burst=3) for _ in range(3)] == [0, 0, 0]
+    assert await backend.take("k", rate=2, burst=3) == pytest.approx(0.5)
+
+    clock.now += 0.5
+    assert await backend.take("k", rate=2, burst=3) == 0
+    assert await backend.take("other", rate=2, burst=3) == 0
+
+
+async def test_idle_bucket_refills_only_up_to_burst(clock):
+    backend = MemoryRateLimitBackend(clock=clock)
+    await backend.take("k", rate=1, burst=2)
+
+    clock.now += 3600
+    assert [await backend.take("k", rate=1, burst=2) for _ in range(2)] == [0, 0]
+    assert await backend.take("k", rate=1, burst=2) == pytest.approx(1)
+
+
+def test_parse_limits():
+    assert parse_limits(" badges.write=5/50/10, auth.read=0.5/2 ,") == {
+        "badges.write": RouteLimit(rate=5, burst=50, concurrency=10),
+        "auth.read": RouteLimit(rate=0.5, burst=2),
+    }
+    assert parse_limits("") == {}
+    with pytest.raises(ValueError):
+        parse_limits("badges.write=5")
+    with pytest.raises(ValueError):
+        parse_limits("badges.write=0/5")
+
+
+async def test_exhausted_budget_is_429_with_retry_after():
+    limiter = RateLimiter(MemoryRateLimitBackend(), {"write": RouteLimit(rate=0.1, burst=2)})
+    before = RATE_LIMITED.value("write", "rate")
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=build_app(limiter)), base_url="http://test") as client:
+        statuses = [(await client.post("/write", headers={"X-Client": "a"})).status_code for _ in range(2)]
+        rejected = await client.post("/write", headers={"X-Client": "a"})
+        other = await client.post("/write", headers={"X-Client": "b"})
+
+    assert statuses == [200, 200]
+    assert rejected.status_code == 429
+    assert rejected.headers["Retry-After"] == "10"
+    assert other.status_code == 200
+    assert RATE_LIMITED.value("write", "rate") == before + 1
+
+
+async def test_concurrency_cap_rejects_instead_of_queueing():
+    limiter = RateLimiter(MemoryRateLimitBackend(), {"write": RouteLimit(rate=100, burst=100, concurrency=2)})
+    release = asyncio.Event()
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=build_app(limiter, release)), base_url="http://test") as client:
+        held = [asyncio.create_task(client.post("/write", headers={"X-Client": str(i)})) for i in range(2)]
+        while limiter.in_flight()["write"] < 2:
+            await asyncio.sleep(0)
+        rejected = await client.post("/write", headers={"X-Client": "late"})
+        release.set()
+        assert [r.status_code for r in await asyncio.gather(*held)] == [200, 200]
+
+    assert rejected.status_code == 429
+    assert rejected.headers["Retry-After"] == "1"
+    assert limiter.in_flight()["write"] == 0
+
+
+async def test_slot_is_released_when_the_handler_fails():
+    limiter = RateLimiter(MemoryRateLimitBackend(), {"write": RouteLimit(rate=100, burst=100, concurrency=1)})
+    app = FastAPI()
+
+    @app.post("/fail", dependencies=[Depends(limiter.limit("write", client_key))])
+    async def fail():
+        raise HTTPException(status_code=400, detail="nope")
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        assert [(await client.post("/fail")).status_code for _ in range(3)] == [400, 400, 400]
+    assert limiter.in_flight()["write"] == 0
+
+
+async def test_disabled_limiter_admits_everything():
+    limiter = RateLimiter(MemoryRateLimitBackend(), {"write": RouteLimit(rate=0.1, burst=1)}, enabled=False)
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=build_app(limiter)), base_url="http://test") as client:
+        assert {(await client.post("/write")).status_code for _ in range(5)} == {200}
+
+
+def test_unknown_route_is_a_configuration_error():
+    with pytest.raises(KeyError):
+        RateLimiter(MemoryRateLimitBackend(), {}).limit("write", client_key)
+
+
+async def test_status_checks_are_limited_per_client_address(api_client, monkeypatch):
+    import server
+
+    monkeypatch.setitem(server.rate_limiter.limits, "status.write", RouteLimit(rate=0.5, burst=2))
+    statuses = [(await api_client.post("/api/status", json={"client_name": "flood"})).status_code for _ in range(3)]
+    assert statuses == [200, 200, 429]
@@ -0,0 +1,110 @@
+import asyncio
+
+import pytest
+
+from response_cache import CachedResponse, MemoryBackend, ResponseCache
+
+pytestmark = pytest.mark.anyio
+
+
+def make_cache():
+    return ResponseCache(MemoryBackend(maxsize=16), ttl=30)
+
+
+async def test_hit_after_first_load():
+    cache = make_cache()
+    loads = []
+
+    async def load():
+        loads.append(1)
+        return CachedResponse(b"[1]", {"ETag": '"a"'})
+
+    first = await cache.get_or_load("/x", ["t"], load)
+    second = await cache.get_or_load("/x", ["t"], load)
+
+    assert len(loads) == 1
+    assert second == first
+    assert cache.stats()["hits"] == 1
+
+
+async def test_invalidate_only_drops_tagged_entries():
+    cache = make_cache()
+    versions = {"a": 0, "b": 0}
+
+    def loader(name):
+        async def load():
+            versions[name] += 1
+            return CachedResponse(str(versions[name]).encode())
+        return load
+
+    await cache.get_or_load("/a", ["user:a"], loader("a"))
+    await cache.get_or_load("/b", ["user:b"], loader("b"))
+    await cache.invalidate("user:a")
+
+    assert (await cache.get_or_load("/a", ["user:a"], loader("a"))).body == b"2"
+    assert (await cache.get_or_load("/b", ["user:b"], loader("b"))).body == b"1"
+
+
+async def test_concurrent_misses_share_one_load():
+    cache = make_cache()
+    release = asyncio.Event()
+    loads = []
+
+    async def load():
+        loads.append(1)
+        await release.wait()
+        return CachedResponse(b"[]")
+
+    waiters = [asyncio.ensure_future(cache.get_or_load("/x", ["t"], load)) for _ in range(5)]
+    await asyncio.sleep(0)
+    release.set()
+    results = await asyncio.gather(*waiters)
+
+    assert len(loads) == 1
+    assert {r.body for r in results} == {b"[]"}
+    assert cache.stats()["coalesced"] == 4
+
+
+async def test_failed_load_reaches_waiters_and_is_not_cached():
+    cache = make_cache()
+    release = asyncio.Event()
+
+    async def failing():
+        await release.wait()
+        raise RuntimeError("db down")
+
+    waiters = [asyncio.ensure_future(cache.get_or_load("/x", [], failing)) for _ in range(3)]
+    await asyncio.sleep(0)
+    release.set()
+    results = await asyncio.gather(*waiters, return_exceptions=True)
+
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+    async def ok():
+        return CachedResponse(b"ok")
+
+    assert (await cache.get_or_load("/x", [], ok)).body == b"ok"
+
+
+async def test_public_badge_list_is_cached_until_a_badge_is_awarded(
+    mongo_db, api_client, auth_headers, command_log, make_user
+):
+    import server
+
+    user = await make_user("g-cache")
+    await mongo_db.badges.insert_one(server.new_badge(user.id, 1, "One", "crashcourses", 90).dict())
+
+    first = await api_client.get(f"/api/badges/user/{user.id}")
+    command_log.clear()
+    second = await api_client.get(f"/api/badges/user/{user.id}")
+    assert second.json() == first.json()
+    assert second.headers["etag"] == first.headers["etag"]
+    assert "find" not in command_log.names
+
+    created = await api_client.post(
+        "/api/badges", json={"course_id": 2, "course_category": "masterclasses", "quiz_score": 80},
+        headers=auth_headers(user.google_id),
+    )
+    assert created.status_code == 200
+    third = await api_client.get(f"/api/badges/user/{user.id}")
+    assert len(third.json()) == 2
@@ -0,0 +1,79 @@
+import collections
+from datetime import datetime
+
+import pytest
+
+from seed import COLLECTIONS, Dataset, insert_batches, read_ndjson, write_ndjson
+from server import Badge, Course, UserProfile
+
+pytestmark = pytest.mark.anyio
+
+NOW = datetime(2024, 6, 1)
+MODELS = {"users": UserProfile, "courses": Course, "badges": Badge}
+
+
+def build(seed=0, users=500, courses=100, **options):
+    dataset = Dataset(users, courses, seed=seed, now=NOW, **options)
+    return {collection: list(dataset.generate(collection)) for collection in COLLECTIONS}
+
+
+def test_same_seed_gives_same_dataset():
+    assert build(seed=3) == build(seed=3)
+    assert build(seed=3)["users"] != build(seed=4)["users"]
+
+
+def test_documents_match_the_server_models():
+    for collection, docs in build().items():
+        for doc in docs:
+            assert MODELS[collection](**doc).model_dump() == doc
+
+
+def test_course_shapes_follow_the_requested_ranges():
+    courses = build(sessions=(2, 3), questions=(7, 7), published_ratio=0.0)["courses"]
+    assert {len(c["sessions"]) for c in courses} <= {2, 3}
+    assert {len(c["quiz"]["questions"]) for c in courses} == {7}
+    assert not any(c["published"] for c in courses)
+
+
+def test_badges_are_unique_per_course_and_only_for_published_courses():
+    data = build(users=2000, courses=200)
+    published = {c["id"] for c in data["courses"] if c["published"]}
+    keys = [(b["user_id"], b["course_id"], b["course_category"]) for b in data["badges"]]
+    assert len(keys) == len(set(keys))
+    assert {b["course_id"] for b in data["badges"]} <= published
+
+
+def test_badges_are_skewed_towards_power_learners():
+    data = build(users=2000, courses=200, mean_badges=5)
+    per_user = sorted(collections.Counter(b["user_id"] for b in data["badges"]).values(), reverse=True)
+    total = sum(per_user)
+    assert 3 * 2000 < total < 8 * 2000
+    assert len(per_user) < 2000 * 0.75  # plenty of users have none
+    assert sum(per_user[:20]) > total * 0.2  # the top 1% hold a fifth of all badges
+
+
+def test_ndjson_round_trip(tmp_path):
+    docs = build()["courses"]
+    path = tmp_path / "courses.ndjson"
+    assert list(write_ndjson(path, docs)) == docs
+    assert list(read_ndjson(path)) == docs
+
+
+async def test_insert_batches_splits_and_counts(recording_collection):
+    collection = recording_collection()
+    inserted = await insert_batches(collection, ({"n": n} for n in range(2500)), batch_size=1000, concurrency=2)
+    assert inserted == 2500
+    assert sorted(len(batch) for batch in collection.batches) == [500, 1000, 1000]
+
+
+async def test_insert_batches_raises_the_first_failed_batch(recording_collection):
+    class FirstBatchFails(recording_collection):
+        async def insert_many(self, docs, ordered=True):
+            self.down = not self.batches
+            await super().insert_many(docs, ordered)
+
+    collection = FirstBatchFails()
+    with pytest.raises(ConnectionError):
+        await insert_batches(collection, ({"n": n} for n in range(10000)), batch_size=1000, concurrency=2)
+    # Nothing new is started once a batch has failed
+    assert len(collection.batches) < 10
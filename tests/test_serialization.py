@@ -0,0 +1,38 @@
+import json
+from datetime import datetime
+
+import pytest
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import Response
+
+import serialization
+from serialization import fast_json, render_json
+
+
+@pytest.fixture
+def course(make_course):
+    return make_course(
+        title="Fast", description="Ünïcode", tags=["Python"], created_at=datetime(2024, 5, 1, 9, 30, 0, 123456),
+        sessions=[{"id": 1, "title": "Intro", "duration": "5m", "description": ""}],
+        quiz={"questions": [{"question": "?", "options": ["a", "b"], "correct": 1}]},
+    )
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_render_matches_the_default_encoder(monkeypatch, use_orjson, course):
+    if not use_orjson:
+        monkeypatch.setattr(serialization, "orjson", None)
+    courses = [course, course]
+
+    assert json.loads(render_json(courses)) == jsonable_encoder(courses)
+
+
+def test_fast_json_keeps_headers_set_on_the_injected_response(course):
+    response = Response()
+    del response.headers["content-length"]
+    response.headers["X-Next-Cursor"] = "abc"
+
+    rendered = fast_json([course], response)
+
+    assert rendered.headers["x-next-cursor"] == "abc"
+    assert rendered.headers["content-type"] == "application/json"
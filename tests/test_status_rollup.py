@@ -0,0 +1,27 @@
+from datetime import datetime
+
+import pytest
+
+from status_rollup import bucket_start
+
+pytestmark = pytest.mark.anyio
+
+
+def test_bucket_start_floors_to_the_interval():
+    assert bucket_start(datetime(2024, 6, 1, 12, 7, 31), 300) == datetime(2024, 6, 1, 12, 5)
+    assert bucket_start(datetime(2024, 6, 1, 12, 5), 300) == datetime(2024, 6, 1, 12, 5)
+    assert bucket_start(datetime(2024, 6, 1, 12, 59), 3600) == datetime(2024, 6, 1, 12)
+
+
+async def test_checks_roll_up_per_client(mongo_db, api_client):
+    for client_name in ["probe-a", "probe-a", "probe-b", "probe-a"]:
+        assert (await api_client.post("/api/status", json={"client_name": client_name})).status_code == 200
+
+    rollup = (await api_client.get("/api/status/rollup", params={"hours": 1})).json()
+    assert [(r["client_name"], r["total"]) for r in rollup] == [("probe-a", 3), ("probe-b", 1)]
+    assert sum(bucket["count"] for bucket in rollup[0]["buckets"]) == 3
+
+    latest = (await api_client.get("/api/status/latest", params={"client_name": "probe-a", "limit": 2})).json()
+    assert len(latest) == 2
+    assert latest[0]["timestamp"] >= latest[1]["timestamp"]
+    assert all(check["client_name"] == "probe-a" for check in latest)
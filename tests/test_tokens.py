@@ -0,0 +1,68 @@
+import time
+
+import jwt
+import pytest
+
+import tokens
+from tokens import TokenVerifier
+
+SECRET = "test-secret-key-that-is-long-enough-for-hs256"
+
+
+@pytest.fixture
+def decode_calls(monkeypatch):
+    calls = []
+    real_decode = jwt.decode
+
+    def counting_decode(*args, **kwargs):
+        calls.append(args[0])
+        return real_decode(*args, **kwargs)
+
+    monkeypatch.setattr(tokens.jwt, "decode", counting_decode)
+    return calls
+
+
+def test_repeat_decodes_are_memoized(decode_calls):
+    verifier = TokenVerifier(SECRET)
+    token = verifier.encode({"sub": "g-1", "exp": int(time.time()) + 3600})
+
+    for _ in range(5):
+        assert verifier.decode(token)["sub"] == "g-1"
+    assert len(decode_calls) == 1
+    assert verifier.stats()["hits"] == 4
+
+
+def test_cached_entry_lapses_exactly_at_exp(decode_calls, clock):
+    exp = int(time.time()) + 3600
+    clock.now = exp - 10
+    verifier = TokenVerifier(SECRET, clock=clock)
+    token = verifier.encode({"sub": "g-1", "exp": exp})
+
+    verifier.decode(token)
+    clock.now = exp - 0.001
+    verifier.decode(token)
+    assert len(decode_calls) == 1
+
+    clock.now = exp
+    verifier.decode(token)
+    assert len(decode_calls) == 2
+
+
+def test_expired_and_invalid_tokens_are_rejected():
+    verifier = TokenVerifier(SECRET)
+    expired = verifier.encode({"sub": "g-1", "exp": int(time.time()) - 1})
+    with pytest.raises(jwt.exceptions.ExpiredSignatureError):
+        verifier.decode(expired)
+
+    forged = jwt.encode({"sub": "g-1", "exp": int(time.time()) + 3600}, "another-secret-key-that-is-long-enough-for-hs256", algorithm="HS256")
+    with pytest.raises(jwt.exceptions.InvalidSignatureError):
+        verifier.decode(forged)
+    assert verifier.stats()["size"] == 0
+
+
+def test_tokens_without_exp_are_not_cached(decode_calls):
+    verifier = TokenVerifier(SECRET)
+    token = verifier.encode({"sub": "g-1"})
+    verifier.decode(token)
+    verifier.decode(token)
+    assert len(decode_calls) == 2
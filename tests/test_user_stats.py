@@ -0,0 +1,98 @@
+import pytest
+
+import user_stats
+from indexes import INDEXES, ensure_indexes
+from server import new_badge
+from user_stats import load_user_stats, record_badge
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def owner(make_user):
+    return await make_user("g-stats")
+
+
+async def test_first_read_builds_stats_from_existing_data(mongo_db, api_client, owner, make_course):
+    await mongo_db.badges.insert_many([
+        new_badge(owner.id, 1, "", "masterclasses", 80).dict(),
+        new_badge(owner.id, 2, "", "masterclasses", 90).dict(),
+        new_badge(owner.id, 3, "", "crashcourses", 100).dict(),
+    ])
+    await mongo_db.courses.insert_many([
+        make_course(owner.id, published=True, views=7).dict(),
+        make_course(owner.id, views=3).dict(),
+    ])
+
+    response = await api_client.get(f"/api/users/{owner.id}/stats")
+
+    assert response.json() == {
+        "user_id": owner.id,
+        "badges": 3,
+        "badges_by_category": {"masterclasses": 2, "crashcourses": 1},
+        "average_quiz_score": 90.0,
+        "courses_created": 2,
+        "courses_published": 1,
+        "total_views": 10,
+    }
+    assert await mongo_db.user_stats.count_documents({"user_id": owner.id}) == 1
+
+
+async def test_writes_keep_stats_in_step(
+    mongo_db, api_client, auth_headers, owner, command_log, make_course, course_payload
+):
+    headers = auth_headers(owner.google_id)
+    await api_client.get(f"/api/users/{owner.id}/stats")
+
+    create = course_payload(make_course(owner.id))
+    created = (await api_client.post("/api/courses", json=create, headers=headers)).json()
+    doomed = (await api_client.post("/api/courses", json=create, headers=headers)).json()
+    await api_client.put(f"/api/courses/{created['id']}/publish", headers=headers)
+    await api_client.put(f"/api/courses/{doomed['id']}/publish", headers=headers)
+    await api_client.delete(f"/api/courses/{doomed['id']}", headers=headers)
+    await api_client.post(
+        "/api/badges", json={"course_id": 5, "course_category": "careerpaths", "quiz_score": 70}, headers=headers
+    )
+
+    command_log.clear()
+    stats = (await api_client.get(f"/api/users/{owner.id}/stats")).json()
+    assert command_log.names == ["find"]
+    assert stats["courses_created"] == 1
+    assert stats["courses_published"] == 1
+    assert stats["badges_by_category"] == {"careerpaths": 1}
+    assert stats["average_quiz_score"] == 70.0
+
+
+async def test_writes_before_the_first_read_are_counted_once(mongo_db, api_client, auth_headers, owner):
+    badge = {"course_id": 5, "course_category": "careerpaths", "quiz_score": 70}
+    await api_client.post("/api/badges", json=badge, headers=auth_headers(owner.google_id))
+    partial = await mongo_db.user_stats.find_one({"user_id": owner.id})
+    assert (partial["badges"], partial["rebuilt"]) == (1, False)
+
+    stats = (await api_client.get(f"/api/users/{owner.id}/stats")).json()
+    assert stats["badges"] == 1
+    assert (await mongo_db.user_stats.find_one({"user_id": owner.id}))["rebuilt"] is True
+
+
+async def test_a_badge_awarded_during_the_first_build_is_not_lost(mongo_db, owner, monkeypatch):
+    # The first read's insert must collide with the racing upsert
+    await ensure_indexes(mongo_db, {"user_stats": INDEXES["user_stats"]})
+    rebuild = user_stats.rebuild_user_stats
+    raced = []
+
+    async def racing_rebuild(db, user_id):
+        snapshot = await rebuild(db, user_id)
+        if not raced:
+            # Lands after the aggregation, before the snapshot is saved
+            raced.append(new_badge(user_id, 1, "", "masterclasses", 80))
+            await db.badges.insert_one(raced[0].dict())
+            await record_badge(db.user_stats, user_id, "masterclasses", 80)
+        return snapshot
+
+    monkeypatch.setattr(user_stats, "rebuild_user_stats", racing_rebuild)
+    assert (await load_user_stats(mongo_db, owner.id))["badges"] == 1
+    assert (await mongo_db.user_stats.find_one({"user_id": owner.id}))["badges"] == 1
+
+
+async def test_unknown_user_is_404(api_client):
+    assert (await api_client.get("/api/users/nobody/stats")).status_code == 404
@@ -0,0 +1,122 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+from views import ViewCounter
+
+pytestmark = pytest.mark.anyio
+
+
+def test_pending_counts_accumulate_per_course():
+    counter = ViewCounter()
+    for _ in range(3):
+        counter.record("c-1", "u-1")
+    counter.record("c-2", "u-1")
+
+    assert counter.pending("c-1") == 3
+    assert counter.pending("c-3") == 0
+    assert counter.stats()["pending_views"] == 4
+
+
+def course_views(course_id, views):
+    return UpdateOne({"id": course_id}, {"$inc": {"views": views}})
+
+
+def owner_views(user_id, views):
+    return UpdateOne(
+        {"user_id": user_id},
+        {"$inc": {"total_views": views, "increments": 1}, "$setOnInsert": {"rebuilt": False}},
+        upsert=True,
+    )
+
+
+async def test_failed_flush_keeps_counts_for_retry(recording_collection):
+    counter = ViewCounter()
+    counter.record("c-1", "u-1")
+
+    with pytest.raises(ConnectionError):
+        await counter.flush(SimpleNamespace(courses=recording_collection(down=True)))
+
+    counter.record("c-1", "u-1")
+    assert counter.pending("c-1") == 2
+    assert counter.stats()["flush_failures"] == 1
+
+
+async def test_partially_applied_flush_only_requeues_failed_courses(recording_collection):
+    counter = ViewCounter()
+    for course_id in ("c-1", "c-2", "c-2"):
+        counter.record(course_id, "u-1")
+    db = SimpleNamespace(courses=recording_collection(failing={1}), user_stats=recording_collection())
+
+    with pytest.raises(BulkWriteError):
+        await counter.flush(db)
+
+    assert db.courses.applied == [course_views("c-1", 1)]
+    assert counter.pending("c-1") == 0 and counter.pending("c-2") == 2
+    # Only the applied view reaches the owner's total
+    assert db.user_stats.applied == [owner_views("u-1", 1)]
+
+
+async def test_failed_stats_write_is_retried_without_rewriting_courses(recording_collection):
+    counter = ViewCounter()
+    counter.record("c-1", "u-1")
+    courses = recording_collection()
+
+    with pytest.raises(ConnectionError):
+        await counter.flush(SimpleNamespace(courses=courses, user_stats=recording_collection(down=True)))
+    assert counter.pending("c-1") == 0
+    assert counter.stats()["pending_owner_views"] == 1
+
+    user_stats = recording_collection()
+    assert await counter.flush(SimpleNamespace(courses=courses, user_stats=user_stats)) == 0
+    assert courses.applied == [course_views("c-1", 1)]
+    assert user_stats.applied == [owner_views("u-1", 1)]
+
+
+async def test_views_being_flushed_still_count_until_written(recording_collection):
+    counter = ViewCounter()
+    counter.record("c-1", "u-1")
+    release = asyncio.Event()
+
+    class BlockedCollection(recording_collection):
+        async def bulk_write(self, requests, ordered=True):
+            await release.wait()
+            await super().bulk_write(requests, ordered)
+
+    db = SimpleNamespace(courses=BlockedCollection(), user_stats=recording_collection())
+    flush = asyncio.create_task(counter.flush(db))
+    await asyncio.sleep(0)
+    counter.record("c-1", "u-1")
+    assert counter.stats()["pending_views"] == 1
+    assert counter.pending("c-1") == 2
+
+    release.set()
+    assert await flush == 1
+    assert counter.pending("c-1") == 1
+
+
+async def test_views_are_written_in_one_bulk_write(
+    mongo_db, api_client, command_log, monkeypatch, make_user, make_course
+):
+    import server
+
+    monkeypatch.setattr(server, "view_counter", ViewCounter())
+    owner = await make_user("g-views")
+    course = make_course(owner.id, title="Viewed", published=True, views=10)
+    await mongo_db.courses.insert_one(course.dict())
+    await api_client.get(f"/api/users/{owner.id}/stats")
+
+    command_log.clear()
+    for _ in range(5):
+        response = await api_client.get(f"/api/courses/{course.id}")
+    assert response.json()["views"] == 15
+    assert "update" not in command_log.names
+
+    command_log.clear()
+    assert await server.view_counter.flush(mongo_db) == 1
+    assert command_log.names == ["update", "update"]  # courses, then the owner's user_stats
+    assert (await mongo_db.courses.find_one({"id": course.id}))["views"] == 15
+    assert (await api_client.get(f"/api/users/{owner.id}/stats")).json()["total_views"] == 15